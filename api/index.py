@@ -17,21 +17,31 @@ try:
     # Import extensions from backend
     sys.path.insert(0, backend_dir)
     from extensions import db
+    from schema import upgrade_schema
     
     # Create app instance
     app = create_app()
     
-    # Initialize database tables
-    try:
-        with app.app_context():
-            db.create_all()
-            print("[INFO] Database tables created successfully")
-    except Exception as e:
-        print(f"[WARNING] Database init: {e}")
+    from services.log import get_logger
+    logger = get_logger("startup")
+
+    # Off by default here: every cold start would wait on the network; /warmup does it instead
+    if app.config.get('OPENAI_PREWARM'):
+        from services.llm_providers import warm_providers
+        warm_providers()
+
+    # Schema changes are applied by `python -m schema` at deploy time, not on every cold start
+    if app.config.get('SCHEMA_UPGRADE_ON_START'):
+        try:
+            with app.app_context():
+                changes = upgrade_schema(db)
+                logger.info("Database schema upgraded", extra={"changes": changes})
+        except Exception as e:
+            logger.warning("Database init failed", extra={"error": repr(e)})
 
 except Exception as e:
-    # Fallback error app
-    print(f"[ERROR] App creation failed: {e}")
+    # Fallback error app; logging may not be set up, so report on stderr
+    print(f"[ERROR] App creation failed: {e}", file=sys.stderr)
     import traceback
     traceback.print_exc()
     
@@ -0,0 +1 @@
+# Offline benchmarks, load tests and log analytics. Run from backend/, e.g. python -m benchmarks.parser_bench
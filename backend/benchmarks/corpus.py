@@ -0,0 +1,122 @@
+"""
+Synthetic resume corpus.
+
+Deterministic resumes of varied sizes, written as PDF (PyMuPDF) and DOCX
+(python-docx), so parser benchmarks and load tests need no real candidate
+data. The same seed always produces the same text.
+
+    python -m benchmarks.corpus out_dir/
+"""
+import os
+import random
+
+import fitz  # PyMuPDF
+from docx import Document
+
+# (name, format, pages); DOCX sizes are in the same pages-of-text units
+CORPUS_SPEC = [
+    ("pdf-1p", "pdf", 1),
+    ("pdf-2p", "pdf", 2),
+    ("pdf-6p", "pdf", 6),
+    ("pdf-24p", "pdf", 24),
+    ("docx-1p", "docx", 1),
+    ("docx-2p", "docx", 2),
+    ("docx-8p", "docx", 8),
+]
+
+FIRST_NAMES = ["Jane", "Arjun", "Maria", "Wei", "Olu", "Sofia", "Liam", "Aisha", "Mateo", "Hana"]
+LAST_NAMES = ["Doe", "Sharma", "Garcia", "Chen", "Adeyemi", "Rossi", "Murphy", "Khan", "Silva", "Sato"]
+CITIES = ["Austin, TX", "Seattle, WA", "London, UK", "Toronto, ON", "Berlin, Germany", "Bangalore, India"]
+SKILLS = ["python", "java", "javascript", "typescript", "sql", "react", "node.js", "django", "flask",
+          "aws", "azure", "docker", "kubernetes", "terraform", "postgresql", "mongodb", "redis",
+          "machine learning", "pandas", "numpy", "tensorflow", "git", "ci/cd", "agile", "scrum",
+          "project management", "stakeholder management", "excel", "tableau", "figma"]
+VERBS = ["Led", "Built", "Designed", "Reduced", "Increased", "Automated", "Migrated", "Launched",
+         "Optimized", "Delivered", "Managed", "Implemented"]
+OBJECTS = ["the billing platform", "a data pipeline", "the mobile checkout", "an internal API gateway",
+           "the recommendation service", "CI/CD workflows", "the analytics dashboard", "a reporting system"]
+RESULTS = ["cutting latency by {n}%", "saving ${n}k per year", "serving {n}0,000 users",
+           "improving conversion by {n}%", "for a team of {n} engineers", "reducing incidents by {n}%"]
+
+# Lines of body text that fill roughly one page
+LINES_PER_PAGE = 48
+
+
+def resume_lines(seed, pages):
+    """Returns the lines of a synthetic resume about pages long."""
+    rng = random.Random(seed)
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    lines = [
+        name,
+        f"{name.lower().replace(' ', '.')}@example.com | +1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)} | {rng.choice(CITIES)}",
+        f"linkedin.com/in/{name.lower().replace(' ', '')}",
+        "",
+        "PROFESSIONAL SUMMARY",
+        f"Software engineer with {rng.randint(2, 15)} years of experience building reliable, "
+        f"scalable systems with {', '.join(rng.sample(SKILLS, 3))}.",
+        "",
+        "SKILLS",
+        ", ".join(rng.sample(SKILLS, 12)),
+        "",
+        "EXPERIENCE",
+    ]
+    target = pages * LINES_PER_PAGE
+    year = 2024
+    while len(lines) < target - 6:
+        lines.append(f"Senior Engineer, Company {rng.randint(1, 99)}    Jan {year - rng.randint(2, 4)} - Dec {year}")
+        for _ in range(rng.randint(3, 6)):
+            result = rng.choice(RESULTS).format(n=rng.randint(2, 60))
+            lines.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(SKILLS)}, {result}.")
+        lines.append("")
+        year -= 3
+    lines += ["EDUCATION", f"B.Sc. Computer Science, State University, {year}",
+              "", "CERTIFICATIONS", "AWS Certified Solutions Architect"]
+    return lines
+
+
+def write_pdf(path, lines):
+    doc = fitz.open()
+    for start in range(0, len(lines), LINES_PER_PAGE):
+        page = doc.new_page()
+        y = 40
+        for line in lines[start:start + LINES_PER_PAGE]:
+            page.insert_text((40, y), line, fontsize=9)
+            y += 15
+    doc.save(path)
+    doc.close()
+
+
+def write_docx(path, lines):
+    doc = Document()
+    for line in lines:
+        doc.add_paragraph(line)
+    doc.save(path)
+
+
+def build_corpus(out_dir, spec=None, seed=0):
+    """Writes the corpus into out_dir (reusing files already there). Returns {name: path}."""
+    os.makedirs(out_dir, exist_ok=True)
+    files = {}
+    for index, (name, fmt, pages) in enumerate(spec or CORPUS_SPEC):
+        path = os.path.join(out_dir, f"{name}-s{seed}.{fmt}")
+        if not os.path.exists(path):
+            lines = resume_lines(seed * 1000 + index, pages)
+            (write_pdf if fmt == "pdf" else write_docx)(path, lines)
+        files[name] = path
+    return files
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write the synthetic resume corpus.")
+    parser.add_argument("out_dir")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    for name, path in build_corpus(args.out_dir, seed=args.seed).items():
+        print(f"{name:<10} {os.path.getsize(path):>9} bytes  {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
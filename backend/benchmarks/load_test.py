@@ -0,0 +1,310 @@
+"""
+Full-stack load test.
+
+N simulated users each run the main user journey against the Flask app:
+
+    signup -> login -> upload (synthetic resume) -> dashboard -> poll analysis
+    -> cover letter -> career advice
+
+By default the app runs in this process on a pool of --workers threads, with
+LLM calls going over HTTP to benchmarks.mock_llm_server on a free port, so
+nothing reaches a real provider and the database is a temporary SQLite file.
+Reported: requests/s, p50/p95/p99 per route, errors, and worker saturation
+(busy share of the pool, peak busy workers, time connections waited for a
+worker). Use --base-url to drive an app that is already running (for
+example under gunicorn); worker saturation is then not available.
+
+    python -m benchmarks.load_test --users 20 --iterations 2 --workers 8 --latency lognormal:0.4:0.5
+"""
+import json
+import os
+import re
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib import error, parse, request
+
+from benchmarks.parser_bench import percentile
+
+_ID_RE = re.compile(r"/\d+(?=/|$)")
+_RESUME_LINK_RE = re.compile(r"/resume/(\d+)/view")
+
+
+class Recorder:
+    """Thread-safe per-route latency and status samples."""
+
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def add(self, route, seconds, ok, detail=None):
+        with self._lock:
+            self.samples.setdefault(route, []).append(seconds)
+            if not ok:
+                self.errors.setdefault(route, []).append(detail)
+
+    def summary(self, wall_seconds):
+        routes = {}
+        for route, values in sorted(self.samples.items()):
+            values = sorted(values)
+            routes[route] = {
+                "requests": len(values),
+                "errors": len(self.errors.get(route, [])),
+                "rps": round(len(values) / wall_seconds, 2),
+                "p50_ms": round(percentile(values, 50) * 1000, 1),
+                "p95_ms": round(percentile(values, 95) * 1000, 1),
+                "p99_ms": round(percentile(values, 99) * 1000, 1),
+                "max_ms": round(values[-1] * 1000, 1),
+            }
+        total = sum(r["requests"] for r in routes.values())
+        return {"requests": total, "rps": round(total / wall_seconds, 2), "wall_s": round(wall_seconds, 2),
+                "errors": sum(r["errors"] for r in routes.values()), "routes": routes}
+
+
+class _NoRedirect(request.HTTPRedirectHandler):
+    """Each request is timed on its own; redirects are not followed."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class Session:
+    """One simulated user: a cookie jar and timed requests."""
+
+    def __init__(self, base_url, recorder, timeout=120):
+        from http.cookiejar import CookieJar
+
+        self.base_url = base_url.rstrip("/")
+        self.recorder = recorder
+        self.timeout = timeout
+        self.opener = request.build_opener(request.HTTPCookieProcessor(CookieJar()), _NoRedirect())
+
+    def call(self, method, path, data=None, files=None, route=None):
+        """Returns (status, body bytes). 2xx and 3xx count as success."""
+        headers = {}
+        body = None
+        if files:
+            body, content_type = _multipart(data or {}, files)
+            headers["Content-Type"] = content_type
+        elif data is not None:
+            body = parse.urlencode(data).encode("utf-8")
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        req = request.Request(self.base_url + path, data=body, headers=headers, method=method)
+        route = route or f"{method} {_ID_RE.sub('/<id>', path.split('?')[0])}"
+        started = time.perf_counter()
+        try:
+            with self.opener.open(req, timeout=self.timeout) as response:
+                status, payload = response.status, response.read()
+        except error.HTTPError as e:
+            status, payload = e.code, e.read()
+        except OSError as e:
+            self.recorder.add(route, time.perf_counter() - started, False, repr(e))
+            return None, b""
+        ok = status < 400
+        self.recorder.add(route, time.perf_counter() - started, ok, None if ok else status)
+        return status, payload
+
+
+def _multipart(fields, files):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8"))
+    for name, (filename, content) in files.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                     f'Content-Type: application/octet-stream\r\n\r\n'.encode("utf-8") + content + b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def user_journey(base_url, recorder, user_index, iterations, corpus, poll_interval=0.5, poll_limit=60):
+    """The scripted scenario for one user."""
+    session = Session(base_url, recorder)
+    email = f"load-{uuid.uuid4().hex[:10]}@example.com"
+    session.call("POST", "/auth/signup", {"email": email, "name": f"Load User {user_index}", "password": "load-test-pw"})
+    session.call("POST", "/auth/login", {"email": email, "password": "load-test-pw"})
+    for iteration in range(iterations):
+        filename, content = corpus[(user_index + iteration) % len(corpus)]
+        session.call("POST", "/resume/upload", files={"resume": (filename, content)})
+        _status, page = session.call("GET", "/dashboard/")
+        ids = _RESUME_LINK_RE.findall(page.decode("utf-8", "replace"))
+        if not ids:
+            continue
+        resume_id = max(int(i) for i in ids)
+        for _ in range(poll_limit):
+            _status, payload = session.call("GET", f"/resume/{resume_id}/status")
+            try:
+                if json.loads(payload or b"{}").get("status") not in ("pending", "running"):
+                    break
+            except ValueError:
+                break
+            time.sleep(poll_interval)
+        session.call("GET", f"/resume/{resume_id}/view")
+        session.call("POST", f"/coverletter/create/{resume_id}",
+                     {"job_title": f"Software Engineer {iteration}", "tone": "professional"})
+        session.call("POST", "/career_advice", {"resume_text": f"Engineer with Python and AWS, run {iteration}",
+                                                 "interests": "backend"})
+
+
+class PoolStats:
+    """Busy time and queueing of the in-process server's worker pool."""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.busy = 0
+        self.peak_busy = 0
+        self.busy_seconds = 0.0
+        self.waits = []
+        self._lock = threading.Lock()
+
+    def started(self, waited):
+        with self._lock:
+            self.busy += 1
+            self.peak_busy = max(self.peak_busy, self.busy)
+            self.waits.append(waited)
+
+    def finished(self, seconds):
+        with self._lock:
+            self.busy -= 1
+            self.busy_seconds += seconds
+
+    def summary(self, wall_seconds):
+        waits = sorted(self.waits)
+        return {
+            "workers": self.workers,
+            "utilization": round(self.busy_seconds / (self.workers * wall_seconds), 3),
+            "peak_busy": self.peak_busy,
+            "queue_wait_p50_ms": round(percentile(waits, 50) * 1000, 1),
+            "queue_wait_p95_ms": round(percentile(waits, 95) * 1000, 1),
+            "queue_wait_max_ms": round((waits[-1] if waits else 0) * 1000, 1),
+        }
+
+
+def serve_app(app, workers):
+    """Serves app on a free port with a fixed pool of worker threads. Returns (server, base_url, stats)."""
+    import logging
+
+    from werkzeug.serving import BaseWSGIServer
+
+    stats = PoolStats(workers)
+    # One access log line per request would dominate the run
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    class PooledWSGIServer(BaseWSGIServer):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wsgi")
+
+        def process_request(self, req, client_address):
+            self.pool.submit(self._handle, req, client_address, time.perf_counter())
+
+        def _handle(self, req, client_address, accepted):
+            started = time.perf_counter()
+            stats.started(started - accepted)
+            try:
+                self.finish_request(req, client_address)
+            except Exception:
+                self.handle_error(req, client_address)
+            finally:
+                self.shutdown_request(req)
+                stats.finished(time.perf_counter() - started)
+
+    server = PooledWSGIServer("127.0.0.1", 0, app)
+    threading.Thread(target=server.serve_forever, name="wsgi-accept", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}", stats
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def format_report(report):
+    lines = [f"{report['requests']} requests in {report['wall_s']}s = {report['rps']} req/s, {report['errors']} errors", ""]
+    header = f"{'route':<34} {'reqs':>6} {'err':>5} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    lines += [header, "-" * len(header)]
+    for route, stats in report["routes"].items():
+        lines.append(f"{route:<34} {stats['requests']:>6} {stats['errors']:>5} {stats['rps']:>7.2f} "
+                     f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}")
+    if report.get("workers"):
+        w = report["workers"]
+        lines += ["", f"workers: {w['workers']}  utilization {w['utilization'] * 100:.0f}%  peak busy {w['peak_busy']}  "
+                      f"queue wait p50 {w['queue_wait_p50_ms']} ms, p95 {w['queue_wait_p95_ms']} ms, max {w['queue_wait_max_ms']} ms"]
+    if report.get("llm"):
+        lines.append(f"mock LLM: {report['llm']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    import argparse
+
+    from benchmarks import mock_llm_server
+
+    parser = argparse.ArgumentParser(description="Load-test the app with scripted user journeys.")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent simulated users")
+    parser.add_argument("--iterations", type=int, default=1, help="Uploads per user")
+    parser.add_argument("--workers", type=int, default=8, help="Worker threads of the in-process server")
+    parser.add_argument("--base-url", help="Drive an already running app instead of an in-process one")
+    parser.add_argument("--json", help="Also write the report here")
+    mock_llm_server.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    tmp_dir = tempfile.mkdtemp(prefix="loadtest-")
+    llm_server = None
+    pool_stats = None
+    if args.base_url:
+        base_url = args.base_url
+    else:
+        # Config is read at import time, so the environment must be set before the app is imported
+        port = _free_port()
+        os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmp_dir, 'load.db')}")
+        os.environ.update({"LLM_PROVIDER": "local", "LLM_LOCAL_BASE_URL": f"http://127.0.0.1:{port}/v1",
+                           "LLM_CACHE_BACKEND": "none", "UPLOAD_FOLDER": os.path.join(tmp_dir, "uploads")})
+        llm_server, _llm_url = mock_llm_server.start_in_thread(port=port, **mock_llm_server.options_from_args(args))
+
+        from app import create_app
+        from extensions import db
+        from schema import upgrade_schema
+
+        app = create_app()
+        with app.app_context():
+            upgrade_schema(db)
+        _server, base_url, pool_stats = serve_app(app, args.workers)
+
+    from benchmarks.corpus import build_corpus
+
+    corpus = []
+    for path in build_corpus(os.path.join(tmp_dir, "corpus"), seed=args.seed).values():
+        if os.path.getsize(path) < 1024 * 1024:
+            with open(path, "rb") as f:
+                corpus.append((os.path.basename(path), f.read()))
+
+    recorder = Recorder()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users, thread_name_prefix="user") as users:
+        futures = [users.submit(user_journey, base_url, recorder, index, args.iterations, corpus)
+                   for index in range(args.users)]
+        for future in futures:
+            future.result()
+    wall = time.perf_counter() - started
+
+    report = recorder.summary(wall)
+    report["users"] = args.users
+    if pool_stats is not None:
+        report["workers"] = pool_stats.summary(wall)
+    if llm_server is not None:
+        report["llm"] = dict(llm_server.mock.stats)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0 if report["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,217 @@
+"""
+Mock OpenAI-compatible LLM server.
+
+Speaks enough of the chat completions protocol for the app's OpenAI client:
+POST /v1/chat/completions (JSON or SSE streaming, n choices, usage) and
+GET /v1/models. Responses come from the fake provider in
+services.llm_providers: analyses are schema-complete JSON from the local
+rubric scorer, or a canned analysis from --analysis-file. GET /stats returns
+request and error counts.
+
+Latency is drawn per request from a distribution spec:
+
+    fixed:0.2  uniform:0.1:0.8  normal:0.4:0.1  lognormal:0.3:0.5 (median, sigma)  exp:0.3 (mean)
+
+Point the app at it with LLM_PROVIDER=local LLM_LOCAL_BASE_URL=http://127.0.0.1:8081/v1:
+
+    python -m benchmarks.mock_llm_server --port 8081 --latency lognormal:0.4:0.5 --error-rate 0.02
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def parse_latency(spec):
+    """Returns a function rng -> seconds for a distribution spec (see module docstring)."""
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(":") if v]
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        import math
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    if kind == "exp":
+        return lambda rng: rng.expovariate(1 / values[0])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class MockLLM:
+    """Shared state of the server: response generation, latency and error injection, counters."""
+
+    def __init__(self, latency="fixed:0", token_delay=0.0, error_rate=0.0, error_statuses=(503,),
+                 retry_after=1, analysis=None, seed=0):
+        from services.llm_providers import FakeProvider
+
+        self.provider = FakeProvider(chunk_delay=token_delay, analysis=analysis)
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.error_statuses = list(error_statuses)
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "streamed": 0, "errors": 0, "in_flight": 0, "peak_in_flight": 0}
+
+    def draw(self):
+        """Returns (delay seconds, error status or None) for one request."""
+        with self._lock:
+            delay = self.latency(self._random)
+            status = None
+            if self._random.random() < self.error_rate:
+                status = self._random.choice(self.error_statuses)
+            return delay, status
+
+    def count(self, field, delta=1):
+        with self._lock:
+            self.stats[field] += delta
+            if field == "in_flight":
+                self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.stats["in_flight"])
+
+    def respond(self, body):
+        """Runs a chat completion request body through the fake provider."""
+        messages = body["messages"]
+        response_format = body.get("response_format")
+        if response_format and response_format.get("type") in ("json_schema", "json_object"):
+            workload = "analysis"
+        elif "cover letter" in messages[-1]["content"].lower():
+            workload = "cover_letter"
+        else:
+            workload = "career_advice"
+        params = {key: body[key] for key in ("n", "response_format", "stream_options") if key in body}
+        return self.provider.chat(workload, body.get("model", "mock"), messages, stream=bool(body.get("stream")), **params)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "MockLLM/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        mock = self.server.mock
+        if self.path.rstrip("/") == "/v1/models":
+            self._send_json(200, {"object": "list", "data": [{"id": "mock", "object": "model", "owned_by": "mock"}]})
+        elif self.path.rstrip("/") == "/stats":
+            self._send_json(200, mock.stats)
+        else:
+            self._send_json(404, {"error": {"message": "Not found"}})
+
+    def do_POST(self):
+        mock = self.server.mock
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self._send_json(404, {"error": {"message": "Not found"}})
+            return
+        mock.count("requests")
+        mock.count("in_flight")
+        try:
+            delay, status = mock.draw()
+            time.sleep(delay)
+            if status is not None:
+                mock.count("errors")
+                headers = {"Retry-After": str(mock.retry_after)} if status == 429 else None
+                self._send_json(status, {"error": {"message": f"Injected error (HTTP {status})",
+                                                   "type": "mock_error"}}, headers)
+                return
+            result = mock.respond(body)
+            if not body.get("stream"):
+                self._send_json(200, result.model_dump(exclude_none=True))
+                return
+            mock.count("streamed")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for chunk in result:
+                self._write_chunk(f"data: {chunk.model_dump_json(exclude_none=True)}\n\n".encode("utf-8"))
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+        finally:
+            mock.count("in_flight", -1)
+
+
+def make_server(host="127.0.0.1", port=8081, verbose=False, **options):
+    """Returns a ready (not yet serving) ThreadingHTTPServer with a MockLLM attached."""
+    server = ThreadingHTTPServer((host, port), MockHandler)
+    server.daemon_threads = True
+    server.mock = MockLLM(**options)
+    server.verbose = verbose
+    return server
+
+
+def start_in_thread(**options):
+    """Starts a server on a background thread. Returns (server, base_url)."""
+    server = make_server(**options)
+    threading.Thread(target=server.serve_forever, name="mock-llm", daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}/v1"
+
+
+def add_arguments(parser):
+    parser.add_argument("--latency", default="fixed:0.2", help="Time to first token distribution")
+    parser.add_argument("--token-delay", type=float, default=0.002, help="Seconds between streamed chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-statuses", default="503", help="Comma-separated statuses to inject, e.g. 503,429")
+    parser.add_argument("--analysis-file", help="JSON analysis to return for every analysis request")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def options_from_args(args):
+    analysis = None
+    if args.analysis_file:
+        with open(args.analysis_file, encoding="utf-8") as f:
+            analysis = json.load(f)
+    return {
+        "latency": args.latency,
+        "token_delay": args.token_delay,
+        "error_rate": args.error_rate,
+        "error_statuses": [int(s) for s in args.error_statuses.split(",") if s],
+        "analysis": analysis,
+        "seed": args.seed,
+    }
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve a mock OpenAI-compatible chat completions API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--verbose", action="store_true")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, verbose=args.verbose, **options_from_args(args))
+    print(f"Mock LLM server on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
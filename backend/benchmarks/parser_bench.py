@@ -0,0 +1,233 @@
+"""
+Parser micro-benchmarks with a regression gate.
+
+Times the upload parsing pipeline over the synthetic corpus
+(benchmarks.corpus): extract_text_from_pdf, extract_text_from_docx,
+simple_skill_extractor, extract_name_from_text and parse_resume_file end to
+end. Each benchmark runs in a fresh process, so its peak RSS is its own and
+no benchmark warms caches for the next one. Reported per case: calls,
+throughput (calls/s and MB/s of input), p50 and p99 latency, peak RSS.
+
+    python -m benchmarks.parser_bench --save-baseline            # record benchmarks/baselines/parser.json
+    python -m benchmarks.parser_bench --check                    # exit 1 on a regression
+
+A case regresses when its p50 grows by more than --threshold (default 20%),
+its p99 by more than --p99-threshold (50%), or the benchmark's peak RSS by
+more than --rss-threshold (20%). Changes below --min-delta-ms are treated as
+noise. Baselines are machine specific: the committed baselines/parser.json was
+recorded from the default corpus (seed 0, --repeat 30); re-record it with
+--save-baseline on the machine that checks it.
+"""
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from benchmarks.corpus import CORPUS_SPEC, build_corpus
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "parser.json")
+
+# name: the corpus inputs it takes ("pdf", "docx", "file" for both, "text" for extracted text)
+BENCHMARKS = {
+    "extract_text_from_pdf": "pdf",
+    "extract_text_from_docx": "docx",
+    "simple_skill_extractor": "text",
+    "extract_name_from_text": "text",
+    "parse_resume_file": "file",
+}
+
+
+def _target(name):
+    """Returns fn(case) for a benchmark; case has data, filename and text."""
+    from services import parser
+
+    if name == "extract_text_from_pdf":
+        return lambda case: parser.extract_text_from_pdf(case["data"])
+    if name == "extract_text_from_docx":
+        return lambda case: parser.extract_text_from_docx(case["data"])
+    if name == "simple_skill_extractor":
+        return lambda case: parser.simple_skill_extractor(case["text"])
+    if name == "extract_name_from_text":
+        return lambda case: parser.extract_name_from_text(case["text"])
+    if name == "parse_resume_file":
+        return lambda case: parser.parse_resume_file(case["data"], case["filename"])
+    raise ValueError(f"Unknown benchmark: {name}")
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process, in MB."""
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _load_cases(name, files):
+    from services.parser import extract_text_from_docx, extract_text_from_pdf
+
+    kind = BENCHMARKS[name]
+    cases = []
+    for case_name, path in files.items():
+        fmt = os.path.splitext(path)[1].lstrip(".")
+        if kind in ("pdf", "docx") and fmt != kind:
+            continue
+        with open(path, "rb") as f:
+            data = f.read()
+        case = {"name": case_name, "data": data, "filename": os.path.basename(path), "bytes": len(data)}
+        if kind == "text":
+            case["text"] = extract_text_from_pdf(data) if fmt == "pdf" else extract_text_from_docx(data)
+            case["bytes"] = len(case["text"].encode("utf-8"))
+        cases.append(case)
+    return cases
+
+
+def run_benchmark(name, files, repeat, warmup):
+    """Runs every case of one benchmark. Returns ({case key: stats}, peak RSS MB)."""
+    # Warm the taxonomy and parser imports before anything is timed
+    from services.taxonomy import get_skill_index
+    get_skill_index()
+
+    target = _target(name)
+    results = {}
+    for case in _load_cases(name, files):
+        for _ in range(warmup):
+            target(case)
+        timings = []
+        started = time.perf_counter()
+        for _ in range(repeat):
+            t0 = time.perf_counter_ns()
+            target(case)
+            timings.append((time.perf_counter_ns() - t0) / 1e6)
+        elapsed = time.perf_counter() - started
+        timings.sort()
+        results[f"{name}[{case['name']}]"] = {
+            "calls": repeat,
+            "mean_ms": round(sum(timings) / repeat, 4),
+            "p50_ms": round(percentile(timings, 50), 4),
+            "p99_ms": round(percentile(timings, 99), 4),
+            "ops_per_s": round(repeat / elapsed, 2),
+            "mb_per_s": round(case["bytes"] * repeat / elapsed / 1e6, 3),
+        }
+    return results, round(peak_rss_mb(), 1)
+
+
+def run_all(names, files, repeat, warmup, isolate=True):
+    """Returns {"meta": ..., "results": {case: stats}} for the named benchmarks."""
+    results = {}
+    for name in names:
+        if isolate:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                cases, rss = pool.submit(run_benchmark, name, files, repeat, warmup).result()
+        else:
+            cases, rss = run_benchmark(name, files, repeat, warmup)
+        for stats in cases.values():
+            stats["peak_rss_mb"] = rss
+        results.update(cases)
+    return {"meta": environment(repeat), "results": results}
+
+
+def environment(repeat):
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "repeat": repeat,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(current, baseline, threshold=0.2, p99_threshold=0.5, rss_threshold=0.2, min_delta_ms=0.1):
+    """Returns a list of regression messages (empty when current is within the thresholds)."""
+    regressions = []
+    for key, stats in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        for field, limit in (("p50_ms", threshold), ("p99_ms", p99_threshold)):
+            if stats[field] - base[field] > min_delta_ms and stats[field] > base[field] * (1 + limit):
+                regressions.append(f"{key}: {field} {base[field]:.3f} -> {stats[field]:.3f} "
+                                   f"(+{(stats[field] / base[field] - 1) * 100:.0f}%, limit +{limit * 100:.0f}%)")
+        if base.get("peak_rss_mb") and stats["peak_rss_mb"] > base["peak_rss_mb"] * (1 + rss_threshold):
+            regressions.append(f"{key}: peak_rss_mb {base['peak_rss_mb']} -> {stats['peak_rss_mb']}")
+    return regressions
+
+
+def format_table(report):
+    header = f"{'case':<42} {'p50 ms':>9} {'p99 ms':>9} {'ops/s':>9} {'MB/s':>8} {'RSS MB':>7}"
+    lines = [header, "-" * len(header)]
+    for key, stats in report["results"].items():
+        lines.append(f"{key:<42} {stats['p50_ms']:>9.3f} {stats['p99_ms']:>9.3f} {stats['ops_per_s']:>9.1f} "
+                     f"{stats['mb_per_s']:>8.2f} {stats['peak_rss_mb']:>7.1f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the resume parser over a synthetic corpus.")
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS), help="Run only these benchmarks")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--corpus-dir", help="Where to write the corpus (default: a temporary directory)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="Compare against the baseline; exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed p50 growth (0.2 = 20%%)")
+    parser.add_argument("--p99-threshold", type=float, default=0.5)
+    parser.add_argument("--rss-threshold", type=float, default=0.2)
+    parser.add_argument("--min-delta-ms", type=float, default=0.1)
+    parser.add_argument("--json", help="Also write the results here")
+    parser.add_argument("--no-isolate", action="store_true", help="Run all benchmarks in this process")
+    args = parser.parse_args(argv)
+
+    names = args.only or list(BENCHMARKS)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        files = build_corpus(args.corpus_dir or tmp_dir, CORPUS_SPEC, seed=args.seed)
+        report = run_all(names, files, args.repeat, args.warmup, isolate=not args.no_isolate)
+    print(format_table(report))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    status = 0
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}; run with --save-baseline first", file=sys.stderr)
+            return 2
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["meta"].get("platform") != report["meta"]["platform"]:
+            print(f"Warning: baseline was recorded on {baseline['meta'].get('platform')}", file=sys.stderr)
+        regressions = compare(report, baseline, args.threshold, args.p99_threshold,
+                              args.rss_threshold, args.min_delta_ms)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        if regressions:
+            status = 1
+        else:
+            print(f"No regressions against {args.baseline}", file=sys.stderr)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {args.baseline}", file=sys.stderr)
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
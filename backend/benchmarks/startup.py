@@ -0,0 +1,143 @@
+"""
+Cold-start and import-time report for the serverless entry point.
+
+Starts a fresh interpreter --repeat times, each importing api/index.py the
+way the Vercel runtime does (which also builds the app), and reports the
+median time to a ready app, plus the slowest modules from `python -X
+importtime` of the last run, summed per package and per module.
+
+    python -m benchmarks.startup                      # report
+    python -m benchmarks.startup --budget-ms 600      # exit 1 when the median is over budget
+
+Unless --env overrides it, each run is configured like production (schema
+migrated at deploy time, not on start) but with a throwaway SQLite database
+and the fake LLM provider with pre-warming off, so nothing reaches the
+network and the numbers measure the app itself.
+"""
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_DIR = os.path.join(os.path.dirname(BACKEND_DIR), "api")
+
+# The app's own packages, reported per module rather than as one package
+APP_PACKAGES = {"services", "routes"}
+
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+sys.path[:0] = [{api!r}, {backend!r}]
+import index
+ready = time.perf_counter()
+print("STARTUP " + json.dumps({{"ready_ms": (ready - started) * 1000, "modules": len(sys.modules),
+                               "heavy": sorted(m for m in ("fitz", "docx", "openai", "tiktoken") if m in sys.modules)}}))
+"""
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from -X importtime output."""
+    modules = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return modules
+
+
+def measure(env=None, importtime=False):
+    """One cold start in a fresh interpreter. Returns (probe result, importtime modules)."""
+    args = [sys.executable]
+    if importtime:
+        args += ["-X", "importtime"]
+    args += ["-c", _PROBE.format(api=API_DIR, backend=BACKEND_DIR)]
+    result = subprocess.run(args, cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120)
+    for line in result.stdout.splitlines():
+        if line.startswith("STARTUP "):
+            return json.loads(line[len("STARTUP "):]), parse_importtime(result.stderr)
+    raise RuntimeError(f"Entry point failed to start:\n{result.stderr[-2000:]}")
+
+
+def run(repeat=5, env_overrides=None, top=15):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        env = dict(os.environ)
+        env.update({
+            "DATABASE_URL": f"sqlite:///{os.path.join(tmp_dir, 'startup.db')}",
+            "LLM_PROVIDER": "fake",
+            "OPENAI_PREWARM": "0",
+            "FLASK_ENV": "production",
+            "SCHEMA_UPGRADE_ON_START": "0",
+            "UPLOAD_FOLDER": os.path.join(tmp_dir, "uploads"),
+        })
+        env.update(env_overrides or {})
+        samples = [measure(env)[0] for _ in range(repeat)]
+        probe, modules = measure(env, importtime=True)
+    ready = sorted(sample["ready_ms"] for sample in samples)
+    by_self = sorted(modules, key=lambda m: -m[1])[:top]
+    # Self time summed per top-level package (per module for the app's own services and routes)
+    packages = {}
+    for name, self_us, _cumulative, _depth in modules:
+        root = name if name.split(".")[0] in APP_PACKAGES else name.split(".")[0]
+        packages[root] = packages.get(root, 0) + self_us
+    by_package = sorted(packages.items(), key=lambda item: -item[1])[:top]
+    return {
+        "repeat": repeat,
+        "ready_ms_median": round(statistics.median(ready), 1),
+        "ready_ms_min": round(ready[0], 1),
+        "ready_ms_max": round(ready[-1], 1),
+        "modules_loaded": probe["modules"],
+        "heavy_modules_loaded": probe["heavy"],
+        "import_total_ms": round(sum(m[1] for m in modules) / 1000, 1),
+        "top_self": [{"module": m[0], "self_ms": round(m[1] / 1000, 1)} for m in by_self],
+        "top_packages": [{"package": name, "self_ms": round(us / 1000, 1)} for name, us in by_package],
+    }
+
+
+def format_report(report):
+    lines = [
+        f"cold start to ready app: median {report['ready_ms_median']} ms "
+        f"(min {report['ready_ms_min']}, max {report['ready_ms_max']}, {report['repeat']} runs)",
+        f"modules loaded: {report['modules_loaded']}, import time {report['import_total_ms']} ms, "
+        f"heavy modules: {', '.join(report['heavy_modules_loaded']) or 'none'}",
+        "",
+        f"{'import time by package':<40} {'ms':>8}",
+    ]
+    lines += [f"{m['package']:<40} {m['self_ms']:>8.1f}" for m in report["top_packages"]]
+    lines += ["", f"{'slowest modules (self)':<40} {'self ms':>8}"]
+    lines += [f"{m['module']:<40} {m['self_ms']:>8.1f}" for m in report["top_self"]]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure cold start and import time of the serverless entry point.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra environment for the measured process")
+    parser.add_argument("--budget-ms", type=float, help="Exit 1 when the median cold start exceeds this")
+    parser.add_argument("--json", help="Also write the report here")
+    args = parser.parse_args(argv)
+
+    overrides = dict(item.split("=", 1) for item in args.env)
+    report = run(args.repeat, overrides, args.top)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.budget_ms is not None and report["ready_ms_median"] > args.budget_ms:
+        print(f"Cold start {report['ready_ms_median']} ms is over the {args.budget_ms} ms budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
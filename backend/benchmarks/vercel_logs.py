@@ -0,0 +1,320 @@
+"""
+Vercel request-log analytics.
+
+Streams a log export (CSV as downloaded from the Vercel dashboard, such as
+logs_result.csv, optionally gzipped, or "-" for stdin) in one pass and in
+bounded memory, so exports of any size can be summarised:
+
+- latency percentiles per route (p50/p95/p99/max of durationMs), from a
+  log-bucketed histogram accurate to about 1%
+- cold versus warm invocations: an invocation is cold when it is the first
+  one seen on its instanceId, or when its log lines show the function being
+  initialised or its process exiting (an import error, "Init Duration", ...);
+  a later invocation on a known instance is warm; without either signal it is
+  counted as unknown
+- memory: maxMemoryUsed against the function's memorySize (default 2048 MB)
+- error clusters: error log lines grouped by traceback signature (exception
+  type and message with ids and numbers masked, plus the innermost frames),
+  with counts, routes, first/last seen and an example request
+
+Each export has one row per invocation (durationMs, maxMemoryUsed,
+invocationId) and one per log line (level, message); they are joined on
+requestId within a sliding window of --join-window requests.
+
+    python -m benchmarks.vercel_logs ../logs_result.csv
+    python -m benchmarks.vercel_logs export.csv.gz --json report.json --top 20
+"""
+import csv
+import gzip
+import io
+import json
+import math
+import re
+import sys
+from collections import OrderedDict
+
+DEFAULT_MEMORY_LIMIT_MB = 2048
+
+# Log lines that only appear while an instance starts (or dies and must start again)
+COLD_MARKERS = ("Error importing", "Init Duration", "INIT_START", "exited with exit status", "Cold start")
+
+_FRAME_RE = re.compile(r'File "([^"]+)", line \d+, in (\S+)')
+_EXCEPTION_RE = re.compile(r"^([A-Za-z_][\w.]*(?:Error|Exception|Exit|Interrupt|Warning|Timeout)\w*)(?::\s*(.*))?$")
+_MASKS = [
+    (re.compile(r"0x[0-9a-fA-F]+"), "<addr>"),
+    (re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"), "<uuid>"),
+    (re.compile(r"\b[0-9a-fA-F]{16,}\b"), "<hex>"),
+    (re.compile(r"\d+"), "N"),
+]
+_ID_SEGMENT_RE = re.compile(r"/(\d+|[0-9a-fA-F-]{16,})(?=/|$)")
+
+
+class LatencyHistogram:
+    """Streaming percentiles: counts in log-spaced buckets of relative width `precision`."""
+
+    def __init__(self, precision=0.01):
+        self._log_base = math.log1p(precision)
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        index = int(math.log(value) / self._log_base) if value > 0 else -1
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, pct):
+        """Nearest-rank percentile, reported as the bucket's upper bound (capped at the max)."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * pct / 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return 0.0 if index < 0 else min(self.max, math.exp((index + 1) * self._log_base))
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 1) if self.count else 0.0,
+            "p50": round(self.percentile(50), 1),
+            "p95": round(self.percentile(95), 1),
+            "p99": round(self.percentile(99), 1),
+            "max": round(self.max, 1),
+        }
+
+
+def route_of(row):
+    """'METHOD /path' with the host and query stripped and id-like segments collapsed."""
+    path = row.get("requestPath") or ""
+    if path and not path.startswith("/"):
+        path = "/" + path.split("/", 1)[1] if "/" in path else "/"
+    path = _ID_SEGMENT_RE.sub("/<id>", path.split("?", 1)[0]) or "/"
+    return f"{row.get('requestMethod') or '?'} {path}"
+
+
+def _mask(text):
+    for pattern, replacement in _MASKS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def error_signature(message, frames=3):
+    """
+    Stable key for an error message. For tracebacks: the last exception line
+    (masked) plus the innermost frames as file:function, without line numbers.
+    Otherwise the masked first line.
+    """
+    lines = [line.strip() for line in (message or "").splitlines() if line.strip()]
+    if not lines:
+        return "(empty message)"
+    exception = None
+    for line in lines:
+        match = _EXCEPTION_RE.match(line)
+        if match:
+            exception = match
+    if exception is None:
+        return _mask(lines[0])[:200]
+    exc_type, exc_message = exception.group(1), _mask(exception.group(2) or "")
+    # Frames of the last traceback in the message, innermost last
+    text = "\n".join(lines)
+    last_tb = text.rsplit("Traceback (most recent call last):", 1)[-1]
+    stack = [f"{path.rsplit('/', 1)[-1]}:{func}" for path, func in _FRAME_RE.findall(last_tb)]
+    where = " > ".join(stack[-frames:])
+    return f"{exc_type}: {exc_message[:160]}" + (f" @ {where}" if where else "")
+
+
+def _number(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number >= 0 else None
+
+
+class LogReport:
+    """Accumulates one pass over the rows of an export."""
+
+    def __init__(self, memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB, join_window=50000, frames=3):
+        self.memory_limit_mb = memory_limit_mb
+        self.join_window = join_window
+        self.frames = frames
+        self.rows = 0
+        self.routes = {}
+        self.starts = {"cold": 0, "warm": 0, "unknown": 0}
+        self.memory = LatencyHistogram()
+        self.memory_limits = {}
+        self.statuses = {}
+        self.clusters = {}
+        self.instances = set()
+        self._pending = OrderedDict()
+
+    def add(self, row):
+        self.rows += 1
+        request_id = row.get("requestId") or f"row-{self.rows}"
+        entry = self._pending.get(request_id)
+        if entry is None:
+            entry = self._pending[request_id] = {"invocation": None, "cold_marker": False}
+            if len(self._pending) > self.join_window:
+                self._finish(self._pending.popitem(last=False)[1])
+        if row.get("level"):
+            message = row.get("message") or ""
+            if any(marker in message for marker in COLD_MARKERS):
+                entry["cold_marker"] = True
+            if row["level"] in ("error", "fatal"):
+                self._add_error(row, message)
+        if row.get("durationMs") or row.get("invocationId"):
+            entry["invocation"] = row
+
+    def _add_error(self, row, message):
+        signature = error_signature(message, self.frames)
+        cluster = self.clusters.get(signature)
+        timestamp = row.get("TimeUTC") or ""
+        if cluster is None:
+            cluster = self.clusters[signature] = {
+                "count": 0, "routes": {}, "first_seen": timestamp, "last_seen": timestamp,
+                "example_request": row.get("requestId"), "example": message[:2000],
+            }
+        cluster["count"] += 1
+        route = route_of(row)
+        cluster["routes"][route] = cluster["routes"].get(route, 0) + 1
+        if timestamp:
+            cluster["first_seen"] = min(cluster["first_seen"] or timestamp, timestamp)
+            cluster["last_seen"] = max(cluster["last_seen"], timestamp)
+
+    def _finish(self, entry):
+        row = entry["invocation"]
+        if row is None:
+            return
+        route = route_of(row)
+        stats = self.routes.get(route)
+        if stats is None:
+            stats = self.routes[route] = {"latency": LatencyHistogram(), "errors": 0,
+                                          "cold": 0, "warm": 0, "unknown": 0}
+        duration = _number(row.get("durationMs"))
+        if duration is not None:
+            stats["latency"].add(duration)
+        status = row.get("responseStatusCode") or "none"
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if status == "none" or status.startswith("5"):
+            stats["errors"] += 1
+
+        instance = row.get("instanceId")
+        if entry["cold_marker"] or (instance and instance not in self.instances):
+            start = "cold"
+        elif instance:
+            start = "warm"
+        else:
+            start = "unknown"
+        if instance:
+            self.instances.add(instance)
+        stats[start] += 1
+        self.starts[start] += 1
+
+        used = _number(row.get("maxMemoryUsed"))
+        limit = _number(row.get("memorySize")) or self.memory_limit_mb
+        self.memory_limits[int(limit)] = self.memory_limits.get(int(limit), 0) + 1
+        if used is not None:
+            self.memory.add(used)
+
+    def result(self, top=10):
+        while self._pending:
+            self._finish(self._pending.popitem(last=False)[1])
+        limit = max(self.memory_limits, key=self.memory_limits.get) if self.memory_limits else self.memory_limit_mb
+        memory = self.memory.summary()
+        memory["limit_mb"] = limit
+        memory["p95_utilization"] = round(self.memory.percentile(95) / limit, 3) if self.memory.count else None
+        memory["max_utilization"] = round(self.memory.max / limit, 3) if self.memory.count else None
+        clusters = sorted(self.clusters.items(), key=lambda item: -item[1]["count"])
+        return {
+            "rows": self.rows,
+            "invocations": sum(self.starts.values()),
+            "statuses": dict(sorted(self.statuses.items())),
+            "starts": self.starts,
+            "routes": {route: {**stats["latency"].summary(), "errors": stats["errors"],
+                               "cold": stats["cold"], "warm": stats["warm"], "unknown": stats["unknown"]}
+                       for route, stats in sorted(self.routes.items())},
+            "memory": memory,
+            "error_clusters": [{"signature": signature, **cluster} for signature, cluster in clusters[:top]],
+            "error_cluster_count": len(clusters),
+        }
+
+
+def read_rows(path):
+    """Yields the rows of a CSV export one at a time."""
+    # Tracebacks in the message column can exceed the csv module's default field limit
+    csv.field_size_limit(2 ** 31 - 1)
+    if path == "-":
+        yield from csv.DictReader(io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline=""))
+        return
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", newline="") as f:
+        yield from csv.DictReader(f)
+
+
+def analyze(rows, memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB, join_window=50000, top=10, frames=3):
+    report = LogReport(memory_limit_mb, join_window, frames)
+    for row in rows:
+        report.add(row)
+    return report.result(top)
+
+
+def format_report(report):
+    starts = report["starts"]
+    lines = [f"{report['rows']} rows, {report['invocations']} invocations; "
+             f"cold {starts['cold']}, warm {starts['warm']}, unknown {starts['unknown']}; "
+             f"statuses {', '.join(f'{k}: {v}' for k, v in report['statuses'].items())}", ""]
+    header = (f"{'route':<34} {'reqs':>6} {'5xx':>5} {'cold':>5} {'warm':>5} "
+              f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    lines += [header, "-" * len(header)]
+    for route, stats in report["routes"].items():
+        lines.append(f"{route[:34]:<34} {stats['cold'] + stats['warm'] + stats['unknown']:>6} {stats['errors']:>5} "
+                     f"{stats['cold']:>5} {stats['warm']:>5} {stats['p50']:>8.1f} {stats['p95']:>8.1f} "
+                     f"{stats['p99']:>8.1f} {stats['max']:>8.1f}")
+    memory = report["memory"]
+    lines.append("")
+    if memory["count"]:
+        lines.append(f"memory: p50 {memory['p50']:.0f} MB, p95 {memory['p95']:.0f} MB, max {memory['max']:.0f} MB "
+                     f"of {memory['limit_mb']} MB (p95 {memory['p95_utilization'] * 100:.0f}%, "
+                     f"max {memory['max_utilization'] * 100:.0f}%)")
+    else:
+        lines.append(f"memory: no maxMemoryUsed samples (limit {memory['limit_mb']} MB)")
+    lines += ["", f"{report['error_cluster_count']} error clusters"]
+    for cluster in report["error_clusters"]:
+        routes = ", ".join(f"{route} ({count})" for route, count in
+                           sorted(cluster["routes"].items(), key=lambda item: -item[1])[:3])
+        lines.append(f"{cluster['count']:>6}  {cluster['signature']}")
+        lines.append(f"        {cluster['first_seen']} .. {cluster['last_seen']}  routes: {routes}  "
+                     f"e.g. {cluster['example_request']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarise a Vercel request-log export.")
+    parser.add_argument("path", help="CSV export (.csv or .csv.gz), or - for stdin")
+    parser.add_argument("--memory-limit", type=int, default=DEFAULT_MEMORY_LIMIT_MB,
+                        help="MB, used when rows carry no memorySize")
+    parser.add_argument("--top", type=int, default=10, help="Error clusters to show")
+    parser.add_argument("--frames", type=int, default=3, help="Innermost traceback frames in a signature")
+    parser.add_argument("--join-window", type=int, default=50000,
+                        help="Requests kept open while waiting for their log lines")
+    parser.add_argument("--json", help="Also write the report here")
+    args = parser.parse_args(argv)
+
+    report = analyze(read_rows(args.path), args.memory_limit, args.join_window, args.top, args.frames)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,11 +1,13 @@
 import os
-from dotenv import load_dotenv
 
-# Load .env file from project root (one level up from backend)
+# Load .env file from project root (one level up from backend).
+# Deployments set real environment variables and ship no .env, so skip the import there.
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 PROJECT_ROOT = os.path.join(BASE_DIR, "..")
 dotenv_path = os.path.join(PROJECT_ROOT, ".env")
-load_dotenv(dotenv_path)
+if os.path.exists(dotenv_path):
+    from dotenv import load_dotenv
+    load_dotenv(dotenv_path)
 
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-change-in-production")
@@ -19,6 +21,10 @@ class Config:
     else:
         UPLOAD_FOLDER = os.getenv("UPLOAD_FOLDER", os.path.join(BASE_DIR, "..", "static", "uploads"))
     
+    # Uploads are parsed in memory; keeping the original file on disk is optional.
+    # Off by default in production, where /tmp is RAM-backed.
+    PERSIST_UPLOADS = os.getenv("PERSIST_UPLOADS", "0" if FLASK_ENV == "production" else "1") == "1"
+    
     # Database configuration - supports both SQLite (dev) and PostgreSQL (production)
     DATABASE_URL = os.getenv("DATABASE_URL")
     if DATABASE_URL and DATABASE_URL.startswith("postgres://"):
@@ -27,12 +33,152 @@ class Config:
     
     SQLALCHEMY_DATABASE_URI = DATABASE_URL or "sqlite:///" + os.path.join(BASE_DIR, "database.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Apply schema changes when the serverless entry point starts. Shared databases are
+    # migrated once per deploy with `python -m schema` instead; a local SQLite file is
+    # created on first start.
+    SCHEMA_UPGRADE_ON_START = os.getenv(
+        "SCHEMA_UPGRADE_ON_START", "1" if SQLALCHEMY_DATABASE_URI.startswith("sqlite") else "0") == "1"
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-    
-    # Only print debug info in development
-    FLASK_ENV = os.getenv("FLASK_ENV", "development")
-    if FLASK_ENV == "development":
-        if OPENAI_API_KEY:
-            print(f"[CONFIG] OpenAI API Key loaded: {OPENAI_API_KEY[:20]}...")
-        else:
-            print("[CONFIG] WARNING: OpenAI API Key not found!")
+
+    # LLM provider per workload (services/llm_providers.py): openai, local (any
+    # OpenAI-compatible server at LLM_LOCAL_BASE_URL) or fake (offline, deterministic)
+    LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai")
+    LLM_PROVIDER_ANALYSIS = os.getenv("LLM_PROVIDER_ANALYSIS", LLM_PROVIDER)
+    LLM_PROVIDER_COVER_LETTER = os.getenv("LLM_PROVIDER_COVER_LETTER", LLM_PROVIDER)
+    LLM_PROVIDER_CAREER_ADVICE = os.getenv("LLM_PROVIDER_CAREER_ADVICE", LLM_PROVIDER)
+    LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+    LLM_MODEL_ANALYSIS = os.getenv("LLM_MODEL_ANALYSIS", LLM_MODEL)
+    LLM_MODEL_COVER_LETTER = os.getenv("LLM_MODEL_COVER_LETTER", LLM_MODEL)
+    LLM_MODEL_CAREER_ADVICE = os.getenv("LLM_MODEL_CAREER_ADVICE", LLM_MODEL)
+    LLM_LOCAL_BASE_URL = os.getenv("LLM_LOCAL_BASE_URL", "http://localhost:8000/v1")
+    LLM_LOCAL_API_KEY = os.getenv("LLM_LOCAL_API_KEY")
+    # Set to 0 for servers without json_schema response formats (falls back to JSON mode)
+    LLM_LOCAL_JSON_SCHEMA = os.getenv("LLM_LOCAL_JSON_SCHEMA", "1") == "1"
+    # Fake provider: seconds before each response, seconds between streamed chunks,
+    # share of calls that fail with LLM_FAKE_ERROR_STATUS, and the seed deciding which
+    LLM_FAKE_LATENCY = float(os.getenv("LLM_FAKE_LATENCY", "0.05"))
+    LLM_FAKE_CHUNK_DELAY = float(os.getenv("LLM_FAKE_CHUNK_DELAY", "0.002"))
+    LLM_FAKE_ERROR_RATE = float(os.getenv("LLM_FAKE_ERROR_RATE", "0"))
+    LLM_FAKE_ERROR_STATUS = int(os.getenv("LLM_FAKE_ERROR_STATUS", "503"))
+    LLM_FAKE_SEED = int(os.getenv("LLM_FAKE_SEED", "0"))
+
+    # Shared OpenAI HTTP client: pooled keep-alive connections, HTTP/2 if h2 is installed
+    OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))
+    OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+    OPENAI_MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", "10"))
+    OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "30"))
+    OPENAI_HTTP2 = os.getenv("OPENAI_HTTP2", "1") == "1"
+    # Open connections to the configured LLM providers when a server process starts (run.py,
+    # also under gunicorn, and api/index.py). Off by default in production, where each
+    # serverless cold start would pay for it; GET /warmup warms them regardless.
+    OPENAI_PREWARM = os.getenv("OPENAI_PREWARM", "0" if FLASK_ENV == "production" else "1") == "1"
+    # Seconds GET /warmup waits on each provider's connection warm-up
+    WARMUP_LLM_TIMEOUT = float(os.getenv("WARMUP_LLM_TIMEOUT", "2.5"))
+
+    # LLM call deadlines (seconds, retries included). By default each endpoint may use
+    # the function's max duration minus headroom for the rest of the request.
+    SERVERLESS_MAX_DURATION = float(os.getenv("SERVERLESS_MAX_DURATION", "10" if FLASK_ENV == "production" else "60"))
+    LLM_DEADLINE_HEADROOM = float(os.getenv("LLM_DEADLINE_HEADROOM", "1.5"))
+    LLM_DEADLINE_ANALYSIS = float(os.getenv("LLM_DEADLINE_ANALYSIS", "0")) or SERVERLESS_MAX_DURATION - LLM_DEADLINE_HEADROOM
+    LLM_DEADLINE_COVER_LETTER = float(os.getenv("LLM_DEADLINE_COVER_LETTER", "0")) or SERVERLESS_MAX_DURATION - LLM_DEADLINE_HEADROOM
+    LLM_DEADLINE_CAREER_ADVICE = float(os.getenv("LLM_DEADLINE_CAREER_ADVICE", "0")) or SERVERLESS_MAX_DURATION - LLM_DEADLINE_HEADROOM
+    # Retries on 429 / 5xx / timeouts, with full-jitter exponential backoff
+    LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "3"))
+    LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+    LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "4"))
+    # Circuit breaker: consecutive failures before failing fast, and seconds until a probe call
+    LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+    LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))
+
+    # LLM result cache: memory (per process), sql (shared via the database), redis or none
+    LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "sql" if FLASK_ENV == "production" else "memory")
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+    LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(30 * 24 * 3600)))
+    LLM_CACHE_REDIS_URL = os.getenv("LLM_CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+    # Cover letters generated per completion call; regenerate clicks are served from this pool
+    COVER_LETTER_VARIANTS = int(os.getenv("COVER_LETTER_VARIANTS", "3"))
+
+    # Skill taxonomy source and its compiled, memory-mapped index. The bundled index is
+    # built with `python -m services.taxonomy` and shipped with the app; a changed
+    # taxonomy is recompiled into SKILL_INDEX_PATH.
+    SKILL_TAXONOMY_PATH = os.getenv("SKILL_TAXONOMY_PATH", os.path.join(BASE_DIR, "data", "skills_taxonomy.json"))
+    SKILL_INDEX_BUNDLED_PATH = os.getenv("SKILL_INDEX_BUNDLED_PATH", os.path.join(BASE_DIR, "data", "skills_taxonomy.idx"))
+    if FLASK_ENV == "production":
+        SKILL_INDEX_PATH = os.getenv("SKILL_INDEX_PATH", "/tmp/skills_taxonomy.idx")
+    else:
+        SKILL_INDEX_PATH = os.getenv("SKILL_INDEX_PATH", os.path.join(BASE_DIR, "data", "skills_taxonomy.idx"))
+    SKILL_RELOAD_INTERVAL = float(os.getenv("SKILL_RELOAD_INTERVAL", "5"))
+
+    # PDF extraction: page cap, and page-parallel extraction for long documents
+    # (command line and bulk imports only; web requests extract serially)
+    PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "50"))
+    PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "16"))
+    PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "0"))
+
+    # Tokens of normalized, compressed resume text sent with each prompt
+    ANALYSIS_TOKEN_BUDGET = int(os.getenv("ANALYSIS_TOKEN_BUDGET", "700"))
+    COVER_LETTER_TOKEN_BUDGET = int(os.getenv("COVER_LETTER_TOKEN_BUDGET", "400"))
+    CAREER_ADVICE_TOKEN_BUDGET = int(os.getenv("CAREER_ADVICE_TOKEN_BUDGET", "800"))
+    # Scoring rubric sent with each analysis: full, or compact (about a fifth of the prompt tokens)
+    ANALYSIS_RUBRIC = os.getenv("ANALYSIS_RUBRIC", "full")
+    # Serve the local rubric score (services/ats_scorer.py) when the AI analysis fails
+    ANALYSIS_LOCAL_FALLBACK = os.getenv("ANALYSIS_LOCAL_FALLBACK", "1") == "1"
+
+    # Resume analysis jobs:
+    #   thread - in-process worker pool (long-running servers)
+    #   db     - jobs wait in the resume table; run by `python -m services.analysis_queue`
+    #            or a scheduled GET /tasks/drain-analysis (serverless, where background
+    #            threads are frozen)
+    #   inline - analyze inside the upload request
+    ANALYSIS_QUEUE_MODE = os.getenv("ANALYSIS_QUEUE_MODE", "db" if FLASK_ENV == "production" else "thread")
+    ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "4"))
+    ANALYSIS_JOB_TIMEOUT = int(os.getenv("ANALYSIS_JOB_TIMEOUT", "300"))
+    # Seconds one /tasks/drain-analysis call may run; batches that could overrun it are not started
+    ANALYSIS_DRAIN_BUDGET = float(os.getenv("ANALYSIS_DRAIN_BUDGET", "0")) or SERVERLESS_MAX_DURATION - 0.5
+    # Bearer token required on /tasks/* (always required in production)
+    CRON_SECRET = os.getenv("CRON_SECRET")
+    # Thread mode: characters read from a new upload before its analysis job starts.
+    # Longer documents are analyzed from these first pages while the rest is extracted.
+    ANALYSIS_TEXT_BUDGET = int(os.getenv("ANALYSIS_TEXT_BUDGET", "8000"))
+
+    # Limits of the /resume/import ZIP route, which parses within one request (serverless-sized
+    # in production; larger imports go through `python -m services.bulk_ingest`)
+    BULK_IMPORT_MAX_FILES = int(os.getenv("BULK_IMPORT_MAX_FILES", "100" if FLASK_ENV == "production" else "2000"))
+    BULK_IMPORT_MAX_BYTES = int(os.getenv("BULK_IMPORT_MAX_BYTES", str(
+        (50 if FLASK_ENV == "production" else 500) * 1024 ** 2)))
+    # Seconds of parsing per request; files left over are reported as skipped
+    BULK_IMPORT_TIME_BUDGET = float(os.getenv("BULK_IMPORT_TIME_BUDGET", "0")) or SERVERLESS_MAX_DURATION - 2
+    # Parser processes for the route; production parses in-process (no /dev/shm on Lambda)
+    BULK_IMPORT_WORKERS = int(os.getenv("BULK_IMPORT_WORKERS", "1" if FLASK_ENV == "production" else "0")) or None
+
+    # Bulk re-analysis of stale analyses (services/reanalysis.py)
+    REANALYSIS_CONCURRENCY = int(os.getenv("REANALYSIS_CONCURRENCY", "4"))
+    REANALYSIS_PAGE_SIZE = int(os.getenv("REANALYSIS_PAGE_SIZE", "200"))
+    # Resumes whose compressed text fits in REANALYSIS_PACK_MAX_TOKENS are analyzed up to REANALYSIS_PACK_SIZE per request
+    REANALYSIS_PACK_SIZE = int(os.getenv("REANALYSIS_PACK_SIZE", "4"))
+    REANALYSIS_PACK_MAX_TOKENS = int(os.getenv("REANALYSIS_PACK_MAX_TOKENS", "400"))
+    # Offline job, so not bound by the serverless max duration
+    LLM_DEADLINE_REANALYSIS = float(os.getenv("LLM_DEADLINE_REANALYSIS", "180"))
+
+    # Jinja bytecode cache (services/template_cache.py); precompile with `python -m services.template_cache`
+    JINJA_BYTECODE_CACHE = os.getenv("JINJA_BYTECODE_CACHE", "1") == "1"
+    JINJA_CACHE_DIR = os.getenv("JINJA_CACHE_DIR", os.path.join(BASE_DIR, "template_cache"))
+
+    # Request timing (services/metrics.py): Server-Timing headers and a Prometheus /metrics endpoint
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+    METRICS_SERVER_TIMING = os.getenv("METRICS_SERVER_TIMING", "1") == "1"
+    # When set, /metrics requires "Authorization: Bearer <token>"; in production it is only served with one
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+    # Structured logging (services/log.py)
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG" if FLASK_ENV == "development" else "INFO")
+    # json, or text for readable local output
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+    # Share of DEBUG/INFO records kept (per request); warnings and errors are always kept
+    LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+    # Write from a background thread through a bounded queue (records beyond LOG_QUEUE_SIZE are dropped)
+    LOG_ASYNC = os.getenv("LOG_ASYNC", "1") == "1"
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    LOG_MAX_FIELD_CHARS = int(os.getenv("LOG_MAX_FIELD_CHARS", "2000"))
+    LOG_MAX_LINE_BYTES = int(os.getenv("LOG_MAX_LINE_BYTES", "8192"))
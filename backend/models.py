@@ -13,9 +13,13 @@ class User(UserMixin, db.Model):
 class Resume(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(300), nullable=False)
+    content_hash = db.Column(db.String(64), index=True)  # sha256 of the uploaded file
     text = db.Column(db.Text)            # extracted full text
     parsed_data = db.Column(db.JSON)     # optional structured parse (skills, edu, exp)
     analysis = db.Column(db.JSON)        # AI analysis results (score, suggestions)
+    analysis_status = db.Column(db.String(20), index=True)  # pending/running/done/failed, None for legacy rows
+    analysis_started_at = db.Column(db.DateTime)
+    analysis_version = db.Column(db.String(100), index=True)  # prompt/rubric/model of a complete AI analysis
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -26,6 +30,14 @@ class CoverLetter(db.Model):
     resume_id = db.Column(db.Integer, db.ForeignKey('resume.id'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+class LLMCacheEntry(db.Model):
+    __tablename__ = "llm_cache"
+    key = db.Column(db.String(200), primary_key=True)  # kind:prompt_version:model:sha256
+    value = db.Column(db.JSON)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    expires_at = db.Column(db.DateTime, index=True)
+    counter = db.Column(db.Integer)  # llm_cache.SQLCache.incr(), e.g. claimed cover letter variants
+
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
@@ -0,0 +1,80 @@
+from flask import Blueprint, render_template, request
+from flask_login import current_user
+from models import Resume
+from services.ai_service import generate_career_advice, stream_career_advice
+from services.llm_call import LLMCallError
+from services.log import get_logger
+from services.sse import sse_event, sse_response
+
+career_bp = Blueprint('career', __name__, template_folder='../templates')
+logger = get_logger(__name__)
+
+# Career Advice route - supports both standalone and resume-based advice
+@career_bp.route("/career_advice", methods=["GET", "POST"])
+def career_advice():
+    advice = None
+    resume_text = ""
+    interests = ""
+    user_resumes = []
+    has_resumes = False
+    selected_resume = None
+
+    # Get user's resumes if logged in
+    if current_user.is_authenticated:
+        user_resumes = Resume.query.filter_by(user_id=current_user.id).all()
+        has_resumes = len(user_resumes) > 0
+
+        # Check if user selected a resume to auto-fill
+        resume_id = request.args.get('resume_id')
+        if resume_id:
+            selected_resume = Resume.query.filter_by(id=resume_id, user_id=current_user.id).first()
+            if selected_resume:
+                resume_text = selected_resume.text or ""
+
+    # Handle form submission
+    if request.method == "POST":
+        resume_text = request.form.get("resume_text", "")
+        interests = request.form.get("interests", "")
+
+        # Generate AI-powered career advice
+        if resume_text.strip():
+            try:
+                advice = generate_career_advice(resume_text, interests)
+            except LLMCallError as e:
+                advice = f"Sorry, we couldn't generate career advice at this time. {e}"
+        else:
+            advice = "Please provide your resume text or key skills to receive personalized career advice."
+
+    return render_template(
+        "career_advice.html",
+        advice=advice,
+        resume_text=resume_text,
+        interests=interests,
+        user_resumes=user_resumes,
+        has_resumes=has_resumes,
+        selected_resume=selected_resume
+    )
+
+@career_bp.route("/career_advice/stream", methods=["POST"])
+def career_advice_stream():
+    resume_text = request.form.get("resume_text", "")
+    interests = request.form.get("interests", "")
+
+    def events():
+        if not resume_text.strip():
+            yield sse_event("error", {"message": "Please provide your resume text or key skills to receive personalized career advice."})
+            return
+        try:
+            for delta in stream_career_advice(resume_text, interests):
+                yield sse_event("token", {"text": delta})
+        except LLMCallError as e:
+            yield sse_event("error", {"message": f"Sorry, we couldn't generate career advice at this time. {e}"})
+            return
+        except Exception:
+            # Once streaming has started the response cannot become a 500; end it with an event
+            logger.exception("Career advice stream failed")
+            yield sse_event("error", {"message": "Sorry, we couldn't generate career advice at this time. Please try again."})
+            return
+        yield sse_event("done", {})
+
+    return sse_response(events())
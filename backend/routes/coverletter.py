@@ -2,10 +2,15 @@ from flask import Blueprint, request, render_template, redirect, url_for, flash,
 from flask_login import login_required, current_user
 from models import Resume, CoverLetter
 from extensions import db
-from services.ai_service import generate_cover_letter
+from services.ai_service import generate_cover_letter, stream_cover_letter
+from services.llm_call import LLMCallError
+from services.log import get_logger
+from services.metrics import stage
+from services.sse import sse_event, sse_response
 import io
 
 coverletter_bp = Blueprint('coverletter', __name__, url_prefix='/coverletter', template_folder='../templates')
+logger = get_logger(__name__)
 
 @coverletter_bp.route('/create/<int:resume_id>', methods=['GET','POST'])
 @login_required
@@ -14,13 +19,51 @@ def create_coverletter(resume_id):
     if request.method == 'POST':
         job_title = request.form['job_title']
         tone = request.form.get('tone', 'professional')
-        content = generate_cover_letter(resume.text, resume.parsed_data or {}, job_title, tone)
+        try:
+            content = generate_cover_letter(resume.text, resume.parsed_data or {}, job_title, tone)
+        except LLMCallError as e:
+            flash(f"Could not generate cover letter: {e}", "danger")
+            return redirect(url_for('coverletter.create_coverletter', resume_id=resume.id))
         cl = CoverLetter(title=f"{job_title} - Cover Letter", content=content, resume_id=resume.id)
-        db.session.add(cl); db.session.commit()
+        with stage("db_commit"):
+            db.session.add(cl); db.session.commit()
         flash("Cover letter generated!", "success")
         return redirect(url_for('dashboard.home'))
     return render_template('coverletter.html', resume=resume)
 
+@coverletter_bp.route('/stream/<int:resume_id>', methods=['POST'])
+@login_required
+def stream_coverletter(resume_id):
+    """
+    Streams the letter as Server-Sent Events: "token" events carry text deltas,
+    "done" follows once the complete letter has been saved, "error" on failure.
+    """
+    resume = Resume.query.filter_by(id=resume_id, user_id=current_user.id).first_or_404()
+    job_title = request.form['job_title']
+    tone = request.form.get('tone', 'professional')
+
+    def events():
+        parts = []
+        try:
+            for delta in stream_cover_letter(resume.text, resume.parsed_data or {}, job_title, tone):
+                parts.append(delta)
+                yield sse_event("token", {"text": delta})
+            cl = CoverLetter(title=f"{job_title} - Cover Letter", content="".join(parts), resume_id=resume.id)
+            with stage("db_commit"):
+                db.session.add(cl); db.session.commit()
+        except LLMCallError as e:
+            yield sse_event("error", {"message": f"Could not generate cover letter: {e}"})
+            return
+        except Exception:
+            # Headers are long gone: a dropped provider stream or a failed save must still end with an event
+            logger.exception("Cover letter stream failed", extra={"resume_id": resume.id, "chars": sum(map(len, parts))})
+            db.session.rollback()
+            yield sse_event("error", {"message": "Could not generate cover letter. Please try again."})
+            return
+        yield sse_event("done", {"cover_id": cl.id, "redirect": url_for('dashboard.home')})
+
+    return sse_response(events())
+
 @coverletter_bp.route('/download/<int:cover_id>')
 @login_required
 def download_coverletter(cover_id):
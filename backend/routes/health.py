@@ -0,0 +1,47 @@
+from flask import Blueprint, current_app, jsonify
+from sqlalchemy import text
+from extensions import db
+import time
+
+health_bp = Blueprint('health', __name__)
+
+# Set once this process has been warmed; later warm-up calls only ping the database
+_warmed = False
+
+
+@health_bp.route('/healthz')
+def healthz():
+    return jsonify({"status": "ok"})
+
+
+@health_bp.route('/warmup')
+def warmup():
+    """
+    Loads what the first real request would otherwise pay for: a database
+    connection, compiled templates, the parser's PDF/DOCX libraries, the
+    skill index and connections to the LLM providers. Cheap once warm, so it
+    can be pinged on a schedule or right after a deploy.
+    """
+    global _warmed
+    timings = {}
+
+    def step(name, fn):
+        started = time.perf_counter()
+        fn()
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    step("db", lambda: db.session.execute(text("SELECT 1")))
+    cold = not _warmed
+    if cold:
+        from services.llm_providers import warm_providers
+        from services.parser import preload
+        from services.taxonomy import get_skill_index
+        from services.template_cache import compile_templates
+
+        step("templates", lambda: compile_templates(current_app))
+        step("parser", preload)
+        step("skills", get_skill_index)
+        # Bounded well inside the function's time limit; a slow provider is simply left cold
+        step("llm", lambda: warm_providers(background=False, timeout=current_app.config['WARMUP_LLM_TIMEOUT']))
+        _warmed = True
+    return jsonify({"status": "ok", "cold": cold, "ms": timings})
@@ -1,13 +1,22 @@
-from flask import Blueprint, request, current_app, redirect, url_for, render_template, flash
+from flask import Blueprint, request, current_app, redirect, url_for, render_template, flash, Response, stream_with_context, jsonify
 from flask_login import login_required, current_user
-from services.storage import allowed_file, save_upload
-from services.parser import parse_resume_file
-from services.ai_service import analyze_resume_text
+from services.storage import allowed_file, save_upload, hash_content, find_parsed_upload
+from werkzeug.utils import secure_filename
+from services.parser import parse_resume_file, parse_resume_text, parser_version, read_text_prefix
+from services import analysis_queue, bulk_ingest
+from services.metrics import stage
+from services.log import get_logger
 from extensions import db
 from models import Resume
-import traceback
+import json
+import os
+import shutil
+import tempfile
+import time
+import zipfile
 
 resume_bp = Blueprint('resume', __name__, url_prefix='/resume', template_folder='../templates')
+logger = get_logger(__name__)
 
 @resume_bp.route('/upload', methods=['GET', 'POST'])
 @login_required
@@ -18,38 +27,121 @@ def upload_resume():
             flash("Please upload a PDF or DOCX file", "danger")
             return redirect(url_for('resume.upload_resume'))
         
-        # Save uploaded file
-        filename, path = save_upload(file, current_app.config['UPLOAD_FOLDER'])
+        # Parse straight from the uploaded bytes; keeping the file on disk is optional
+        data = memoryview(file.read())
+        filename = secure_filename(file.filename)
+        with stage("save_upload"):
+            if current_app.config['PERSIST_UPLOADS']:
+                content_hash, _path = save_upload(data, filename, current_app.config['UPLOAD_FOLDER'])
+            else:
+                content_hash = hash_content(data)
         
-        # Parse resume file content
-        raw_text, parsed_data = parse_resume_file(path, filename)
+        # Identical files were already parsed once by this parser and taxonomy; reuse that result
+        with stage("dedupe"):
+            known = find_parsed_upload(content_hash, parser_version())
+        complete = True
+        if known:
+            raw_text, parsed_data = known
+        elif current_app.config['ANALYSIS_QUEUE_MODE'] == "thread":
+            # Start the analysis job on the first pages; the prompt only sees a compressed snippet
+            with stage("extract_prefix"):
+                raw_text, complete = read_text_prefix(data, filename, current_app.config['ANALYSIS_TEXT_BUDGET'])
+            parsed_data = parse_resume_text(raw_text)
+            if not complete:
+                # Never reused by find_parsed_upload until the full parse replaces it
+                parsed_data["complete"] = False
+        else:
+            raw_text, parsed_data = parse_resume_file(data, filename)
         
-        # AI analysis on parsed resume text
-        try:
-            analysis = analyze_resume_text(raw_text, parsed_data)
-            # Debug prints
-            print("[DEBUG] AI analysis result:", analysis)
-        except Exception as e:
-            analysis = {"error": str(e)}
-            print("[ERROR] AI analysis failed:", e)
-            traceback.print_exc()
-        
-        # Save resume record in DB
+        # Save resume record in DB; the AI analysis runs as a background job
         resume = Resume(
             filename=filename,
+            content_hash=content_hash,
             text=raw_text,
             parsed_data=parsed_data,
-            analysis=analysis,
+            analysis_status=analysis_queue.PENDING,
             user_id=current_user.id
         )
         db.session.add(resume)
-        db.session.commit()
+        with stage("db_commit"):
+            db.session.commit()
+        with stage("enqueue"):
+            analysis_queue.enqueue(current_app._get_current_object(), resume.id)
+
+        if not complete:
+            # The rest of a long document is extracted for storage while the job runs
+            resume_id = resume.id
+            try:
+                raw_text, parsed_data = parse_resume_file(data, filename)
+                resume.text = raw_text
+                resume.parsed_data = parsed_data
+                with stage("db_commit"):
+                    db.session.commit()
+            except Exception:
+                # The row keeps the first pages, still marked incomplete
+                db.session.rollback()
+                logger.exception("Full resume parse failed", extra={"resume_id": resume_id, "upload_name": filename})
 
-        flash("Resume uploaded and analyzed successfully!", "success")
+        if current_app.config['ANALYSIS_QUEUE_MODE'] == "inline":
+            flash("Resume uploaded and analyzed successfully!", "success")
+        else:
+            flash("Resume uploaded! Your analysis is being prepared and will appear shortly.", "success")
         return redirect(url_for('dashboard.home'))
     
     return render_template('upload.html')
 
+@resume_bp.route('/import', methods=['POST'])
+@login_required
+def import_zip():
+    """
+    Bulk import from a small ZIP of PDF/DOCX resumes (see services/bulk_ingest.py).
+    Streams one JSON line per file as it is parsed, then a summary line.
+    Rows are inserted in batches and queued for analysis.
+    """
+    file = request.files.get('archive')
+    if not file or not file.filename.lower().endswith('.zip'):
+        flash("Please upload a ZIP archive of PDF or DOCX files", "danger")
+        return redirect(url_for('resume.upload_resume'))
+
+    # The whole request, extraction included, has to fit in the function's time limit
+    deadline = time.monotonic() + current_app.config['BULK_IMPORT_TIME_BUDGET']
+    tmp_dir = tempfile.mkdtemp(prefix="import_")
+    try:
+        archive_path = os.path.join(tmp_dir, "upload.zip")
+        file.save(archive_path)
+        extract_dir = os.path.join(tmp_dir, "files")
+        os.makedirs(extract_dir)
+        paths = bulk_ingest.extract_zip(
+            archive_path, extract_dir,
+            current_app.config['BULK_IMPORT_MAX_FILES'],
+            current_app.config['BULK_IMPORT_MAX_BYTES'],
+        )
+    except (ValueError, zipfile.BadZipFile) as e:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        flash(f"Could not import archive: {e}", "danger")
+        return redirect(url_for('resume.upload_resume'))
+
+    workers = current_app.config['BULK_IMPORT_WORKERS']
+    user_id = current_user.id
+
+    def generate():
+        ok = failed = skipped = 0
+        try:
+            results = bulk_ingest.ingest(bulk_ingest.parse_many(paths, workers=workers, deadline=deadline), user_id)
+            for result in results:
+                if result["ok"]:
+                    ok += 1
+                elif result.get("skipped"):
+                    skipped += 1
+                else:
+                    failed += 1
+                yield bulk_ingest.result_to_jsonl(result, hide=("text", "file"))
+            yield json.dumps({"summary": True, "imported": ok, "failed": failed, "skipped": skipped}) + "\n"
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @resume_bp.route('/<int:resume_id>/view')
 @login_required
 def view_resume(resume_id):
@@ -60,6 +152,38 @@ def view_resume(resume_id):
         return redirect(url_for('dashboard.home'))
     return render_template('resume_view.html', resume=resume)
 
+@resume_bp.route('/<int:resume_id>/status')
+@login_required
+def analysis_status(resume_id):
+    """Polled by the dashboard while an analysis job is pending or running. Never runs the job itself."""
+    resume = Resume.query.get_or_404(resume_id)
+    if resume.user_id != current_user.id:
+        return jsonify({"error": "Unauthorized"}), 403
+    if resume.analysis_status in (analysis_queue.PENDING, analysis_queue.RUNNING):
+        analysis_queue.kick(current_app._get_current_object(), resume.id)
+    analysis = resume.analysis or {}
+    return jsonify({
+        "id": resume.id,
+        "status": resume.analysis_status or analysis_queue.DONE,
+        "score": analysis.get("score"),
+        "error": analysis.get("error"),
+    })
+
+@resume_bp.route('/<int:resume_id>/reanalyze', methods=['POST'])
+@login_required
+def reanalyze_resume(resume_id):
+    """Queues a fresh analysis of the stored text, e.g. after a failed or truncated one."""
+    resume = Resume.query.get_or_404(resume_id)
+    if resume.user_id != current_user.id:
+        flash('Unauthorized', 'danger')
+        return redirect(url_for('dashboard.home'))
+    resume.analysis = None
+    resume.analysis_status = analysis_queue.PENDING
+    db.session.commit()
+    analysis_queue.enqueue(current_app._get_current_object(), resume.id)
+    flash('Analysis restarted.', 'info')
+    return redirect(url_for('resume.view_resume', resume_id=resume.id))
+
 @resume_bp.route('/<int:resume_id>/delete', methods=['POST'])
 @login_required
 def delete_resume(resume_id):
@@ -0,0 +1,29 @@
+from flask import Blueprint, abort, current_app, jsonify, request
+from services import analysis_queue
+import hmac
+import time
+
+tasks_bp = Blueprint('tasks', __name__, url_prefix='/tasks')
+
+
+def _authorized():
+    """Scheduled calls carry "Authorization: Bearer <CRON_SECRET>" (Vercel Cron sends it when CRON_SECRET is set)."""
+    secret = current_app.config.get('CRON_SECRET')
+    if not secret:
+        # Open locally; in production the task only runs with a secret configured
+        return current_app.config.get('FLASK_ENV') != "production"
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    return hmac.compare_digest(supplied.encode("utf-8"), secret.encode("utf-8"))
+
+
+@tasks_bp.route('/drain-analysis', methods=['GET', 'POST'])
+def drain_analysis():
+    """
+    Runs pending analysis jobs (db queue mode) for up to ANALYSIS_DRAIN_BUDGET
+    seconds; meant to be hit by a scheduler such as Vercel Cron.
+    """
+    if not _authorized():
+        abort(403)
+    deadline = time.monotonic() + current_app.config['ANALYSIS_DRAIN_BUDGET']
+    done = analysis_queue.drain(deadline=deadline)
+    return jsonify({"processed": done})
@@ -9,6 +9,7 @@ if backend_dir not in sys.path:
 try:
     from app import create_app
     from extensions import db
+    from schema import upgrade_schema
 except ImportError as e:
     print(f"Import error: {e}")
     print(f"Current directory: {os.getcwd()}")
@@ -17,8 +18,13 @@ except ImportError as e:
 
 app = create_app()
 
+# Open the LLM providers' connection pools while the server starts up
+if app.config.get('OPENAI_PREWARM'):
+    from services.llm_providers import warm_providers
+    warm_providers()
+
 if __name__ == "__main__":
     with app.app_context():
-        db.create_all()
+        upgrade_schema(db)
     print("Starting Flask application on http://127.0.0.1:5000")
     app.run(debug=True)
@@ -0,0 +1,61 @@
+"""
+Additive schema migrations.
+
+Run once per deploy, before traffic reaches the new version, rather than on
+every cold start:
+
+    cd backend && DATABASE_URL=... python -m schema
+
+The app only upgrades the schema itself at start-up when
+SCHEMA_UPGRADE_ON_START is set (the default for local SQLite databases).
+"""
+from sqlalchemy import inspect, text
+
+
+def upgrade_schema(db):
+    """
+    Creates missing tables, then adds columns and indexes that were added to
+    the models after a table was first created. Only additive changes are
+    applied, so new columns must be nullable. Returns a description of each change.
+    """
+    engine = db.engine
+    inspector = inspect(engine)
+    changes = [f"create table {name}" for name in db.metadata.tables if not inspector.has_table(name)]
+    db.create_all()
+    inspector = inspect(engine)
+    quote = engine.dialect.identifier_preparer.quote
+    for table in db.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing = [column for column in table.columns if column.name not in existing]
+        with engine.begin() as conn:
+            for column in missing:
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column_type}"))
+                changes.append(f"add column {table.name}.{column.name}")
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(bind=engine)
+                changes.append(f"create index {index.name}")
+    return changes
+
+
+def main(argv=None):
+    import argparse
+
+    argparse.ArgumentParser(description="Apply additive schema changes to the configured database.").parse_args(argv)
+
+    from app import create_app
+    from extensions import db
+
+    app = create_app()
+    with app.app_context():
+        changes = upgrade_schema(db)
+    for change in changes:
+        print(change)
+    print(f"Schema up to date ({len(changes)} changes applied)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
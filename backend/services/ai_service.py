@@ -1,107 +1,144 @@
-import os
-from flask import current_app
+import threading
 import json
-
-def get_openai_client():
-    """Initialize OpenAI client with proper error handling"""
-    try:
-        from openai import OpenAI
-    except ImportError:
-        raise ImportError("OpenAI package not installed. Run: pip install openai>=1.30.0")
-    
-    api_key = current_app.config.get('OPENAI_API_KEY')
-    flask_env = current_app.config.get('FLASK_ENV', 'development')
-    
-    # Debug logging only in development
-    if flask_env == 'development':
-        print(f"[DEBUG AI_SERVICE] API Key from config: {api_key[:20] if api_key else 'None'}...")
-        print(f"[DEBUG AI_SERVICE] API Key length: {len(api_key) if api_key else 0}")
-    
-    if not api_key or api_key == 'your_openai_api_key_here' or len(api_key) < 20:
-        if flask_env == 'development':
-            print("[ERROR AI_SERVICE] Invalid or missing API key!")
-        raise ValueError("OPENAI_API_KEY not configured. Please set it in your environment variables with a valid API key.")
-    
-    try:
-        # Initialize client with minimal parameters to avoid compatibility issues
-        if flask_env == 'development':
-            print("[DEBUG AI_SERVICE] Creating OpenAI client...")
-        client = OpenAI(api_key=api_key)
-        if flask_env == 'development':
-            print("[DEBUG AI_SERVICE] OpenAI client created successfully!")
-        return client
-    except TypeError as e:
-        # Handle version compatibility issues
-        if 'proxies' in str(e):
-            raise ValueError(
-                "OpenAI package version mismatch. Please upgrade:\n"
-                "1. Run: pip uninstall openai\n"
-                "2. Run: pip install openai>=1.30.0\n"
-                "3. Restart the application"
-            )
-        raise
-
-def analyze_resume_text(raw_text, parsed_data):
+from config import Config
+from services.llm_cache import build_cache, make_cache_key
+from services.llm_call import CircuitOpenError, LLMCallError, call_llm
+from services.llm_providers import get_route
+from services.log import get_logger
+from services.parser import compress_for_prompt
+from services.structured_output import (ANALYSIS_RESPONSE_FORMAT, AnalysisFormatError,
+                                        StreamingJSONParser, parse_analysis)
+from services.tokens import ledger
+
+logger = get_logger(__name__)
+
+# Settings come from Config rather than current_app, so analyses can run
+# in background workers outside any request or application context.
+
+# Providers and models are chosen per workload in Config (see services.llm_providers).
+# Bump whenever build_analysis_messages or a rubric changes so cached analyses are not reused
+ANALYSIS_PROMPT_VERSION = "5"
+COVER_LETTER_PROMPT_VERSION = "2"
+CAREER_ADVICE_PROMPT_VERSION = "2"
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+def get_llm_cache():
+    """Returns the process-wide LLM result cache, built from Config on first use."""
+    global _llm_cache
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                def engine_factory():
+                    # A dedicated small pool, independent of any Flask app context
+                    from sqlalchemy import create_engine
+                    return create_engine(Config.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+
+                settings = {name: getattr(Config, name) for name in dir(Config) if name.isupper()}
+                _llm_cache = build_cache(settings, engine_factory)
+    return _llm_cache
+
+def analyze_resume_text(raw_text, parsed_data, rubric=None, on_field=None):
     """
-    Sends a prompt to OpenAI to analyze strengths/weaknesses, suggest roles,
+    Sends a prompt to the analysis provider to analyze strengths/weaknesses, suggest roles,
     missing skills, recommended certs/courses, and a resume score.
-    Returns structured JSON or raw text on failure.
+    Returns the validated analysis dict; on_field(key, value) is called as each
+    top-level field streams in (a cached analysis is returned without callbacks).
+    rubric picks the "full" or "compact" scoring rubric (default Config.ANALYSIS_RUBRIC).
+    Successful analyses are cached by normalized text hash, prompt version, rubric and model.
+    Raises CircuitOpenError while the provider is degraded, so callers can retry later.
+    Other failures return the local rubric score (services.ats_scorer) with a
+    "fallback_reason", or {"error": message} if ANALYSIS_LOCAL_FALLBACK is off.
+    """
+    rubric = rubric or Config.ANALYSIS_RUBRIC
+    if rubric not in ANALYSIS_RUBRICS:
+        raise ValueError(f"Unknown analysis rubric: {rubric}")
+    cache = get_llm_cache()
+    key = analysis_cache_key(raw_text, parsed_data, rubric)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    analysis = _request_analysis(raw_text, parsed_data, rubric, on_field)
+    if "error" in analysis:
+        if Config.ANALYSIS_LOCAL_FALLBACK:
+            return local_analysis(raw_text, parsed_data, fallback_reason=analysis["error"])
+        return analysis
+    if not analysis.get("truncated"):
+        cache.set(key, analysis)
+    return analysis
+
+def analysis_version(rubric=None):
+    """Identifies the prompt, rubric and model behind an analysis; stored as Resume.analysis_version."""
+    return f"{ANALYSIS_PROMPT_VERSION}-{rubric or Config.ANALYSIS_RUBRIC}:{get_route('analysis').cache_id}"
+
+def analysis_cache_key(raw_text, parsed_data, rubric):
+    return make_cache_key("analysis", f"{ANALYSIS_PROMPT_VERSION}-{rubric}", get_route("analysis").cache_id,
+                          raw_text, parsed_data.get("skills", []))
+
+def local_analysis(raw_text, parsed_data, fallback_reason=None):
+    """The deterministic local rubric score, shaped like an LLM analysis."""
+    from services.ats_scorer import score_resume
+
+    analysis = score_resume(raw_text, parsed_data)
+    if fallback_reason:
+        analysis["fallback_reason"] = fallback_reason
+    return analysis
+
+def _request_analysis(raw_text, parsed_data, rubric, on_field=None):
     """
+    Streams a schema-constrained analysis. on_field(key, value) is called for each
+    top-level field as soon as it is complete. A response cut off by max_tokens
+    or a dropped connection is repaired and marked "truncated" instead of failing.
+    """
+    messages = build_analysis_messages(raw_text, parsed_data, rubric)
+    route = get_route("analysis")
     try:
-        client = get_openai_client()
-        prompt = build_analysis_prompt(raw_text, parsed_data)
-        
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",  # Using more cost-effective model
-            messages=[{"role":"user","content":prompt}],
+        stream = call_llm("analysis", lambda timeout: route.chat(
+            messages,
             temperature=0.2,
-            max_tokens=1000
-        )
-        ans = response.choices[0].message.content
-        flask_env = current_app.config.get('FLASK_ENV', 'development')
-        
-        if flask_env == 'development':
-            print("[DEBUG] AI raw answer:", ans[:200])  # For debugging
-        
-        # Clean up the response - remove markdown code blocks if present
-        ans_cleaned = ans.strip()
-        if ans_cleaned.startswith("```json"):
-            ans_cleaned = ans_cleaned[7:]  # Remove ```json
-        elif ans_cleaned.startswith("```"):
-            ans_cleaned = ans_cleaned[3:]  # Remove ```
-        if ans_cleaned.endswith("```"):
-            ans_cleaned = ans_cleaned[:-3]  # Remove trailing ```
-        ans_cleaned = ans_cleaned.strip()
-        
-        try:
-            parsed_json = json.loads(ans_cleaned)
-            if flask_env == 'development':
-                print("[DEBUG] Successfully parsed JSON analysis")
-            return parsed_json
-        except json.JSONDecodeError as e:
-            if flask_env == 'development':
-                print("[ERROR] JSON decoding failed:", e)
-                print("[ERROR] Cleaned response:", ans_cleaned[:200])
-            # Try to extract JSON from the response
-            import re
-            json_match = re.search(r'\{.*\}', ans_cleaned, re.DOTALL)
-            if json_match:
-                try:
-                    parsed_json = json.loads(json_match.group(0))
-                    if flask_env == 'development':
-                        print("[DEBUG] Successfully extracted and parsed JSON")
-                    return parsed_json
-                except:
-                    pass
-            if flask_env == 'development':
-                print("[ERROR] Returning raw AI response instead of JSON")
-            return {"raw_response": ans}
-    except Exception as e:
-        flask_env = current_app.config.get('FLASK_ENV', 'development')
-        if flask_env == 'development':
-            print("[ERROR] OpenAI API call failed:", e)
+            max_tokens=1000,
+            response_format=ANALYSIS_RESPONSE_FORMAT,
+            stream=True,
+            stream_options={"include_usage": True},
+            timeout=timeout
+        ), provider=route.provider.name, stream=True)
+    except CircuitOpenError:
+        raise
+    except LLMCallError as e:
+        logger.warning("LLM call failed", extra={"endpoint": "analysis", "error": repr(e.__cause__ or e)})
         return {"error": str(e)}
 
+    parser = StreamingJSONParser()
+    usage = None
+    finish_reason = None
+    interrupted = False
+    try:
+        for chunk in stream:
+            usage = getattr(chunk, "usage", None) or usage
+            if not chunk.choices:
+                continue
+            finish_reason = chunk.choices[0].finish_reason or finish_reason
+            delta = chunk.choices[0].delta.content
+            if delta:
+                for key, value in parser.feed(delta):
+                    if on_field is not None:
+                        on_field(key, value)
+    except Exception as e:
+        # Keep whatever arrived; repair below decides whether it is usable
+        logger.warning("Analysis stream interrupted", extra={"error": repr(e), "received_chars": len(parser.buffer)})
+        interrupted = True
+    ledger.record(f"analysis:{rubric}", messages, parser.buffer, usage)
+
+    try:
+        analysis, repaired = parse_analysis(parser.buffer)
+    except AnalysisFormatError as e:
+        logger.warning("Unusable analysis response", extra={"error": str(e), "response_head": parser.buffer[:200]})
+        return {"error": "The AI service returned an incomplete analysis. Please retry."}
+    if repaired or interrupted or finish_reason == "length":
+        analysis["truncated"] = True
+    return analysis
+
 
 # def build_analysis_prompt(raw_text, parsed_data):
 #     skills = parsed_data.get("skills", [])
@@ -169,12 +206,10 @@ def analyze_resume_text(raw_text, parsed_data):
 #     return prompt
 
 
-def build_analysis_prompt(raw_text, parsed_data):
-    skills = parsed_data.get("skills", [])
-    snippet = raw_text[:2500]  # increased for better analysis
-    
-    prompt = f"""
-You are an advanced ATS (Applicant Tracking System) with machine learning capabilities, designed to evaluate resumes with the same rigor as Fortune 500 companies' hiring systems. Your evaluation must be HIGHLY DISCRIMINATING and reflect real-world hiring standards.
+# The analysis instructions are static and go first, as the system message,
+# so every analysis request starts with the same bytes and the provider can
+# serve that prefix from its prompt cache. Only the user message varies.
+ANALYSIS_RUBRIC_FULL = """You are an advanced ATS (Applicant Tracking System) with machine learning capabilities, designed to evaluate resumes with the same rigor as Fortune 500 companies' hiring systems. Your evaluation must be HIGHLY DISCRIMINATING and reflect real-world hiring standards.
 
 **CRITICAL EVALUATION FRAMEWORK:**
 
@@ -304,13 +339,6 @@ You MUST analyze the resume across MULTIPLE dimensions and calculate scores inde
 
 ═══════════════════════════════════════════════════════════════════════════
 
-**RESUME TO ANALYZE:**
-{snippet}
-
-**DETECTED SKILLS:** {skills if skills else 'None detected - MAJOR RED FLAG'}
-
-═══════════════════════════════════════════════════════════════════════════
-
 **SCORING CALIBRATION - YOU MUST FOLLOW THIS:**
 
 **Score 0-25:** Completely inadequate resume
@@ -394,9 +422,9 @@ You MUST analyze the resume across MULTIPLE dimensions and calculate scores inde
 
 Return ONLY a valid JSON object (no markdown, no code blocks) with these keys:
 
-{{
+{
   "score": <integer 0-100>,
-  "score_breakdown": {{
+  "score_breakdown": {
     "format": <0-20>,
     "contact": <0-10>,
     "summary": <0-10>,
@@ -404,7 +432,7 @@ Return ONLY a valid JSON object (no markdown, no code blocks) with these keys:
     "skills": <0-15>,
     "education": <0-10>,
     "keywords": <0-10>
-  }},
+  },
   "deductions_applied": [
     "List each deduction applied with point value"
   ],
@@ -430,7 +458,7 @@ Return ONLY a valid JSON object (no markdown, no code blocks) with these keys:
   "quantifiable_achievements_count": <exact integer count>,
   "keyword_density": "<Low/Medium/High> - <count of industry-specific keywords found>",
   "overall_assessment": "<2-3 sentence honest evaluation of resume quality and competitiveness>"
-}}
+}
 
 **FINAL REMINDER:**
 - NO TWO RESUMES SHOULD GET THE SAME SCORE unless they are truly identical in quality
@@ -439,37 +467,178 @@ Return ONLY a valid JSON object (no markdown, no code blocks) with these keys:
 - Reserve high scores (75+) for genuinely impressive resumes
 - Calculate scores mathematically based on the rubric, don't guess
 """
-    return prompt
+
+ANALYSIS_RUBRIC_COMPACT = """You are a strict ATS resume evaluator. Score the resume in the user message against the rubric below. Scores must discriminate: most resumes land between 45 and 65, and 75+ is reserved for genuinely impressive resumes.
+
+RUBRIC (100 points):
+1. Format & structure (20): layout 8, section order 7, ATS compatibility 5. Tables, columns, graphics or image text score low.
+2. Contact (10): name, professional email, phone, location, LinkedIn/portfolio.
+3. Summary (10): specific achievements, years of experience and value proposition; generic or missing scores 0-4.
+4. Experience (25): quantified achievements 10 (5+ = 10, 3-4 = 8, 1-2 = 6, none = 0), action verbs and impact 8, relevance and progression 7.
+5. Skills (15): technical depth 8 (10+ relevant skills = 8), keyword optimization 7.
+6. Education & certifications (10): relevant degree plus certifications = 8-10, degree only = 6.
+7. Keywords (10): 20+ industry keywords = 10, 15-19 = 8, 10-14 = 6, 5-9 = 4, 1-4 = 2.
+
+DEDUCTIONS (apply all that match): no summary -8; no skills section -12; no education -8; no work experience -20; spelling or grammar errors -2 each (max -10 each); tables/columns/graphics -15; over 2 pages -8; under half a page -10; unprofessional email -5; no quantifiable achievements -12; vague descriptions -10; irrelevant experience -8; unexplained gaps -5; inconsistent dates -3; missing location/contact -5.
+
+Count quantifiable achievements exactly. Calculate each section independently and use the full 0-100 range.
+
+Return ONLY a valid JSON object (no markdown) with these keys:
+{"score": int 0-100, "score_breakdown": {"format": 0-20, "contact": 0-10, "summary": 0-10, "experience": 0-25, "skills": 0-15, "education": 0-10, "keywords": 0-10}, "deductions_applied": [str], "strengths": [3-6 str], "weaknesses": [3-6 str], "suggested_roles": [4-6 str], "missing_skills": [5-8 str], "recommended_courses_or_certs": [4-6 str], "concise_advice": [5-7 str, by priority], "ats_compatibility": "<Excellent/Good/Fair/Poor> - <reason>", "quantifiable_achievements_count": int, "keyword_density": "<Low/Medium/High> - <count>", "overall_assessment": "<2-3 sentences>"}
+"""
+
+ANALYSIS_RUBRICS = {"full": ANALYSIS_RUBRIC_FULL, "compact": ANALYSIS_RUBRIC_COMPACT}
+
+def build_analysis_messages(raw_text, parsed_data, rubric="full"):
+    """Returns [system rubric, user resume] messages for the chosen rubric ("full" or "compact")."""
+    skills = parsed_data.get("skills", [])
+    snippet = compress_for_prompt(raw_text, Config.ANALYSIS_TOKEN_BUDGET)
+    resume = f"""**RESUME TO ANALYZE:**
+{snippet}
+
+**DETECTED SKILLS:** {skills if skills else 'None detected - MAJOR RED FLAG'}
+"""
+    return [{"role": "system", "content": ANALYSIS_RUBRICS[rubric]},
+            {"role": "user", "content": resume}]
+
+def build_packed_analysis_messages(items, rubric="full"):
+    """
+    Messages asking for several independent analyses in one request (used by
+    services.reanalysis). items is [(resume_id, raw_text, parsed_data)]. The
+    system rubric is the same as for single analyses, so the prompt cache still applies.
+    """
+    blocks = []
+    for resume_id, raw_text, parsed_data in items:
+        skills = parsed_data.get("skills", [])
+        blocks.append(f"""### RESUME resume_id={resume_id}
+{compress_for_prompt(raw_text, Config.ANALYSIS_TOKEN_BUDGET)}
+
+**DETECTED SKILLS:** {skills if skills else 'None detected - MAJOR RED FLAG'}
+""")
+    resumes = "\n".join(blocks)
+    prompt = f"""**{len(items)} RESUMES TO ANALYZE.** Score each one independently against the rubric, as if it were the only resume.
+Return a JSON object {{"analyses": [...]}} with one analysis object per resume, in the order given, each with its "resume_id" copied exactly.
+
+{resumes}"""
+    return [{"role": "system", "content": ANALYSIS_RUBRICS[rubric]},
+            {"role": "user", "content": prompt}]
 
 
 
 def generate_cover_letter(resume_text, parsed_data, job_title, tone="professional"):
+    """
+    Returns one cover letter for (resume, job title, tone).
+    The first request generates a pool of COVER_LETTER_VARIANTS letters in a single
+    completion call (n choices); later "regenerate" requests are served from that
+    pool until it runs out, and only then is a new pool generated.
+    If generation fails, the most recent letter from an exhausted pool is served
+    again; without one, LLMCallError is raised.
+    """
+    cache = get_llm_cache()
+    key = _cover_letter_key(resume_text, job_title, tone)
+    pool = cache.get(key)
+    pooled = _next_pooled_letter(cache, key, pool)
+    if pooled is not None:
+        return pooled
+
     try:
-        client = get_openai_client()
-        prompt = build_cover_letter_prompt(resume_text, parsed_data, job_title, tone)
-        
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",  # Using more cost-effective model
-            messages=[{"role":"user","content":prompt}],
+        variants = _request_cover_letters(resume_text, parsed_data, job_title, tone,
+                                          Config.COVER_LETTER_VARIANTS)
+    except LLMCallError:
+        if pool and pool["variants"]:
+            return pool["variants"][-1]
+        raise
+    cache.set(key, {"variants": variants})
+    return variants[0]
+
+def stream_cover_letter(resume_text, parsed_data, job_title, tone="professional"):
+    """
+    Yields one cover letter as text deltas as the model produces them.
+    Uses the same variant pool as generate_cover_letter: a pooled letter is
+    yielded in one piece, otherwise all variants are requested with stream=True,
+    the first is streamed out and the full set is cached once the stream ends.
+    Falls back to the last pooled letter like generate_cover_letter; raises
+    LLMCallError if there is none. Errors after the first token are not retried.
+    """
+    cache = get_llm_cache()
+    key = _cover_letter_key(resume_text, job_title, tone)
+    pool = cache.get(key)
+    pooled = _next_pooled_letter(cache, key, pool)
+    if pooled is not None:
+        yield pooled
+        return
+
+    count = Config.COVER_LETTER_VARIANTS
+    messages = [{"role":"user","content":build_cover_letter_prompt(resume_text, parsed_data, job_title, tone)}]
+    route = get_route("cover_letter")
+    try:
+        stream = call_llm("cover_letter", lambda timeout: route.chat(
+            messages,
             temperature=0.7,
-            max_tokens=800
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        flask_env = current_app.config.get('FLASK_ENV', 'development')
-        if flask_env == 'development':
-            print("[ERROR] OpenAI API call failed:", e)
-        error_msg = f"Failed to generate cover letter: {str(e)}"
-        if "api_key" in str(e).lower():
-            error_msg += "\n\nPlease ensure your OPENAI_API_KEY is set correctly in your environment variables."
-        return error_msg
+            max_tokens=800,
+            n=count,
+            stream=True,
+            timeout=timeout
+        ), provider=route.provider.name, stream=True)
+    except LLMCallError:
+        if pool and pool["variants"]:
+            yield pool["variants"][-1]
+            return
+        raise
+    variants = [[] for _ in range(count)]
+    for chunk in stream:
+        for choice in chunk.choices:
+            delta = choice.delta.content
+            if delta:
+                variants[choice.index].append(delta)
+                if choice.index == 0:
+                    yield delta
+    letters = ["".join(parts) for parts in variants]
+    ledger.record("cover_letter", messages, "".join(letters))
+    cache.set(key, {"variants": letters})
+
+def _cover_letter_key(resume_text, job_title, tone):
+    return make_cache_key("coverletter", COVER_LETTER_PROMPT_VERSION, get_route("cover_letter").cache_id,
+                          resume_text, " ".join(job_title.lower().split()), tone.lower())
+
+def _next_pooled_letter(cache, key, pool):
+    """
+    Claims the next unused letter from a cached variant pool, or returns None.
+    The pool's first letter went to the request that generated it; the cursor is
+    the cache entry's atomic counter, so concurrent regenerations get different letters.
+    """
+    if not pool or not pool.get("variants"):
+        return None
+    claimed = cache.incr(key)
+    if claimed is not None and claimed < len(pool["variants"]):
+        return pool["variants"][claimed]
+    return None
+
+def _request_cover_letters(resume_text, parsed_data, job_title, tone, count):
+    """Returns count generated letters. Raises LLMCallError."""
+    messages = [{"role":"user","content":build_cover_letter_prompt(resume_text, parsed_data, job_title, tone)}]
+    route = get_route("cover_letter")
+    try:
+        response = call_llm("cover_letter", lambda timeout: route.chat(
+            messages,
+            temperature=0.7,
+            max_tokens=800,
+            n=count,  # the prompt is billed once for all variants
+            timeout=timeout
+        ), provider=route.provider.name)
+    except LLMCallError as e:
+        logger.warning("LLM call failed", extra={"endpoint": "cover_letter", "error": repr(e.__cause__ or e)})
+        raise
+    letters = [choice.message.content for choice in response.choices]
+    ledger.record("cover_letter", messages, "".join(letters), getattr(response, "usage", None))
+    return letters
 
 def build_cover_letter_prompt(resume_text, parsed_data, job_title, tone):
     name = parsed_data.get("name", "Candidate")
     email = parsed_data.get("email", "")
     phone = parsed_data.get("phone", "")
     skills = ", ".join(parsed_data.get("skills", []))
-    snippet = resume_text[:1500]
+    snippet = compress_for_prompt(resume_text, Config.COVER_LETTER_TOKEN_BUDGET)
     prompt = f"""
 You are an expert career assistant. Write a highly personalized, {tone} cover letter for the position of "{job_title}".
 - Use the candidate's name: {name}
@@ -487,3 +656,89 @@ Detected skills: {skills}
 Limit to 400 words. Output plain text only.
 """
     return prompt
+
+def generate_career_advice(resume_text, interests):
+    """
+    Returns freshly generated career advice. Each result is kept as the fallback
+    for identical input, served only when the provider cannot be reached.
+    Raises LLMCallError.
+    """
+    cache = get_llm_cache()
+    key = _career_advice_key(resume_text, interests)
+    messages = [{"role": "user", "content": build_career_advice_prompt(resume_text, interests)}]
+    route = get_route("career_advice")
+    try:
+        response = call_llm("career_advice", lambda timeout: route.chat(
+            messages,
+            temperature=0.7,
+            max_tokens=1000,
+            timeout=timeout
+        ), provider=route.provider.name)
+    except LLMCallError:
+        last = cache.get(key)
+        if last is not None:
+            return last
+        raise
+    advice = response.choices[0].message.content
+    ledger.record("career_advice", messages, advice, getattr(response, "usage", None))
+    cache.set(key, advice)
+    return advice
+
+def stream_career_advice(resume_text, interests):
+    """
+    Yields career advice as text deltas as the model produces them, falling back
+    to the last advice for identical input like generate_career_advice.
+    Raises LLMCallError. Errors after the first token are not retried.
+    """
+    cache = get_llm_cache()
+    key = _career_advice_key(resume_text, interests)
+    messages = [{"role": "user", "content": build_career_advice_prompt(resume_text, interests)}]
+    route = get_route("career_advice")
+    try:
+        stream = call_llm("career_advice", lambda timeout: route.chat(
+            messages,
+            temperature=0.7,
+            max_tokens=1000,
+            stream=True,
+            timeout=timeout
+        ), provider=route.provider.name, stream=True)
+    except LLMCallError:
+        last = cache.get(key)
+        if last is None:
+            raise
+        yield last
+        return
+    parts = []
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            parts.append(chunk.choices[0].delta.content)
+            yield parts[-1]
+    advice = "".join(parts)
+    ledger.record("career_advice", messages, advice)
+    cache.set(key, advice)
+
+def _career_advice_key(resume_text, interests):
+    return make_cache_key("advice", CAREER_ADVICE_PROMPT_VERSION, get_route("career_advice").cache_id,
+                          resume_text, (interests or "").lower())
+
+def build_career_advice_prompt(resume_text, interests):
+    """Build prompt for career advice generation"""
+    interests_text = f" with particular interest in {interests}" if interests else ""
+    
+    prompt = f"""
+You are an expert career counselor and advisor. Based on the following resume/profile information{interests_text}, provide comprehensive, personalized career advice.
+
+Resume/Profile:
+{compress_for_prompt(resume_text, Config.CAREER_ADVICE_TOKEN_BUDGET)}
+
+Please provide:
+1. **Career Path Analysis**: Analyze their current skills and experience level
+2. **Recommended Career Paths**: Suggest 3-5 specific career paths or roles that align with their profile
+3. **Skills Development**: Identify key skills they should develop or strengthen
+4. **Industry Insights**: Provide insights about relevant industries and market trends
+5. **Next Steps**: Give 5-7 actionable steps they can take to advance their career
+6. **Learning Resources**: Suggest specific courses, certifications, or learning platforms
+
+Make the advice practical, specific, and encouraging. Format the response in a clear, readable way with proper sections and bullet points.
+"""
+    return prompt
@@ -0,0 +1,234 @@
+"""
+Background resume analysis.
+
+Uploads store a Resume with analysis_status="pending" and hand its id to
+this module. Jobs live in the resume table itself, so nothing is lost when
+a process dies:
+
+- claim() moves one row from pending to running with a conditional UPDATE,
+  so a job is only ever run once even if several workers race for it.
+- claim_batch() picks candidates with SELECT ... FOR UPDATE SKIP LOCKED
+  (on Postgres) so concurrent drain workers do not block each other.
+- Rows stuck in running for longer than ANALYSIS_JOB_TIMEOUT are claimable again.
+- While the LLM circuit breaker is open, jobs go back to pending instead of
+  failing, and are picked up again by the next drain.
+
+Requests never run a job themselves. In thread mode an in-process pool runs
+them; in db mode (serverless) they are drained by a standalone worker
+
+    python -m services.analysis_queue [--once]
+
+or by a scheduled request to /tasks/drain-analysis (routes/tasks.py), which
+stops claiming jobs before the function's time limit.
+"""
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from config import Config
+from services.log import get_logger
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+logger = get_logger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _claimable(Resume):
+    from sqlalchemy import and_, or_
+
+    stale = datetime.utcnow() - timedelta(seconds=Config.ANALYSIS_JOB_TIMEOUT)
+    return or_(
+        Resume.analysis_status == PENDING,
+        and_(Resume.analysis_status == RUNNING, Resume.analysis_started_at < stale),
+    )
+
+
+def claim(resume_id):
+    """Atomically marks a claimable job as running. Returns True if we own it now."""
+    from extensions import db
+    from models import Resume
+
+    updated = (Resume.query
+               .filter(Resume.id == resume_id, _claimable(Resume))
+               .update({"analysis_status": RUNNING, "analysis_started_at": datetime.utcnow()},
+                       synchronize_session=False))
+    db.session.commit()
+    return updated == 1
+
+
+def claim_batch(limit):
+    """Claims up to limit jobs, oldest first. Returns their ids."""
+    from extensions import db
+    from models import Resume
+
+    candidates = [row.id for row in (Resume.query
+                                     .with_entities(Resume.id)
+                                     .filter(_claimable(Resume))
+                                     .order_by(Resume.id)
+                                     .limit(limit)
+                                     .with_for_update(skip_locked=True))]
+    claimed = []
+    for resume_id in candidates:
+        updated = (Resume.query
+                   .filter(Resume.id == resume_id, _claimable(Resume))
+                   .update({"analysis_status": RUNNING, "analysis_started_at": datetime.utcnow()},
+                           synchronize_session=False))
+        if updated == 1:
+            claimed.append(resume_id)
+    db.session.commit()
+    return claimed
+
+
+def process(resume_id):
+    """Runs the analysis for a job that has already been claimed. Requires an app context."""
+    from extensions import db
+    from models import Resume
+    from services.ai_service import analysis_version, analyze_resume_text, local_analysis
+    from services.llm_call import CircuitOpenError
+
+    resume = db.session.get(Resume, resume_id)
+    if resume is None:
+        return None
+
+    def on_field(key, value):
+        # Publish the score while the rest of the analysis is still streaming
+        if key == "score":
+            resume.analysis = {"score": value}
+            db.session.commit()
+
+    try:
+        analysis = analyze_resume_text(resume.text or "", resume.parsed_data or {}, on_field=on_field)
+    except CircuitOpenError:
+        # Show the local rubric score until the provider recovers and the job reruns
+        resume.analysis = local_analysis(resume.text or "", resume.parsed_data or {},
+                                         fallback_reason="AI analysis is queued until the service recovers.")
+        resume.analysis_status = PENDING
+        db.session.commit()
+        return PENDING
+    except Exception as e:
+        analysis = {"error": str(e)}
+    resume.analysis = analysis
+    resume.analysis_status = FAILED if "error" in analysis else DONE
+    resume.analysis_version = analysis_version() if is_complete(analysis) else None
+    db.session.commit()
+    return resume.analysis_status
+
+
+def is_complete(analysis):
+    """True for a full AI analysis: not an error, not cut short, not the local fallback."""
+    return ("error" not in analysis and not analysis.get("truncated")
+            and analysis.get("source") != "local")
+
+
+def run_job(resume_id):
+    """Claims and processes one job; a no-op if another worker already has it."""
+    if claim(resume_id):
+        return process(resume_id)
+    return None
+
+
+def _run_in_app(app, resume_id):
+    with app.app_context():
+        try:
+            run_job(resume_id)
+        except Exception:
+            logger.exception("Analysis job failed", extra={"resume_id": resume_id})
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=Config.ANALYSIS_WORKERS,
+                                               thread_name_prefix="analysis")
+    return _executor
+
+
+def enqueue(app, resume_id):
+    """
+    Hands a pending job to the configured queue mode.
+    Must be called after the pending Resume row has been committed.
+    """
+    mode = app.config['ANALYSIS_QUEUE_MODE']
+    if mode == "inline":
+        run_job(resume_id)
+    elif mode == "thread":
+        # The job's log lines carry the uploading request's ID
+        _get_executor().submit(contextvars.copy_context().run, _run_in_app, app, resume_id)
+    # "db": the row itself is the queue entry
+
+
+def kick(app, resume_id):
+    """
+    Called when a client polls a pending job. In thread mode the job is
+    resubmitted in case the process that owned it has gone away; claim() keeps
+    it from running twice. In db mode a worker or the drain task picks it up.
+    """
+    if app.config['ANALYSIS_QUEUE_MODE'] == "thread":
+        _get_executor().submit(contextvars.copy_context().run, _run_in_app, app, resume_id)
+
+
+def drain(limit=None, batch_size=None, deadline=None):
+    """
+    Processes claimable jobs until none are left (or limit is reached). Returns the count.
+    With deadline (a time.monotonic() value), no new batch is claimed unless it can
+    finish in time, i.e. before deadline minus LLM_DEADLINE_ANALYSIS.
+    """
+    from flask import current_app
+
+    app = current_app._get_current_object()
+    batch_size = batch_size or Config.ANALYSIS_WORKERS
+    done = 0
+    with ThreadPoolExecutor(max_workers=Config.ANALYSIS_WORKERS) as pool:
+        while limit is None or done < limit:
+            if deadline is not None and time.monotonic() + Config.LLM_DEADLINE_ANALYSIS > deadline:
+                break
+            size = batch_size if limit is None else min(batch_size, limit - done)
+            ids = claim_batch(size)
+            if not ids:
+                break
+            context = contextvars.copy_context()
+            statuses = list(pool.map(lambda resume_id: context.copy().run(_process_in_app, app, resume_id), ids))
+            done += len(ids) - statuses.count(PENDING)
+            if PENDING in statuses:
+                break  # provider degraded; leave the rest for the next drain
+    return done
+
+
+def _process_in_app(app, resume_id):
+    with app.app_context():
+        return process(resume_id)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run pending resume analysis jobs.")
+    parser.add_argument("--once", action="store_true", help="Drain the queue once and exit")
+    parser.add_argument("--poll-interval", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        while True:
+            count = drain()
+            if count:
+                print(f"Processed {count} analysis jobs")
+            if args.once:
+                return 0
+            time.sleep(args.poll_interval)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
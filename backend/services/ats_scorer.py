@@ -0,0 +1,330 @@
+"""
+Local, deterministic ATS scoring.
+
+Implements the mechanical parts of the analysis rubric (see ANALYSIS_RUBRIC_FULL
+in services.ai_service) in plain Python: section checks, contact completeness,
+quantified achievements, action verbs, skill and keyword counts, education and
+length. It needs no network and runs in milliseconds, so it is used as:
+
+- an instant preview stored with the parsed resume,
+- the analysis served while the LLM is unavailable,
+- a cheap pre-filter for bulk jobs.
+
+Judgement calls the rubric also asks for (spelling, grammar, relevance,
+vagueness) are left to the model.
+
+Score a file from the command line with:
+
+    python -m services.ats_scorer resume.pdf
+"""
+import re
+
+from services.parser import normalize_text, split_sections
+from services.structured_output import BREAKDOWN_MAX
+from services.taxonomy import get_skill_index
+
+SCORER_VERSION = 2
+
+# Roughly one page of resume text
+WORDS_PER_PAGE = 500
+
+_EMAIL_RE = re.compile(r"([\w.+-]+)@[\w-]+\.[\w.]+")
+_PHONE_RE = re.compile(r"\+?\d[\d\s().-]{8,}\d")
+_LINK_RE = re.compile(r"linkedin\.com|github\.com|gitlab\.com|behance\.net|portfolio|https?://|www\.", re.IGNORECASE)
+_LOCATION_RE = re.compile(r"\b[A-Z][a-z]+(?:[ -][A-Z][a-z]+)*,\s*(?:[A-Z]{2}\b|[A-Z][a-z]+)")
+# Whole words of an email's local part; digits separate words but are never flagged (birth years)
+_EMAIL_WORD_SPLIT_RE = re.compile(r"[._\-\d+]+")
+UNPROFESSIONAL_EMAIL_WORDS = frozenset("""
+    party cool sexy babe hottie hotie dude princess angel gangsta swag lover crazy xxx
+""".split())
+
+# A number tied to an outcome: percentages, money, multipliers, or counts of people/things
+_QUANTIFIED_RE = re.compile(
+    r"\d+(?:[.,]\d+)?\s*%|[$€£₹]\s?\d|\d+(?:[.,]\d+)?\s?(?:k|m|bn?|million|billion)\b|\b\d+(?:\.\d+)?x\b"
+    r"|\b\d[\d,]*\+?\s+(?:users|customers|clients|people|engineers|developers|members|employees|students"
+    r"|projects|services|applications|apps|requests|transactions|hours|days|weeks|countries|stores|sites)"
+    r"|team of \d+|\bby \d+",
+    re.IGNORECASE)
+_YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+_DATE_RANGE_RE = re.compile(
+    r"(?:\b[A-Za-z]{3,9}\.?\s+)?(?:\d{1,2}/)?(?:19|20)\d{2}\s*(?:-|–|—|to)\s*"
+    r"(?:present|current|now|(?:[A-Za-z]{3,9}\.?\s+)?(?:\d{1,2}/)?(?:19|20)\d{2})", re.IGNORECASE)
+_DATE_STYLES = {
+    "month_name": re.compile(r"\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+(?:19|20)\d{2}", re.IGNORECASE),
+    "numeric": re.compile(r"\b\d{1,2}/(?:19|20)\d{2}\b"),
+}
+# Spelled-out degrees, or abbreviations with their periods ("B.S.", "M.A.") or unambiguous
+# without them ("BSc", "MTech"); bare "BE", "ME" or "MA" are ordinary words
+_DEGREE_RE = re.compile(
+    r"\b(?:bachelor(?:'s|s)?|master(?:'s|s)?|doctorate|mba|ph\.?\s?d|associate(?:'s)? degree"
+    r"|[bm]\.\s?(?:sc|tech|com|s|a|e)|[bm](?:sc|tech|com))\b", re.IGNORECASE)
+_DEGREE_IN_PROGRESS_RE = re.compile(r"\b(?:expected|pursuing|in progress|candidate)\b", re.IGNORECASE)
+_BASIC_EDUCATION_RE = re.compile(r"\b(?:high school|secondary school|diploma|ged|some college)\b", re.IGNORECASE)
+_CERT_RE = re.compile(r"\b(?:certified|certificate|certification|license[ds]?)\b", re.IGNORECASE)
+_SENIORITY_RE = re.compile(r"\b(?:senior|sr\.?|lead|principal|staff|manager|head|director|architect|vp)\b", re.IGNORECASE)
+
+STRONG_VERBS = frozenset("""
+    led architected spearheaded optimized launched built designed delivered drove founded
+    transformed scaled established pioneered orchestrated reduced increased accelerated
+    automated engineered directed championed negotiated generated grew streamlined overhauled
+    revamped mentored created initiated achieved exceeded won secured
+""".split())
+GOOD_VERBS = frozenset("""
+    managed developed implemented coordinated maintained supported analyzed organized improved
+    conducted prepared performed handled trained tested wrote collaborated planned executed
+    migrated integrated deployed configured monitored researched presented administered
+""".split())
+WEAK_PHRASES = ("responsible for", "worked on", "helped", "assisted", "involved in", "participated in",
+                "duties included", "tasked with")
+
+
+def _word_count(text):
+    return len(text.split())
+
+
+def _band(value, bands):
+    """bands: [(threshold, points), ...] in descending threshold order."""
+    for threshold, points in bands:
+        if value >= threshold:
+            return points
+    return 0
+
+
+def _section_text(sections, *names):
+    return [line for name, lines in sections if name in names for line in lines[1:]]
+
+
+def _unprofessional_email(local_part):
+    return any(word in UNPROFESSIONAL_EMAIL_WORDS for word in _EMAIL_WORD_SPLIT_RE.split(local_part.lower()))
+
+
+def _contact(header_text, full_text, name):
+    email = _EMAIL_RE.search(full_text)
+    info = {
+        "name": bool(name),
+        "email": bool(email),
+        "phone": bool(_PHONE_RE.search(full_text)),
+        "location": bool(_LOCATION_RE.search(header_text)),
+        "link": bool(_LINK_RE.search(full_text)),
+        "unprofessional_email": bool(email and _unprofessional_email(email.group(1))),
+    }
+    if info["unprofessional_email"]:
+        points = 2
+    elif all(info[k] for k in ("name", "email", "phone", "location", "link")):
+        points = 10
+    elif all(info[k] for k in ("name", "email", "phone", "location")):
+        points = 8
+    elif all(info[k] for k in ("name", "email", "phone")):
+        points = 6
+    elif info["email"] or info["phone"]:
+        points = 4
+    else:
+        points = 0
+    return points, info
+
+
+def _summary_points(summary_lines, skill_index):
+    text = " ".join(summary_lines)
+    words = _word_count(text)
+    if not words:
+        return 0
+    specific = bool(re.search(r"\d", text))
+    skills = len(skill_index.find(text)) if skill_index is not None else 0
+    if 30 <= words <= 120 and specific and skills >= 2 and _QUANTIFIED_RE.search(text):
+        return 10
+    if specific and skills >= 2:
+        return 8
+    if words >= 20:
+        return 6
+    if words >= 8:
+        return 4
+    return 2
+
+
+def _verb_points(lines):
+    if not lines:
+        return 0
+    strong = good = weak = 0
+    for line in lines:
+        lowered = line.lstrip("- ").lower()
+        first = lowered.split(" ", 1)[0].strip(",.;:")
+        if first in STRONG_VERBS:
+            strong += 1
+        elif first in GOOD_VERBS:
+            good += 1
+        elif lowered.startswith(WEAK_PHRASES):
+            weak += 1
+    total = len(lines)
+    if strong / total >= 0.4:
+        return 8
+    if (strong + good) / total >= 0.4:
+        return 6
+    if weak > strong + good:
+        return 2
+    return 4
+
+
+def _education_points(text):
+    has_degree = bool(_DEGREE_RE.search(text))
+    certs = len(_CERT_RE.findall(text))
+    if has_degree and _DEGREE_IN_PROGRESS_RE.search(text):
+        return 4, certs
+    if has_degree:
+        return (10 if certs >= 2 else 8 if certs == 1 else 6), certs
+    if _BASIC_EDUCATION_RE.search(text):
+        return 2, certs
+    return 0, certs
+
+
+def score_resume(raw_text, parsed_data=None, page_count=None, skill_index=None):
+    """
+    Scores resume text against the rubric. parsed_data (from parse_resume_text)
+    supplies the detected name; page_count is estimated from the word count when
+    not given. Returns an analysis-shaped dict with score, score_breakdown,
+    deductions_applied, quantifiable_achievements_count, ats_compatibility,
+    keyword_density and "source": "local".
+    """
+    parsed_data = parsed_data or {}
+    if skill_index is None:
+        skill_index = get_skill_index()
+    text = normalize_text(raw_text)
+    lines = text.splitlines()
+    sections = split_sections(text)
+    present = {name for name, _lines in sections}
+    words = _word_count(text)
+    pages = page_count or max(1, round(words / WORDS_PER_PAGE, 1))
+
+    # Format & structure
+    fragments = sum(1 for line in lines if len(line.split()) <= 2 and not line.startswith("- "))
+    fragment_ratio = fragments / len(lines) if lines else 1.0
+    if not lines:
+        layout = 0
+    else:
+        layout = 8 if fragment_ratio <= 0.3 else 6 if fragment_ratio <= 0.45 else 4 if fragment_ratio <= 0.6 else 2
+    core = len(present & {"summary", "experience", "skills", "education"})
+    organization = {4: 7, 3: 5, 2: 3}.get(core, 1 if lines else 0)
+    known_headings = sum(1 for name, _lines in sections if name not in ("header", "other"))
+    columns_suspected = fragment_ratio > 0.6
+    if columns_suspected:
+        ats = 1
+    elif known_headings >= 3:
+        ats = 5
+    else:
+        ats = 3 if lines else 0
+
+    # Contact
+    header_text = "\n".join(sections[0][1]) if sections and sections[0][0] == "header" else text[:300]
+    contact, contact_info = _contact(header_text, text, parsed_data.get("name"))
+
+    # Summary
+    summary = _summary_points(_section_text(sections, "summary"), skill_index)
+
+    # Experience
+    experience_lines = _section_text(sections, "experience", "projects") or lines
+    achievements = sum(1 for line in experience_lines if _QUANTIFIED_RE.search(line))
+    if achievements:
+        quantified = _band(achievements, [(5, 10), (3, 8), (1, 6)])
+    else:
+        # Numbers other than years, but none tied to an outcome
+        quantified = 3 if any(re.search(r"\d", _YEAR_RE.sub("", line)) for line in experience_lines) else 0
+    verbs = _verb_points(_section_text(sections, "experience", "projects"))
+    roles = len(_DATE_RANGE_RE.findall(" ".join(_section_text(sections, "experience")) or text))
+    if roles >= 2:
+        progression = 7 if _SENIORITY_RE.search(" ".join(_section_text(sections, "experience"))) else 5
+    else:
+        progression = 3 if roles == 1 or "experience" in present else 0
+
+    # Skills and keywords
+    hits = skill_index.find(text)
+    technical = [skill for skill, hit in hits.items() if hit["weight"] >= 1.0]
+    mentions = sum(hit["count"] for hit in hits.values())
+    depth = _band(len(technical), [(10, 8), (6, 6), (3, 4), (1, 2)])
+    optimization = _band(mentions, [(25, 7), (15, 5), (8, 3), (1, 1)])
+    keywords = _band(len(hits), [(20, 10), (15, 8), (10, 6), (5, 4), (1, 2)])
+
+    # Education: only the sections themselves, prose elsewhere mentions "master" or "B.A." too
+    education_text = "\n".join(_section_text(sections, "education", "certifications"))
+    education, certs = _education_points(education_text)
+
+    breakdown = {
+        "format": layout + organization + ats,
+        "contact": contact,
+        "summary": summary,
+        "experience": quantified + verbs + progression,
+        "skills": depth + optimization,
+        "education": education,
+        "keywords": keywords,
+    }
+    breakdown = {name: min(points, BREAKDOWN_MAX[name]) for name, points in breakdown.items()}
+
+    deductions = []
+
+    def deduct(reason, points):
+        deductions.append((reason, points))
+
+    if "summary" not in present:
+        deduct("Missing Professional Summary", 8)
+    if "skills" not in present:
+        deduct("Missing Skills Section", 12)
+    if "education" not in present and not _DEGREE_RE.search(education_text):
+        deduct("Missing Education", 8)
+    if "experience" not in present and roles == 0:
+        deduct("No work experience", 20)
+    if columns_suspected:
+        deduct("Tables/columns/graphics", 15)
+    if pages > 2:
+        deduct("Resume > 2 pages", 8)
+    elif words < WORDS_PER_PAGE / 2:
+        deduct("Resume < 0.5 pages", 10)
+    if contact_info["unprofessional_email"]:
+        deduct("Unprofessional email", 5)
+    if achievements == 0:
+        deduct("No quantifiable achievements", 12)
+    if not (contact_info["location"] and (contact_info["email"] or contact_info["phone"])):
+        deduct("Missing location/contact info", 5)
+    if sum(1 for style in _DATE_STYLES.values() if style.search(text)) > 1:
+        deduct("Inconsistent date formatting", 3)
+
+    score = sum(breakdown.values()) - sum(points for _reason, points in deductions)
+    score = max(0, min(100, score))
+    if ats >= 5 and not columns_suspected:
+        compatibility = "Good - standard section headings and a single-column text layout"
+    elif columns_suspected:
+        compatibility = "Poor - many short fragments, which suggests tables or columns"
+    else:
+        compatibility = "Fair - few standard section headings were recognized"
+    density = "High" if len(hits) >= 20 else "Medium" if len(hits) >= 10 else "Low"
+    return {
+        "score": score,
+        "score_breakdown": breakdown,
+        "deductions_applied": [f"{reason}: -{points} points" for reason, points in deductions],
+        "quantifiable_achievements_count": achievements,
+        "ats_compatibility": compatibility,
+        "keyword_density": f"{density} - {len(hits)} industry keywords found",
+        "source": "local",
+        "scorer_version": SCORER_VERSION,
+    }
+
+
+def main(argv=None):
+    import argparse
+    import json
+    import time
+
+    parser = argparse.ArgumentParser(description="Score resumes locally against the ATS rubric.")
+    parser.add_argument("files", nargs="+", help="PDF or DOCX files")
+    args = parser.parse_args(argv)
+
+    from services.parser import parse_resume_file
+
+    for path in args.files:
+        raw, parsed = parse_resume_file(path, path, parallel=True)
+        start = time.perf_counter()
+        result = score_resume(raw, parsed)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(json.dumps({"file": path, "ms": round(elapsed, 2), **result}))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,253 @@
+"""
+Bulk resume ingestion.
+
+Parses many resume files across a process pool, streams per-file results
+as JSONL and writes Resume rows in batched INSERTs instead of one commit
+per file. Imported rows are queued for analysis (services/analysis_queue.py)
+as each batch commits: in thread mode the command waits for those analyses
+before it exits, in db mode they are left to the drain.
+Large archives belong on the command line:
+
+    python -m services.bulk_ingest --email user@example.com --out results.jsonl resumes/
+
+Parallelism is per file: pool workers are daemonic and cannot start the
+page-parallel PDF extraction of services.parser, so long PDFs are only split
+across processes when files are parsed in-process (--workers 1, or a single file).
+
+The /resume/import ZIP route handles small archives within one request:
+it is bounded by the BULK_IMPORT_* limits (serverless-sized in production)
+and a time budget, after which the remaining files are reported as skipped.
+"""
+import json
+import multiprocessing
+import os
+import time
+import zipfile
+
+from services.analysis_queue import PENDING, enqueue
+from services.parser import parse_resume_file
+from services.storage import allowed_file, hash_content
+
+DEFAULT_BATCH_SIZE = 500
+# Command-line imports are not bound by the web route's limits
+CLI_MAX_FILES = 100000
+CLI_MAX_BYTES = 20 * 1024 ** 3
+
+
+def iter_resume_files(paths):
+    """Yields every PDF/DOCX path under the given files and directories."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _dirs, files in os.walk(path):
+                for name in sorted(files):
+                    if allowed_file(name):
+                        yield os.path.join(root, name)
+        elif allowed_file(path):
+            yield path
+
+
+def extract_zip(zip_path, dest_dir, max_files, max_bytes):
+    """
+    Extracts the PDF/DOCX members of a ZIP archive into dest_dir.
+    Member names are flattened to their base name to avoid path traversal.
+    Raises ValueError when the archive exceeds the file or size limits.
+    """
+    from werkzeug.utils import secure_filename
+
+    paths = []
+    total = 0
+    with zipfile.ZipFile(zip_path) as archive:
+        members = [m for m in archive.infolist() if not m.is_dir() and allowed_file(m.filename)]
+        if len(members) > max_files:
+            raise ValueError(f"Archive contains {len(members)} resumes, the limit is {max_files}")
+        for member in members:
+            total += member.file_size
+            if total > max_bytes:
+                raise ValueError("Archive is too large to import")
+            name = secure_filename(os.path.basename(member.filename))
+            if not name:
+                continue
+            base, ext = os.path.splitext(name)
+            target = os.path.join(dest_dir, name)
+            counter = 1
+            while os.path.exists(target):
+                target = os.path.join(dest_dir, f"{base}_{counter}{ext}")
+                counter += 1
+            with archive.open(member) as src, open(target, "wb") as dst:
+                while True:
+                    chunk = src.read(1024 * 1024)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+            paths.append(target)
+    return paths
+
+
+def _parse_one(path):
+    """Pool worker: parses a single file and never raises."""
+    filename = os.path.basename(path)
+    try:
+        with open(path, "rb") as f:
+            content_hash = hash_content(f.read())
+        # Long PDFs are split across pages when we are not already a pool worker
+        raw_text, parsed_data = parse_resume_file(path, filename, parallel=True)
+        return {
+            "file": path, "filename": filename, "ok": True, "content_hash": content_hash,
+            "text": raw_text, "parsed_data": parsed_data,
+        }
+    except Exception as e:
+        return {"file": path, "filename": filename, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+
+def _skipped(path):
+    return {"file": path, "filename": os.path.basename(path), "ok": False, "skipped": True,
+            "error": "Not imported: time limit reached"}
+
+
+def parse_many(paths, workers=None, chunksize=4, deadline=None):
+    """
+    Parses files across a process pool and yields results as they complete.
+    workers=1 parses in-process, which is handy for debugging; so does a
+    platform without working process pools (no /dev/shm on AWS Lambda and
+    Vercel). Once time.monotonic() passes deadline, the files not parsed yet
+    are yielded as skipped.
+    """
+    paths = list(paths)
+    if not paths:
+        return
+    workers = workers or os.cpu_count() or 1
+    pool = None
+    if workers > 1 and len(paths) > 1:
+        try:
+            pool = multiprocessing.Pool(processes=min(workers, len(paths)))
+        except OSError:
+            pool = None
+    done = set()
+    if pool is None:
+        for path in paths:
+            if deadline is not None and time.monotonic() > deadline:
+                break
+            done.add(path)
+            yield _parse_one(path)
+    else:
+        with pool:
+            for result in pool.imap_unordered(_parse_one, paths, chunksize=chunksize):
+                done.add(result["file"])
+                yield result
+                if deadline is not None and time.monotonic() > deadline:
+                    break
+    for path in paths:
+        if path not in done:
+            yield _skipped(path)
+
+
+def result_to_jsonl(result, hide=("text",)):
+    """Serialises one parse result as a JSONL line, leaving out the full text."""
+    record = {key: value for key, value in result.items() if key not in hide}
+    if result.get("ok"):
+        record["chars"] = len(result["text"])
+    return json.dumps(record, default=str) + "\n"
+
+
+def bulk_insert_resumes(rows):
+    """Inserts Resume rows with a single executemany INSERT and commits. Returns the new ids."""
+    from extensions import db
+    from models import Resume
+
+    if not rows:
+        return []
+    ids = db.session.scalars(db.insert(Resume).returning(Resume.id, sort_by_parameter_order=True), rows).all()
+    db.session.commit()
+    return ids
+
+
+def _insert_and_enqueue(app, rows):
+    for resume_id in bulk_insert_resumes(rows):
+        enqueue(app, resume_id)
+
+
+def ingest(results, user_id, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Consumes parse results, inserting successful ones for user_id in batches,
+    as pending analysis jobs handed to the analysis queue once each batch commits.
+    Re-yields every result so callers can stream them out as they go.
+    Requires an application context.
+    """
+    from flask import current_app
+
+    app = current_app._get_current_object()
+    batch = []
+    for result in results:
+        if result["ok"]:
+            batch.append({
+                "filename": result["filename"],
+                "content_hash": result["content_hash"],
+                "text": result["text"],
+                "parsed_data": result["parsed_data"],
+                "analysis": None,
+                "analysis_status": PENDING,
+                "user_id": user_id,
+            })
+            if len(batch) >= batch_size:
+                _insert_and_enqueue(app, batch)
+                batch = []
+        yield result
+    _insert_and_enqueue(app, batch)
+
+
+def main(argv=None):
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Bulk-import PDF/DOCX resumes for one user.")
+    parser.add_argument("paths", nargs="+", help="Resume files, directories or .zip archives")
+    parser.add_argument("--email", help="Owner of the imported resumes; omit to only parse")
+    parser.add_argument("--out", help="Write JSONL results here (default: stdout)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Parser processes (default: CPU count); with 1, long PDFs are "
+                             "extracted page-parallel instead (PDF_EXTRACT_WORKERS)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--max-files", type=int, default=CLI_MAX_FILES, help="Per .zip archive")
+    parser.add_argument("--max-bytes", type=int, default=CLI_MAX_BYTES, help="Uncompressed, per .zip archive")
+    args = parser.parse_args(argv)
+
+    import tempfile
+    from app import create_app
+
+    app = create_app()
+    with app.app_context(), tempfile.TemporaryDirectory() as tmp_dir:
+        paths = []
+        for path in args.paths:
+            if path.lower().endswith(".zip"):
+                paths.extend(extract_zip(path, tmp_dir, args.max_files, args.max_bytes))
+            else:
+                paths.extend(iter_resume_files([path]))
+
+        results = parse_many(paths, workers=args.workers)
+        if args.email:
+            from models import User
+            user = User.query.filter_by(email=args.email).first()
+            if not user:
+                parser.error(f"No user with email {args.email}")
+            results = ingest(results, user.id, batch_size=args.batch_size)
+
+        out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+        started = time.monotonic()
+        ok = failed = 0
+        try:
+            for result in results:
+                out.write(result_to_jsonl(result))
+                if result["ok"]:
+                    ok += 1
+                else:
+                    failed += 1
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        elapsed = time.monotonic() - started
+        print(f"Processed {ok + failed} files ({ok} ok, {failed} failed) in {elapsed:.1f}s", file=sys.stderr)
+    return 0 if not failed else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
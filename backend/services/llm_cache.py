@@ -0,0 +1,322 @@
+"""
+Caches for LLM results.
+
+All backends share the same small interface (get / set / incr / stats) so
+the analysis path does not care where results live. incr() atomically bumps
+a counter attached to an entry (reset whenever the entry is set), which lets
+concurrent requests claim distinct items of a cached list.
+
+- MemoryCache: in-process LRU, bounded by entry count.
+- SQLCache: the llm_cache table (SQLite or Postgres), with TTL and
+  oldest-first pruning, shared by every instance on the same database.
+- RedisCache: any server speaking the Redis protocol; entries carry a TTL
+  and a sorted-set index bounds the number of keys.
+"""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+
+def normalize_text(text):
+    """Normalizes text so that formatting-only differences hit the same cache entry."""
+    text = unicodedata.normalize("NFC", text or "")
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def make_cache_key(kind, prompt_version, model, *parts):
+    """Builds '<kind>:<prompt_version>:<model>:<sha256 of the normalized parts>'."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, str):
+            part = json.dumps(part, sort_keys=True, default=str)
+        digest.update(normalize_text(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return f"{kind}:{prompt_version}:{model}:{digest.hexdigest()}"
+
+
+class CacheBackend:
+    """Base class keeping hit/miss/set/eviction counters."""
+
+    name = "base"
+
+    def __init__(self):
+        self._counters = {"hits": 0, "misses": 0, "sets": 0, "evictions": 0, "errors": 0}
+        self._counter_lock = threading.Lock()
+
+    def _count(self, counter, n=1):
+        with self._counter_lock:
+            self._counters[counter] += n
+
+    def get(self, key):
+        try:
+            value = self._get(key)
+        except Exception:
+            # A broken cache must never break the request; treat it as a miss
+            self._count("errors")
+            value = None
+        self._count("hits" if value is not None else "misses")
+        return value
+
+    def set(self, key, value, ttl=None):
+        try:
+            self._set(key, value, ttl)
+            self._count("sets")
+        except Exception:
+            self._count("errors")
+
+    def incr(self, key):
+        """
+        Atomically increments the counter of key's entry and returns the new value
+        (1 after each set()). Returns None if there is no such entry or the backend failed.
+        """
+        try:
+            return self._incr(key)
+        except Exception:
+            self._count("errors")
+            return None
+
+    def stats(self):
+        with self._counter_lock:
+            stats = dict(self._counters)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["backend"] = self.name
+        return stats
+
+    def _get(self, key):
+        raise NotImplementedError
+
+    def _set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def _incr(self, key):
+        raise NotImplementedError
+
+
+class NullCache(CacheBackend):
+    name = "none"
+
+    def _get(self, key):
+        return None
+
+    def _set(self, key, value, ttl):
+        pass
+
+    def _incr(self, key):
+        return None
+
+
+class MemoryCache(CacheBackend):
+    """Thread-safe in-process LRU with optional per-entry TTL."""
+
+    name = "memory"
+
+    def __init__(self, max_entries=1024, default_ttl=None):
+        super().__init__()
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._data = OrderedDict()
+        self._entry_counters = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key):
+        """The entry's value, dropping it if expired. Caller holds the lock."""
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires = item
+        if expires is not None and expires < time.monotonic():
+            del self._data[key]
+            self._entry_counters.pop(key, None)
+            return None
+        return value
+
+    def _get(self, key):
+        with self._lock:
+            value = self._live(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def _set(self, key, value, ttl):
+        ttl = ttl or self.default_ttl
+        expires = time.monotonic() + ttl if ttl else None
+        evicted = 0
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            self._entry_counters.pop(key, None)
+            while len(self._data) > self.max_entries:
+                self._entry_counters.pop(self._data.popitem(last=False)[0], None)
+                evicted += 1
+        if evicted:
+            self._count("evictions", evicted)
+
+    def _incr(self, key):
+        with self._lock:
+            if self._live(key) is None:
+                return None
+            self._entry_counters[key] = self._entry_counters.get(key, 0) + 1
+            return self._entry_counters[key]
+
+
+class SQLCache(CacheBackend):
+    """
+    Stores entries in the llm_cache table through its own engine connection,
+    so cache writes never commit the caller's session.
+    Expired and excess rows are pruned every prune_every writes.
+    """
+
+    name = "sql"
+
+    def __init__(self, engine, max_entries=10000, default_ttl=None, prune_every=50):
+        super().__init__()
+        from models import LLMCacheEntry
+
+        self.engine = engine
+        self.table = LLMCacheEntry.__table__
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.prune_every = prune_every
+
+    def _get(self, key):
+        from sqlalchemy import select
+
+        table = self.table
+        with self.engine.connect() as conn:
+            row = conn.execute(select(table.c.value, table.c.expires_at).where(table.c.key == key)).first()
+        if row is None or (row.expires_at is not None and row.expires_at < datetime.utcnow()):
+            return None
+        return row.value
+
+    def _set(self, key, value, ttl):
+        ttl = ttl or self.default_ttl
+        now = datetime.utcnow()
+        expires = now + timedelta(seconds=ttl) if ttl else None
+        table = self.table
+        with self.engine.begin() as conn:
+            conn.execute(table.delete().where(table.c.key == key))
+            conn.execute(table.insert().values(key=key, value=value, created_at=now, expires_at=expires))
+        if random.random() < 1.0 / self.prune_every:
+            self.prune()
+
+    def _incr(self, key):
+        # The UPDATE locks the row until commit, so the SELECT reads our own increment
+        from sqlalchemy import func, or_, select
+
+        table = self.table
+        live = (table.c.key == key, or_(table.c.expires_at.is_(None), table.c.expires_at >= datetime.utcnow()))
+        with self.engine.begin() as conn:
+            updated = conn.execute(table.update().where(*live)
+                                   .values(counter=func.coalesce(table.c.counter, 0) + 1)).rowcount
+            if not updated:
+                return None
+            return conn.execute(select(table.c.counter).where(table.c.key == key)).scalar()
+
+    def prune(self):
+        """Deletes expired rows, then the oldest rows beyond max_entries."""
+        from sqlalchemy import func, select
+
+        table = self.table
+        with self.engine.begin() as conn:
+            expired = conn.execute(table.delete().where(table.c.expires_at < datetime.utcnow())).rowcount
+            total = conn.execute(select(func.count()).select_from(table)).scalar()
+            excess = total - self.max_entries
+            if excess > 0:
+                oldest = select(table.c.key).order_by(table.c.created_at).limit(excess).scalar_subquery()
+                excess = conn.execute(table.delete().where(table.c.key.in_(oldest))).rowcount
+        evicted = (expired or 0) + max(excess, 0)
+        if evicted:
+            self._count("evictions", evicted)
+
+
+class RedisCache(CacheBackend):
+    """
+    Redis-protocol backend. Works with Redis, Valkey or any local stand-in
+    that speaks RESP. Values are JSON with a TTL; a sorted set of insertion
+    times bounds the number of keys.
+    """
+
+    name = "redis"
+
+    def __init__(self, url, max_entries=10000, default_ttl=None, prefix="careerlens:llm:", client=None):
+        super().__init__()
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImportError("redis package not installed. Run: pip install redis")
+            client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.client = client
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.prefix = prefix
+        self.index_key = prefix + "__index__"
+        self.counter_suffix = ":__counter__"
+
+    def _get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def _set(self, key, value, ttl):
+        ttl = ttl or self.default_ttl
+        full_key = self.prefix + key
+        pipe = self.client.pipeline()
+        if ttl:
+            pipe.set(full_key, json.dumps(value), ex=int(ttl))
+        else:
+            pipe.set(full_key, json.dumps(value))
+        pipe.delete(full_key + self.counter_suffix)
+        pipe.zadd(self.index_key, {full_key: time.time()})
+        pipe.zcard(self.index_key)
+        size = pipe.execute()[-1]
+        excess = size - self.max_entries
+        if excess > 0:
+            victims = [member for member, _score in self.client.zpopmin(self.index_key, excess)]
+            if victims:
+                self.client.delete(*victims, *[_key(victim) + self.counter_suffix for victim in victims])
+                self._count("evictions", len(victims))
+
+    def _incr(self, key):
+        full_key = self.prefix + key
+        counter_key = full_key + self.counter_suffix
+        # MULTI/EXEC: the existence check and the INCR run as one step
+        pipe = self.client.pipeline(transaction=True)
+        pipe.pttl(full_key)
+        pipe.incr(counter_key)
+        ttl_ms, value = pipe.execute()
+        if ttl_ms == -2:  # no such entry
+            self.client.delete(counter_key)
+            return None
+        if value == 1 and ttl_ms > 0:
+            self.client.pexpire(counter_key, ttl_ms)
+        return value
+
+
+def _key(member):
+    return member.decode("utf-8") if isinstance(member, bytes) else member
+
+
+def build_cache(config, engine_factory=None):
+    """
+    Builds the backend named by config['LLM_CACHE_BACKEND'].
+    engine_factory returns a SQLAlchemy engine and is only called for the sql backend.
+    """
+    backend = (config.get("LLM_CACHE_BACKEND") or "memory").lower()
+    max_entries = int(config.get("LLM_CACHE_MAX_ENTRIES", 10000))
+    ttl = int(config.get("LLM_CACHE_TTL", 0)) or None
+    if backend == "memory":
+        return MemoryCache(max_entries=max_entries, default_ttl=ttl)
+    if backend == "sql":
+        return SQLCache(engine_factory(), max_entries=max_entries, default_ttl=ttl)
+    if backend == "redis":
+        return RedisCache(config.get("LLM_CACHE_REDIS_URL", "redis://localhost:6379/0"), max_entries=max_entries, default_ttl=ttl)
+    if backend == "none":
+        return NullCache()
+    raise ValueError(f"Unknown LLM_CACHE_BACKEND: {backend}")
@@ -0,0 +1,214 @@
+"""
+Shared wrapper for LLM calls: deadlines, retries and a circuit breaker.
+
+- Every call runs against a per-endpoint deadline (Config.LLM_DEADLINE_<ENDPOINT>),
+  derived by default from the serverless max duration, so a slow provider
+  cannot keep a request or worker busy past the point where its result is useless.
+- 429s, 5xx responses, timeouts and connection errors are retried with
+  full-jitter exponential backoff (honouring Retry-After) while time remains.
+- Repeated retryable failures open a process-wide circuit breaker; while it is
+  open, calls fail fast with CircuitOpenError until a single probe call after
+  LLM_BREAKER_RESET seconds succeeds. Callers serve their last cached result
+  instead where they have one. Rejected requests (4xx) leave the breaker as it is.
+- A streamed response (stream=True) is held to the same deadline while its
+  chunks are read; a stream still running at the deadline ends with LLMCallError.
+"""
+import random
+import threading
+import time
+
+from config import Config
+from services import metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+UNAVAILABLE_MESSAGE = "The AI service is temporarily unavailable. Please try again in a few minutes."
+DEADLINE_MESSAGE = "The AI service took too long to respond. Please try again."
+
+
+class LLMCallError(Exception):
+    """An LLM call failed. The message is safe to show to users."""
+
+    def __init__(self, message, retryable=False, status=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.status = status
+
+
+class CircuitOpenError(LLMCallError):
+    """Raised without calling the provider while the circuit breaker is open."""
+
+    def __init__(self):
+        super().__init__(UNAVAILABLE_MESSAGE, retryable=True)
+
+
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open breaker. failure_threshold consecutive
+    failures open it; after reset_timeout seconds one probe call is let through.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def release(self):
+        """Frees the half-open probe slot without judging the provider."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name):
+    """Returns the process-wide breaker for a provider, created on first use."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(Config.LLM_BREAKER_THRESHOLD, Config.LLM_BREAKER_RESET)
+                _breakers[name] = breaker
+    return breaker
+
+
+def breaker_states():
+    """{provider: state} of the breakers created so far."""
+    with _breakers_lock:
+        return {name: breaker.state for name, breaker in _breakers.items()}
+
+
+def deadline_for(endpoint):
+    """Seconds an endpoint may spend on its LLM call, retries included."""
+    return getattr(Config, f"LLM_DEADLINE_{endpoint.upper()}")
+
+
+def _classify(exc):
+    """Returns (retryable, status, retry_after) for an exception raised by the SDK."""
+    status = getattr(exc, "status_code", None)
+    response = getattr(exc, "response", None)
+    retry_after = None
+    if response is not None:
+        try:
+            retry_after = float(response.headers.get("retry-after"))
+        except (TypeError, ValueError, AttributeError):
+            retry_after = None
+    if status is not None:
+        return status == 429 or status >= 500, status, retry_after
+    # APITimeoutError / APIConnectionError carry no status code
+    names = {cls.__name__ for cls in type(exc).__mro__}
+    if names & {"APITimeoutError", "APIConnectionError", "TimeoutError", "ConnectionError"}:
+        return True, None, None
+    return False, None, None
+
+
+def _backoff(attempt):
+    """Full-jitter exponential backoff."""
+    cap = min(Config.LLM_RETRY_MAX_DELAY, Config.LLM_RETRY_BASE_DELAY * (2 ** attempt))
+    return random.uniform(0, cap)
+
+
+def call_llm(endpoint, request, provider="openai", stream=False):
+    """
+    Runs request(timeout) under the endpoint's deadline, retrying retryable
+    failures. request must pass timeout on to the SDK call. With stream=True
+    the returned chunk iterator raises LLMCallError once the deadline passes.
+    Raises LLMCallError (CircuitOpenError while the provider is degraded).
+    """
+    deadline = time.monotonic() + deadline_for(endpoint)
+    with metrics.stage("llm"):
+        result = _call_with_retries(endpoint, request, provider, deadline)
+    if stream:
+        return _until_deadline(result, deadline)
+    return result
+
+
+def _until_deadline(stream, deadline):
+    """Yields the stream's chunks until the deadline, then closes it and raises LLMCallError."""
+    try:
+        for chunk in stream:
+            if time.monotonic() > deadline:
+                raise LLMCallError(DEADLINE_MESSAGE, retryable=True)
+            yield chunk
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+
+
+def _call_with_retries(endpoint, request, provider, deadline):
+    breaker = get_breaker(provider)
+    attempt = 0
+    while True:
+        if not breaker.allow():
+            raise CircuitOpenError()
+        remaining = deadline - time.monotonic()
+        started = time.perf_counter()
+        try:
+            result = request(min(remaining, Config.OPENAI_TIMEOUT))
+        except Exception as e:
+            retryable, status, retry_after = _classify(e)
+            metrics.observe_llm(endpoint, provider, "retryable_error" if retryable else "error",
+                                time.perf_counter() - started)
+            if not retryable:
+                # Bad request or configuration, not an outage: neither a failure nor a success
+                breaker.release()
+                raise _as_call_error(e, status) from e
+            breaker.record_failure()
+            attempt += 1
+            delay = retry_after if retry_after is not None else _backoff(attempt)
+            # Leave the next attempt at least a second of useful time
+            if attempt >= Config.LLM_MAX_ATTEMPTS or time.monotonic() + delay + 1.0 > deadline:
+                raise LLMCallError(UNAVAILABLE_MESSAGE, retryable=True, status=status) from e
+            metrics.LLM_RETRIES.inc(endpoint, provider)
+            time.sleep(delay)
+            continue
+        metrics.observe_llm(endpoint, provider, "ok", time.perf_counter() - started)
+        breaker.record_success()
+        return result
+
+
+def _as_call_error(exc, status):
+    if isinstance(exc, LLMCallError):
+        return exc
+    if status is None:
+        # Configuration problems (missing key, missing package) carry our own messages
+        return LLMCallError(str(exc), status=status)
+    if status == 401:
+        return LLMCallError("The AI service rejected our credentials. Please check OPENAI_API_KEY.", status=status)
+    return LLMCallError(f"The AI service rejected the request (HTTP {status}).", status=status)
@@ -0,0 +1,372 @@
+"""
+LLM providers.
+
+ai_service builds the prompts and parses the responses; a provider only runs
+chat completions and returns them in the OpenAI SDK response shape (a
+ChatCompletion, or an iterator of ChatCompletionChunk with stream=True), so
+every backend goes through the same streaming, repair and caching code.
+
+Each workload ("analysis", "cover_letter", "career_advice") is routed to a
+provider by Config.LLM_PROVIDER_<WORKLOAD> and to a model by
+Config.LLM_MODEL_<WORKLOAD>:
+
+- openai: the OpenAI API, through one pooled keep-alive client per process.
+- local: any OpenAI-compatible server (vLLM, llama.cpp, Ollama, LM Studio)
+  at LLM_LOCAL_BASE_URL.
+- fake: deterministic in-process responses with configurable latency and
+  error injection, so the whole app can be benchmarked and load-tested
+  offline. Analyses come from the local rubric scorer.
+"""
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+
+from config import Config
+
+WORKLOADS = ("analysis", "cover_letter", "career_advice")
+
+
+class LLMProvider:
+    """Base class. Subclasses implement chat(); warm() and ready() are optional."""
+
+    name = None
+
+    def chat(self, workload, model, messages, timeout=None, stream=False, **params):
+        """Runs one chat completion. Errors carry status_code where the SDK's would."""
+        raise NotImplementedError
+
+    def ready(self):
+        """False when the provider is clearly not configured, so warm-up is skipped."""
+        return True
+
+    def warm(self, timeout=None):
+        """Opens connections ahead of the first real request, giving up after timeout seconds if set."""
+
+
+class OpenAIProvider(LLMProvider):
+    """
+    The OpenAI API. The client (and its HTTP connection pool) is shared by all
+    threads, so keep-alive connections and TLS sessions are reused across calls.
+    A forked worker builds its own client rather than inheriting its parent's sockets.
+    """
+
+    name = "openai"
+
+    def __init__(self, api_key=None, base_url=None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self._client = None
+        self._client_pid = None
+        self._lock = threading.Lock()
+
+    def client(self):
+        if self._client is None or self._client_pid != os.getpid():
+            with self._lock:
+                if self._client is None or self._client_pid != os.getpid():
+                    self._client = self._create_client()
+                    self._client_pid = os.getpid()
+        return self._client
+
+    def _check_api_key(self):
+        api_key = self.api_key
+        if not api_key or api_key == 'your_openai_api_key_here' or len(api_key) < 20:
+            raise ValueError("OPENAI_API_KEY not configured. Please set it in your environment variables with a valid API key.")
+
+    def _create_client(self):
+        """Initialize OpenAI client with proper error handling"""
+        try:
+            from openai import OpenAI
+        except ImportError:
+            raise ImportError("OpenAI package not installed. Run: pip install openai>=1.30.0")
+
+        self._check_api_key()
+        try:
+            # Retries are handled by services.llm_call, within each endpoint's deadline
+            return OpenAI(api_key=self.api_key, base_url=self.base_url, timeout=Config.OPENAI_TIMEOUT,
+                          max_retries=0, http_client=_build_http_client())
+        except TypeError as e:
+            # Handle version compatibility issues
+            if 'proxies' in str(e):
+                raise ValueError(
+                    "OpenAI package version mismatch. Please upgrade:\n"
+                    "1. Run: pip uninstall openai\n"
+                    "2. Run: pip install openai>=1.30.0\n"
+                    "3. Restart the application"
+                )
+            raise
+
+    def chat(self, workload, model, messages, timeout=None, stream=False, **params):
+        return self.client().chat.completions.create(model=model, messages=messages, timeout=timeout,
+                                                     stream=stream, **params)
+
+    def ready(self):
+        try:
+            self._check_api_key()
+        except ValueError:
+            return False
+        return True
+
+    def warm(self, timeout=None):
+        client = self.client()
+        if timeout is not None:
+            client = client.with_options(timeout=timeout, max_retries=0)
+        client.models.list()
+
+
+class OpenAICompatibleProvider(OpenAIProvider):
+    """
+    A self-hosted server speaking the OpenAI chat completions API. Most accept
+    any API key. Servers without json_schema support need LLM_LOCAL_JSON_SCHEMA=0,
+    which downgrades structured responses to plain JSON mode.
+    """
+
+    name = "local"
+
+    def __init__(self, base_url, api_key=None, json_schema=True):
+        super().__init__(api_key or "local", base_url)
+        self.json_schema = json_schema
+
+    def _check_api_key(self):
+        if not self.base_url:
+            raise ValueError("LLM_LOCAL_BASE_URL not configured.")
+
+    def chat(self, workload, model, messages, timeout=None, stream=False, **params):
+        response_format = params.get("response_format")
+        if not self.json_schema and response_format and response_format.get("type") == "json_schema":
+            params["response_format"] = {"type": "json_object"}
+        if stream and not self.json_schema:
+            # Older servers reject stream_options along with other newer parameters
+            params.pop("stream_options", None)
+        return super().chat(workload, model, messages, timeout=timeout, stream=stream, **params)
+
+
+class FakeProviderError(Exception):
+    """Injected failure, classified by services.llm_call like an SDK APIStatusError."""
+
+    def __init__(self, status_code):
+        super().__init__(f"Injected fake provider error (HTTP {status_code})")
+        self.status_code = status_code
+        self.response = None
+
+
+class FakeProvider(LLMProvider):
+    """
+    Deterministic responses for offline runs. Content depends only on the
+    request. latency is slept before the response (before the first chunk
+    when streaming) and chunk_delay between streamed chunks. error_rate of
+    calls, drawn from a seeded generator, raise FakeProviderError(error_status).
+    analysis, if given, is returned for every analysis instead of a generated one.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency=0.0, chunk_delay=0.0, error_rate=0.0, error_status=503, seed=0, analysis=None):
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.analysis = analysis
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def chat(self, workload, model, messages, timeout=None, stream=False, n=1, **params):
+        with self._lock:
+            fail = self._random.random() < self.error_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            raise FakeProviderError(self.error_status)
+        contents = [self._content(workload, messages, params.get("response_format"), index) for index in range(n)]
+        usage = _fake_usage(messages, contents)
+        if stream:
+            include_usage = (params.get("stream_options") or {}).get("include_usage")
+            return self._stream(model, contents, usage if include_usage else None)
+        from openai.types.chat import ChatCompletion
+
+        return ChatCompletion.model_validate({
+            "id": "chatcmpl-fake", "object": "chat.completion", "created": 0, "model": model,
+            "choices": [{"index": index, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}
+                        for index, content in enumerate(contents)],
+            "usage": usage,
+        })
+
+    def _stream(self, model, contents, usage):
+        from openai.types.chat import ChatCompletionChunk
+
+        def chunk(choices, usage=None):
+            return ChatCompletionChunk.model_validate({
+                "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": 0, "model": model,
+                "choices": choices, "usage": usage,
+            })
+
+        pieces = [re.findall(r"\S+\s*|\s+", content) for content in contents]
+        for position in range(max(len(p) for p in pieces)):
+            choices = [{"index": index, "finish_reason": None, "delta": {"content": p[position]}}
+                       for index, p in enumerate(pieces) if position < len(p)]
+            yield chunk(choices)
+            if self.chunk_delay:
+                time.sleep(self.chunk_delay)
+        yield chunk([{"index": index, "finish_reason": "stop", "delta": {}} for index in range(len(contents))])
+        if usage is not None:
+            yield chunk([], usage)
+
+    def _content(self, workload, messages, response_format, index):
+        prompt = messages[-1]["content"]
+        if response_format and response_format.get("type") in ("json_schema", "json_object"):
+            import json
+
+            analyze = (lambda text: dict(self.analysis)) if self.analysis is not None else _fake_analysis
+            blocks = re.split(r"^### RESUME resume_id=(\S+)\n", prompt, flags=re.MULTILINE)[1:]
+            if blocks:
+                return json.dumps({"analyses": [{"resume_id": resume_id, **analyze(text)}
+                                                for resume_id, text in zip(blocks[::2], blocks[1::2])]})
+            return json.dumps(analyze(prompt.split("**RESUME TO ANALYZE:**", 1)[-1]))
+        digest = hashlib.sha256(f"{index}:{prompt}".encode("utf-8")).hexdigest()[:8]
+        if workload == "cover_letter":
+            return (f"Dear Hiring Manager,\n\nThis is fake cover letter {index + 1} ({digest}). "
+                    "It highlights relevant experience, measurable results and a strong fit for the role.\n\n"
+                    "I would welcome the chance to discuss how I can contribute to your team.\n\nSincerely,\nCandidate")
+        return (f"## Career Advice ({digest})\n\n1. **Career paths:** roles that build on your current skills.\n"
+                "2. **Skill development:** close the most common gaps for those roles.\n"
+                "3. **Next steps:** update your resume, network, and apply within 30 days.\n")
+
+
+def _fake_analysis(text):
+    """A schema-complete analysis built from the local rubric scorer."""
+    from services.ats_scorer import score_resume
+
+    text = text.split("**DETECTED SKILLS:**", 1)[0]
+    local = score_resume(text)
+    return {
+        "score": local["score"],
+        "score_breakdown": local["score_breakdown"],
+        "deductions_applied": local["deductions_applied"],
+        "strengths": ["Clear structure", "Relevant technical skills", "Consistent formatting"],
+        "weaknesses": local["deductions_applied"][:6] or ["Few quantified achievements"],
+        "suggested_roles": ["Software Engineer", "Backend Developer", "Data Analyst", "DevOps Engineer"],
+        "missing_skills": ["Docker", "Kubernetes", "CI/CD", "System Design", "Cloud Architecture"],
+        "recommended_courses_or_certs": ["AWS Certified Developer", "Docker Mastery",
+                                         "System Design Primer", "Kubernetes Fundamentals"],
+        "concise_advice": ["Quantify achievements", "Add a professional summary", "Group skills by category",
+                           "Use strong action verbs", "Keep to one or two pages"],
+        "ats_compatibility": local["ats_compatibility"],
+        "quantifiable_achievements_count": local["quantifiable_achievements_count"],
+        "keyword_density": local["keyword_density"],
+        "overall_assessment": "Deterministic analysis from the fake LLM provider.",
+    }
+
+
+def _fake_usage(messages, contents):
+    from services.tokens import estimate_message_tokens, estimate_tokens
+
+    prompt_tokens = estimate_message_tokens(messages)
+    completion_tokens = sum(estimate_tokens(content) for content in contents)
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+
+def _build_http_client():
+    """
+    Pooled keep-alive transport for the OpenAI client, with HTTP/2 when the
+    h2 package is installed. Returns None (the SDK default) if httpx is unavailable.
+    """
+    try:
+        import httpx
+    except ImportError:
+        return None
+    import importlib.util
+
+    from openai import DefaultHttpxClient
+
+    limits = httpx.Limits(max_connections=Config.OPENAI_MAX_CONNECTIONS,
+                          max_keepalive_connections=Config.OPENAI_MAX_KEEPALIVE,
+                          keepalive_expiry=Config.OPENAI_KEEPALIVE_EXPIRY)
+    http2 = Config.OPENAI_HTTP2 and importlib.util.find_spec("h2") is not None
+    return DefaultHttpxClient(limits=limits, http2=http2, timeout=Config.OPENAI_TIMEOUT)
+
+
+class Route:
+    """A workload bound to a provider and model."""
+
+    def __init__(self, workload, provider, model):
+        self.workload = workload
+        self.provider = provider
+        self.model = model
+
+    @property
+    def cache_id(self):
+        """Model identifier for cache keys and analysis versions; other providers never share OpenAI's entries."""
+        if self.provider.name == OpenAIProvider.name:
+            return self.model
+        return f"{self.provider.name}:{self.model}"
+
+    def chat(self, messages, timeout=None, **params):
+        return self.provider.chat(self.workload, self.model, messages, timeout=timeout, **params)
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def _create_provider(name):
+    if name == "openai":
+        return OpenAIProvider(Config.OPENAI_API_KEY)
+    if name == "local":
+        return OpenAICompatibleProvider(Config.LLM_LOCAL_BASE_URL, Config.LLM_LOCAL_API_KEY,
+                                        json_schema=Config.LLM_LOCAL_JSON_SCHEMA)
+    if name == "fake":
+        return FakeProvider(Config.LLM_FAKE_LATENCY, Config.LLM_FAKE_CHUNK_DELAY, Config.LLM_FAKE_ERROR_RATE,
+                            Config.LLM_FAKE_ERROR_STATUS, Config.LLM_FAKE_SEED)
+    raise ValueError(f"Unknown LLM provider: {name} (expected openai, local or fake)")
+
+
+def get_provider(name):
+    """Returns the process-wide provider instance for a name, created on first use."""
+    provider = _providers.get(name)
+    if provider is None:
+        with _providers_lock:
+            provider = _providers.get(name)
+            if provider is None:
+                provider = _create_provider(name)
+                _providers[name] = provider
+    return provider
+
+
+def set_provider(name, provider):
+    """Replaces a provider instance, e.g. a FakeProvider with custom settings in a benchmark."""
+    with _providers_lock:
+        _providers[name] = provider
+
+
+def get_route(workload):
+    """The provider and model configured for a workload."""
+    suffix = workload.upper()
+    return Route(workload, get_provider(getattr(Config, f"LLM_PROVIDER_{suffix}")),
+                 getattr(Config, f"LLM_MODEL_{suffix}"))
+
+
+def warm_providers(background=True, timeout=None):
+    """
+    Warms every configured provider that looks ready, so the first real
+    request does not pay for the TCP and TLS handshakes. Failures are ignored:
+    a missing key or unreachable API surfaces on first use instead. timeout
+    bounds each provider's warm-up call (default: OPENAI_TIMEOUT).
+    """
+    def warm():
+        names = {getattr(Config, f"LLM_PROVIDER_{workload.upper()}") for workload in WORKLOADS}
+        for name in sorted(names):
+            try:
+                provider = get_provider(name)
+                if provider.ready():
+                    provider.warm(timeout)
+            except Exception:
+                pass
+
+    if background:
+        threading.Thread(target=warm, name="llm-warmup", daemon=True).start()
+    else:
+        warm()
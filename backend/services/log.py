@@ -0,0 +1,251 @@
+"""
+Structured, non-blocking logging.
+
+configure() routes the standard logging module through a bounded queue:
+request threads only enqueue records, and a single background thread formats
+them as one JSON object per line and writes them to stdout, so a slow log
+pipe (Vercel's log shipping) never stalls a request. When the queue is full,
+records are dropped and counted instead of blocking.
+
+    logger = get_logger(__name__)
+    logger.warning("LLM call failed", extra={"endpoint": "analysis", "error": repr(e)})
+
+Fields passed in extra= become top-level JSON keys. Every string field is cut
+to LOG_MAX_FIELD_CHARS and a whole line to LOG_MAX_LINE_BYTES, so logging a
+payload cannot flood the log. init_app() gives each request an ID (the
+incoming X-Request-ID, else Vercel's x-vercel-id, else a fresh one), echoes
+it in the X-Request-ID response header and attaches it to every record
+logged while handling the request, plus one "request" line per response.
+
+LOG_SAMPLE_RATE keeps that share of DEBUG/INFO records (decided once per
+request, so a request's lines are kept or dropped together); warnings and
+errors are always kept. LOG_FORMAT=text prints plain lines for local
+development, LOG_ASYNC=0 writes synchronously.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+
+from config import Config
+
+# Also the name of Flask's app.logger (import name "app"), so its error reports share the handlers
+ROOT_LOGGER = "app"
+
+# Attributes every LogRecord has; anything else came in through extra=
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+_REQUEST_ID_RE = re.compile(r"^[\w.:-]{1,128}$")
+
+request_id_var = contextvars.ContextVar("request_id", default=None)
+sampled_var = contextvars.ContextVar("log_sampled", default=None)
+
+_listener = None
+_configure_lock = threading.Lock()
+dropped = 0
+
+
+def get_logger(name):
+    """A logger under the app's root logger, e.g. get_logger(__name__)."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def _truncate(value, limit):
+    if isinstance(value, str) and len(value) > limit:
+        return value[:limit] + f"...[{len(value) - limit} more chars]"
+    return value
+
+
+def _bounded(value, limit):
+    """JSON-safe copy of value with every string cut to limit characters."""
+    if isinstance(value, dict):
+        return {str(k): _bounded(v, limit) for k, v in list(value.items())[:100]}
+    if isinstance(value, (list, tuple, set)):
+        return [_bounded(v, limit) for v in list(value)[:100]]
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return _truncate(value if isinstance(value, str) else repr(value), limit)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, bounded in size."""
+
+    def __init__(self, max_field_chars=2000, max_line_bytes=8192):
+        super().__init__()
+        self.max_field_chars = max_field_chars
+        self.max_line_bytes = max_line_bytes
+
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": _truncate(record.getMessage(), self.max_field_chars),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = _bounded(value, self.max_field_chars)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = _truncate(record.exc_text, self.max_field_chars)
+        line = json.dumps(entry, ensure_ascii=False, default=repr)
+        if len(line.encode("utf-8")) > self.max_line_bytes:
+            # Keep the envelope and as much of the message as fits
+            keep = {key: entry[key] for key in ("ts", "level", "logger", "request_id") if key in entry}
+            keep["msg"] = entry["msg"][:self.max_line_bytes // 2]
+            keep["truncated"] = True
+            line = json.dumps(keep, ensure_ascii=False)
+        return line
+
+
+class TextFormatter(logging.Formatter):
+    """Readable lines for local development, extra fields appended as key=value."""
+
+    def __init__(self, max_field_chars=2000):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s", "%H:%M:%S")
+        self.max_field_chars = max_field_chars
+
+    def format(self, record):
+        line = super().format(record)
+        fields = [f"{key}={_bounded(value, self.max_field_chars)}" for key, value in vars(record).items()
+                  if key not in _RECORD_ATTRS and not key.startswith("_")]
+        return " ".join([line] + fields) if fields else line
+
+
+class ContextFilter(logging.Filter):
+    """Attaches the request ID and applies sampling to records below WARNING."""
+
+    def __init__(self, sample_rate=1.0):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record):
+        request_id = request_id_var.get()
+        if request_id and not hasattr(record, "request_id"):
+            record.request_id = request_id
+        if record.levelno >= logging.WARNING or self.sample_rate >= 1.0:
+            return True
+        sampled = sampled_var.get()
+        if sampled is None:
+            sampled = random.random() < self.sample_rate
+        return sampled
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Never blocks the caller: records that do not fit in the queue are dropped and counted."""
+
+    def enqueue(self, record):
+        global dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            dropped += 1
+
+    def prepare(self, record):
+        # Formatting happens on the listener thread; only resolve what cannot cross threads
+        import copy
+
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure(level=None, fmt=None, sample_rate=None, asynchronous=None, force=False):
+    """Installs the handlers on the app's root logger. Safe to call more than once."""
+    global _listener
+    with _configure_lock:
+        root = logging.getLogger(ROOT_LOGGER)
+        if root.handlers and not force:
+            return root
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+        fmt = fmt or Config.LOG_FORMAT
+        if fmt == "text":
+            formatter = TextFormatter(Config.LOG_MAX_FIELD_CHARS)
+        else:
+            formatter = JsonFormatter(Config.LOG_MAX_FIELD_CHARS, Config.LOG_MAX_LINE_BYTES)
+        output = logging.StreamHandler(sys.stdout)
+        output.setFormatter(formatter)
+
+        asynchronous = Config.LOG_ASYNC if asynchronous is None else asynchronous
+        if asynchronous:
+            handler = DroppingQueueHandler(queue.Queue(Config.LOG_QUEUE_SIZE))
+            _listener = logging.handlers.QueueListener(handler.queue, output, respect_handler_level=False)
+            _listener.start()
+            atexit.register(shutdown)
+        else:
+            handler = output
+        handler.addFilter(ContextFilter(Config.LOG_SAMPLE_RATE if sample_rate is None else sample_rate))
+        root.addHandler(handler)
+        root.setLevel((level or Config.LOG_LEVEL).upper())
+        root.propagate = False
+        return root
+
+
+def shutdown():
+    """Flushes queued records and stops the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _incoming_request_id(headers):
+    for name in ("X-Request-ID", "x-vercel-id"):
+        value = headers.get(name, "")
+        if _REQUEST_ID_RE.match(value):
+            return value
+    return uuid.uuid4().hex
+
+
+def init_app(app):
+    """Configures logging and registers the request ID and request log hooks."""
+    from flask import g, request
+
+    configure()
+    logger = get_logger("request")
+
+    @app.before_request
+    def _bind_request():
+        g.request_id = _incoming_request_id(request.headers)
+        g.log_started = time.perf_counter()
+        request_id_var.set(g.request_id)
+        sampled_var.set(random.random() < app.config.get('LOG_SAMPLE_RATE', 1.0))
+
+    @app.after_request
+    def _log_request(response):
+        request_id = g.get("request_id")
+        if request_id is None:
+            return response
+        response.headers["X-Request-ID"] = request_id
+        rule = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        if rule != "/metrics" and not rule.startswith("/static"):
+            logger.info("request", extra={
+                "method": request.method,
+                "route": rule,
+                "status": response.status_code,
+                "duration_ms": round((time.perf_counter() - g.log_started) * 1000, 1),
+            })
+        return response
+
+    @app.teardown_request
+    def _unbind_request(_exc):
+        # Worker threads are reused; the next request must not inherit this one's ID
+        request_id_var.set(None)
+        sampled_var.set(None)
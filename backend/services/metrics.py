@@ -0,0 +1,270 @@
+"""
+Request timing and Prometheus metrics.
+
+Hot paths wrap their stages in stage():
+
+    with stage("extract"):
+        raw = extract_text_from_pdf(data)
+
+Each stage is recorded in a per-route, per-stage histogram and, inside a
+request, added to that response's Server-Timing header (durations of the same
+stage name are summed), so the browser's network panel shows where an upload
+spent its time. init_app() also records the request duration per route and
+the number of requests in flight, and serves everything at /metrics in the
+Prometheus text format, together with LLM call latency (from
+services.llm_call), token counts (services.tokens.ledger) and LLM cache hit
+rates, read when scraped.
+
+Metrics live in process memory: each worker (and each serverless instance)
+reports its own, and they reset on restart. Set METRICS_TOKEN to require
+"Authorization: Bearer <token>" on /metrics; in production /metrics answers
+403 until a token is set.
+"""
+import bisect
+import hmac
+import threading
+import time
+from contextlib import contextmanager
+
+from config import Config
+
+# Seconds; LLM calls and whole requests reach into the tens of seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Stage timings recorded outside a request (background analysis jobs, CLIs)
+NO_ROUTE = "-"
+
+
+class Histogram:
+    """Thread-safe cumulative histogram with a fixed set of labels."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts (the last one is +Inf), then sum
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def samples(self):
+        with self._lock:
+            snapshot = {labels: (list(counts), total) for labels, (counts, total) in self._series.items()}
+        for labels, (counts, total) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield "_bucket", self.labelnames + ("le",), labels + (_format_bound(bound),), cumulative
+            yield "_sum", self.labelnames, labels, total
+            yield "_count", self.labelnames, labels, cumulative
+
+
+class Counter:
+    """Thread-safe monotonically increasing counter."""
+
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            snapshot = dict(self._values)
+        for labels, value in sorted(snapshot.items()):
+            yield "", self.labelnames, labels, value
+
+
+class Gauge(Counter):
+    """A value that goes up and down."""
+
+    kind = "gauge"
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+
+REQUEST_SECONDS = Histogram("http_request_duration_seconds",
+                            "Time to response headers per route (time to first byte for streamed responses).",
+                            ("route", "method", "status"))
+IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being handled by this process.")
+STAGE_SECONDS = Histogram("app_stage_duration_seconds", "Duration of instrumented stages per route.",
+                          ("route", "stage"))
+LLM_SECONDS = Histogram("llm_request_duration_seconds",
+                        "Duration of single LLM attempts (to the first chunk for streams).",
+                        ("endpoint", "provider", "outcome"))
+LLM_RETRIES = Counter("llm_retries_total", "LLM attempts that failed retryably and were retried.",
+                      ("endpoint", "provider"))
+
+REGISTRY = [REQUEST_SECONDS, IN_FLIGHT, STAGE_SECONDS, LLM_SECONDS, LLM_RETRIES]
+
+
+def _format_bound(bound):
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def _render_metric(name, kind, help, samples):
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for suffix, labelnames, labels, value in samples:
+        label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in zip(labelnames, labels))
+        lines.append(f"{name}{suffix}{{{label_text}}} {_format_value(value)}" if label_text
+                     else f"{name}{suffix} {_format_value(value)}")
+    return lines
+
+
+def _collected():
+    """Metrics owned by other services, read at scrape time: (name, kind, help, samples)."""
+    from services.ai_service import get_llm_cache
+    from services.llm_call import CLOSED, HALF_OPEN, OPEN, breaker_states
+    from services.tokens import ledger
+
+    token_stats = ledger.stats()
+    for field, help in (("prompt_tokens", "Prompt tokens reported by the provider."),
+                        ("completion_tokens", "Completion tokens reported by the provider."),
+                        ("cached_prompt_tokens", "Prompt tokens the provider served from its prompt cache."),
+                        ("prompt_tokens_est", "Prompt tokens as estimated locally."),
+                        ("completion_tokens_est", "Completion tokens as estimated locally."),
+                        ("calls", "LLM calls recorded in the token ledger.")):
+        name = "llm_calls_total" if field == "calls" else f"llm_{field}_total"
+        yield name, "counter", help, [("", ("template",), (template,), totals[field])
+                                      for template, totals in sorted(token_stats.items())]
+
+    try:
+        cache = get_llm_cache().stats()
+    except Exception:
+        # e.g. the redis package is missing; the rest of the scrape is still useful
+        cache = None
+    if cache is not None:
+        labels = (("backend",), (cache["backend"],))
+        yield "llm_cache_hits_total", "counter", "LLM result cache hits.", [("", *labels, cache["hits"])]
+        yield "llm_cache_misses_total", "counter", "LLM result cache misses.", [("", *labels, cache["misses"])]
+        yield "llm_cache_errors_total", "counter", "LLM result cache backend errors.", [
+            ("", *labels, cache["errors"])]
+        yield "llm_cache_hit_ratio", "gauge", "Share of LLM cache lookups that hit.", [
+            ("", *labels, cache["hit_rate"])]
+
+    from services import log
+    yield "log_records_dropped_total", "counter", "Log records dropped because the log queue was full.", [
+        ("", (), (), log.dropped)]
+
+    codes = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+    yield "llm_circuit_state", "gauge", "Circuit breaker state per provider (0 closed, 1 half open, 2 open).", [
+        ("", ("provider",), (provider,), codes[state]) for provider, state in sorted(breaker_states().items())]
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines += _render_metric(metric.name, metric.kind, metric.help, metric.samples())
+    for name, kind, help, samples in _collected():
+        lines += _render_metric(name, kind, help, samples)
+    return "\n".join(lines) + "\n"
+
+
+def _current_route():
+    from flask import has_request_context, request
+
+    if not has_request_context():
+        return NO_ROUTE
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+
+@contextmanager
+def stage(name):
+    """Times the block as stage name of the current route (see module docstring)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        route = _current_route()
+        STAGE_SECONDS.observe(elapsed, route, name)
+        if route != NO_ROUTE:
+            from flask import g
+
+            timings = g.setdefault("server_timing", {})
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+
+def observe_llm(endpoint, provider, outcome, seconds):
+    LLM_SECONDS.observe(seconds, endpoint, provider, outcome)
+
+
+def server_timing_header(timings, total):
+    entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def init_app(app):
+    """Registers the request hooks and the /metrics route."""
+    from flask import Response, abort, g, request
+
+    if not app.config.get('METRICS_ENABLED'):
+        return
+
+    @app.before_request
+    def _start_timer():
+        g.request_started = time.perf_counter()
+        g.in_flight = True
+        IN_FLIGHT.inc()
+
+    @app.after_request
+    def _record_request(response):
+        started = g.get("request_started")
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        route = _current_route()
+        if route != "/metrics":
+            REQUEST_SECONDS.observe(elapsed, route, request.method, str(response.status_code))
+        if app.config.get('METRICS_SERVER_TIMING'):
+            response.headers["Server-Timing"] = server_timing_header(g.get("server_timing", {}), elapsed)
+        return response
+
+    @app.teardown_request
+    def _finish(_exc):
+        if g.pop("in_flight", False):
+            IN_FLIGHT.dec()
+
+    @app.route("/metrics")
+    def metrics():
+        token = app.config.get('METRICS_TOKEN')
+        if not token:
+            # Open locally; in production the endpoint is only served with a token configured
+            if app.config.get('FLASK_ENV') == "production":
+                abort(403)
+        else:
+            supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+            if not hmac.compare_digest(supplied.encode("utf-8"), token.encode("utf-8")):
+                abort(401)
+        return Response(render(), mimetype="text/plain; version=0.0.4")
@@ -1,19 +1,196 @@
-import fitz  # PyMuPDF
-from docx import Document
+import io
+import multiprocessing
+import os
 import re
+import tempfile
+import threading
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from config import Config
+from services.metrics import stage
+from services.skill_matcher import get_skill_matcher
+from services.taxonomy import get_skill_index
+from services.tokens import estimate_tokens
 
-def extract_text_from_pdf(path):
-    text = []
-    doc = fitz.open(path)
-    for page in doc:
-        text.append(page.get_text("text"))
-    return "\n".join(text)
+# Bump when text extraction or the shape of parse_resume_text's output changes
+PARSER_VERSION = 1
 
-def extract_text_from_docx(path):
-    doc = Document(path)
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+
+def _as_buffer(source):
+    """
+    Returns in-memory sources as bytes-like objects, without copying when possible.
+    Paths are returned unchanged.
+    """
+    if isinstance(source, memoryview):
+        if source.c_contiguous and isinstance(source.obj, (bytes, bytearray)) and source.nbytes == len(source.obj):
+            return source.obj
+        return source.tobytes()
+    return source
+
+
+def _open_pdf(source):
+    """Opens a PDF from a path, or from bytes / bytearray / memoryview without touching disk."""
+    # Imported on first use: PyMuPDF and python-docx add about 100 ms to every cold start
+    import fitz  # PyMuPDF
+
+    source = _as_buffer(source)
+    if isinstance(source, (bytes, bytearray)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source)
+
+
+def preload():
+    """Imports the PDF and DOCX libraries ahead of the first upload."""
+    import docx  # noqa: F401
+    import fitz  # noqa: F401
+
+
+def _open_docx(source):
+    """Opens a DOCX from a path or from an in-memory buffer."""
+    from docx import Document
+
+    source = _as_buffer(source)
+    if isinstance(source, (bytes, bytearray)):
+        return Document(io.BytesIO(source))
+    return Document(source)
+
+
+def _extract_pdf_pages(path, start, stop):
+    """Extracts pages [start, stop) of the PDF at path. Runs inside pool workers."""
+    with _open_pdf(path) as doc:
+        return [doc[i].get_text("text") for i in range(start, stop)]
+
+
+def _get_pdf_pool(workers):
+    """
+    Lazily creates the shared page-extraction pool, or returns None if unavailable.
+    Only reached through extract_text_from_pdf(parallel=True), i.e. from the
+    command line and bulk ingestion, never from a web request.
+    """
+    global _pdf_pool
+    if _pdf_pool is None:
+        with _pdf_pool_lock:
+            if _pdf_pool is None:
+                try:
+                    _pdf_pool = ProcessPoolExecutor(max_workers=workers)
+                except (OSError, NotImplementedError):
+                    # No working semaphores (e.g. AWS Lambda lacks /dev/shm)
+                    _pdf_pool = False
+    return _pdf_pool or None
+
+
+def _pdf_workers():
+    workers = Config.PDF_EXTRACT_WORKERS or min(4, os.cpu_count() or 1)
+    # Bulk ingestion already runs us inside daemonic pool workers, which cannot fork
+    if multiprocessing.current_process().daemon:
+        return 1
+    return workers
+
+
+def extract_text_from_pdf(source, max_pages=None, parallel=False):
+    """
+    source is a file path or the PDF bytes (bytes, bytearray or memoryview).
+    Extracts text from at most max_pages pages (default Config.PDF_MAX_PAGES).
+    With parallel=True, documents with at least Config.PDF_PARALLEL_MIN_PAGES
+    pages are split into page ranges across worker processes, which each open
+    the file by path (bytes are written to one temp file first, instead of
+    being pickled into every task); text is merged back in page order.
+    Web requests extract serially, and so do daemonic pool workers (bulk_ingest
+    with more than one worker), which cannot start processes of their own.
+    """
+    max_pages = max_pages or Config.PDF_MAX_PAGES
+    source = _as_buffer(source)
+    with _open_pdf(source) as doc:
+        page_count = min(doc.page_count, max_pages)
+        workers = _pdf_workers() if parallel else 1
+        if page_count < Config.PDF_PARALLEL_MIN_PAGES or workers < 2:
+            return "\n".join(doc[i].get_text("text") for i in range(page_count))
+        pool = _get_pdf_pool(workers)
+        if pool is None:
+            return "\n".join(doc[i].get_text("text") for i in range(page_count))
+
+    tmp_path = None
+    if isinstance(source, (bytes, bytearray)):
+        fd, tmp_path = tempfile.mkstemp(suffix=".pdf")
+        with os.fdopen(fd, "wb") as f:
+            f.write(source)
+    try:
+        step = -(-page_count // workers)
+        futures = [
+            pool.submit(_extract_pdf_pages, tmp_path or source, start, min(start + step, page_count))
+            for start in range(0, page_count, step)
+        ]
+        text = []
+        for future in futures:
+            text.extend(future.result())
+        return "\n".join(text)
+    finally:
+        if tmp_path:
+            os.remove(tmp_path)
+
+def extract_text_from_docx(source):
+    doc = _open_docx(source)
     paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
     return "\n".join(paragraphs)
 
+def iter_pdf_pages(source, max_pages=None):
+    """Lazily yields the text of each page; the document is closed when the generator is."""
+    max_pages = max_pages or Config.PDF_MAX_PAGES
+    with _open_pdf(source) as doc:
+        for i in range(min(doc.page_count, max_pages)):
+            yield doc[i].get_text("text")
+
+def iter_docx_paragraphs(source):
+    """Lazily yields non-empty DOCX paragraphs."""
+    for p in _open_docx(source).paragraphs:
+        if p.text.strip():
+            yield p.text
+
+def iter_resume_text(source, filename, char_budget=None):
+    """
+    source is a file path or the uploaded bytes; filename decides the format.
+    Yields resume text chunks (PDF pages or DOCX paragraphs) in document order.
+    With char_budget set, stops reading once that many characters have been yielded,
+    so only the first pages of a long document are ever extracted.
+    """
+    if filename.lower().endswith(".pdf"):
+        chunks = iter_pdf_pages(source)
+    elif filename.lower().endswith(".docx"):
+        chunks = iter_docx_paragraphs(source)
+    else:
+        raise ValueError("Unsupported file type")
+    total = 0
+    try:
+        for chunk in chunks:
+            yield chunk
+            total += len(chunk) + 1
+            if char_budget is not None and total >= char_budget:
+                break
+    finally:
+        chunks.close()
+
+def read_text_prefix(source, filename, char_budget):
+    """
+    Returns (text, complete): the first char_budget characters of a resume, read
+    without extracting the rest, and whether they are the whole document (in
+    which case text equals what parse_resume_file would extract).
+    """
+    chunks = []
+    total = 0
+    reader = iter_resume_text(source, filename)
+    try:
+        for chunk in reader:
+            if total >= char_budget:
+                return "\n".join(chunks)[:char_budget], False
+            chunks.append(chunk)
+            total += len(chunk) + 1
+    finally:
+        reader.close()
+    return "\n".join(chunks), True
+
 # def simple_skill_extractor(text, skills_list=None):
 #     """
 #     Very simple keyword-based skill extractor. For production, use NLP models.
@@ -35,567 +212,20 @@ def extract_text_from_docx(path):
 def simple_skill_extractor(text, skills_list=None):
     """
     Ultimate comprehensive skill extractor covering ALL career domains.
-    skills_list: list of skills to check. If None, use the comprehensive set below.
+    skills_list: list of skills to check. If None, use the compiled skill taxonomy
+    (data/skills_taxonomy.json). Matching is a single word-bounded Aho-Corasick pass.
     """
     if skills_list is None:
-        skills_list = [
-            # ============ TECHNOLOGY & IT ============
-            
-            # Programming Languages
-            "python", "java", "javascript", "typescript", "c++", "c#", "c", "ruby", "php",
-            "swift", "kotlin", "go", "golang", "rust", "scala", "r", "matlab", "perl",
-            "objective-c", "dart", "lua", "haskell", "elixir", "clojure", "f#", "groovy",
-            "shell scripting", "bash", "powershell", "vba", "assembly", "cobol", "fortran",
-            
-            # Web Development - Frontend
-            "html", "html5", "css", "css3", "sass", "scss", "less", "tailwind css", "tailwind",
-            "bootstrap", "material ui", "mui", "chakra ui", "ant design", "bulma",
-            "react", "react.js", "reactjs", "next.js", "nextjs", "vue", "vue.js", "vuejs",
-            "nuxt.js", "nuxt", "angular", "angularjs", "svelte", "ember.js", "backbone.js",
-            "jquery", "webpack", "vite", "parcel", "rollup", "babel", "redux", "mobx",
-            "vuex", "pinia", "react native", "flutter", "ionic", "cordova", "electron",
-            
-            # Web Development - Backend
-            "node.js", "nodejs", "express", "express.js", "nest.js", "nestjs", "koa",
-            "django", "flask", "fastapi", "pyramid", "tornado", "aiohttp",
-            "spring", "spring boot", "hibernate", "struts", "jsp", "servlets",
-            "asp.net", ".net", ".net core", "blazor", "wcf", "web api",
-            "ruby on rails", "rails", "sinatra", "laravel", "symfony", "codeigniter",
-            "cakephp", "yii", "zend", "slim", "lumen",
-            
-            # Mobile Development
-            "android", "ios", "react native", "flutter", "xamarin", "ionic", "cordova",
-            "swift", "swiftui", "objective-c", "kotlin", "java android", "jetpack compose",
-            
-            # Databases - SQL
-            "sql", "mysql", "postgresql", "postgres", "oracle", "oracle db", "sql server",
-            "mssql", "mariadb", "sqlite", "db2", "sybase", "teradata", "snowflake",
-            "amazon aurora", "google cloud sql", "azure sql",
-            
-            # Databases - NoSQL
-            "mongodb", "cassandra", "couchdb", "redis", "memcached", "dynamodb",
-            "elasticsearch", "neo4j", "graph database", "firebase", "firestore",
-            "cosmosdb", "hbase", "riak", "aerospike", "influxdb", "timescaledb",
-            
-            # Cloud Platforms
-            "aws", "amazon web services", "ec2", "s3", "lambda", "cloudformation",
-            "elastic beanstalk", "rds", "dynamodb", "cloudfront", "route 53", "vpc",
-            "azure", "microsoft azure", "azure devops", "azure functions", "azure ad",
-            "gcp", "google cloud", "google cloud platform", "compute engine", "app engine",
-            "cloud functions", "bigquery", "cloud storage", "kubernetes engine",
-            "heroku", "digitalocean", "linode", "vultr", "ibm cloud", "oracle cloud",
-            "alibaba cloud", "salesforce cloud",
-            
-            # DevOps & CI/CD
-            "docker", "kubernetes", "k8s", "helm", "jenkins", "gitlab ci", "github actions",
-            "circleci", "travis ci", "bamboo", "teamcity", "azure pipelines",
-            "terraform", "ansible", "puppet", "chef", "saltstack", "vagrant",
-            "ci/cd", "continuous integration", "continuous deployment", "gitops",
-            "argocd", "flux", "spinnaker", "octopus deploy",
-            
-            # Version Control
-            "git", "github", "gitlab", "bitbucket", "svn", "subversion", "mercurial",
-            "perforce", "tfs", "azure repos", "git flow", "trunk based development",
-            
-            # Data Science & Machine Learning
-            "machine learning", "deep learning", "artificial intelligence", "ai", "ml",
-            "data science", "data analysis", "data analytics", "big data",
-            "tensorflow", "pytorch", "keras", "scikit-learn", "sklearn", "pandas",
-            "numpy", "scipy", "matplotlib", "seaborn", "plotly", "opencv", "cv2",
-            "nltk", "spacy", "transformers", "hugging face", "langchain",
-            "xgboost", "lightgbm", "catboost", "random forest", "neural networks",
-            "cnn", "rnn", "lstm", "gru", "gan", "transformer", "bert", "gpt",
-            "computer vision", "nlp", "natural language processing", "reinforcement learning",
-            "supervised learning", "unsupervised learning", "feature engineering",
-            
-            # Data Engineering & Big Data
-            "hadoop", "spark", "apache spark", "pyspark", "hive", "pig", "mapreduce",
-            "kafka", "apache kafka", "flink", "storm", "airflow", "luigi", "nifi",
-            "databricks", "snowflake", "redshift", "bigquery", "data warehouse",
-            "etl", "elt", "data pipeline", "data modeling", "dbt", "talend", "informatica",
-            
-            # Business Intelligence & Analytics
-            "tableau", "power bi", "looker", "qlik", "qlikview", "qlik sense",
-            "metabase", "superset", "grafana", "kibana", "splunk", "datadog",
-            "google analytics", "adobe analytics", "mixpanel", "amplitude",
-            "excel", "advanced excel", "vba", "pivot tables", "vlookup", "power query",
-            "google sheets", "data visualization", "dashboards", "reporting",
-            
-            # Testing & QA
-            "selenium", "cypress", "playwright", "puppeteer", "jest", "mocha", "chai",
-            "jasmine", "karma", "pytest", "unittest", "junit", "testng", "cucumber",
-            "behave", "robot framework", "appium", "detox", "espresso", "xctest",
-            "postman", "rest assured", "jmeter", "loadrunner", "gatling", "locust",
-            "test automation", "manual testing", "qa", "quality assurance", "tdd",
-            "bdd", "unit testing", "integration testing", "e2e testing", "regression testing",
-            
-            # API & Integration
-            "rest api", "restful", "graphql", "soap", "grpc", "websocket", "api gateway",
-            "microservices", "soa", "service oriented architecture", "api design",
-            "swagger", "openapi", "postman", "insomnia", "api testing",
-            
-            # Security & Cybersecurity
-            "cybersecurity", "information security", "network security", "application security",
-            "penetration testing", "ethical hacking", "vulnerability assessment", "siem",
-            "firewall", "ids", "ips", "vpn", "ssl", "tls", "encryption", "cryptography",
-            "oauth", "jwt", "saml", "sso", "ldap", "active directory", "iam",
-            "owasp", "security auditing", "compliance", "gdpr", "hipaa", "pci dss",
-            "kali linux", "metasploit", "burp suite", "wireshark", "nmap", "nessus",
-            
-            # Networking
-            "tcp/ip", "dns", "dhcp", "http", "https", "ftp", "ssh", "telnet",
-            "routing", "switching", "vlan", "bgp", "ospf", "mpls", "wan", "lan",
-            "cisco", "juniper", "fortinet", "palo alto", "f5", "load balancing",
-            
-            # Operating Systems & System Administration
-            "linux", "unix", "ubuntu", "centos", "rhel", "debian", "fedora", "arch linux",
-            "windows server", "windows", "macos", "system administration", "sysadmin",
-            "active directory", "group policy", "powershell", "bash scripting",
-            "shell scripting", "cron", "systemd", "apache", "nginx", "iis", "tomcat",
-            
-            # Blockchain & Web3
-            "blockchain", "ethereum", "solidity", "smart contracts", "web3", "defi",
-            "nft", "cryptocurrency", "bitcoin", "hyperledger", "truffle", "hardhat",
-            "metamask", "ipfs", "polygon", "binance smart chain",
-            
-            # Game Development
-            "unity", "unreal engine", "godot", "game development", "c# unity", "blueprint",
-            "3d modeling", "blender", "maya", "3ds max", "substance painter", "zbrush",
-            "game design", "level design", "shader programming", "opengl", "directx", "vulkan",
-            
-            # Design & Creative
-            "ui design", "ux design", "ui/ux", "user experience", "user interface",
-            "figma", "sketch", "adobe xd", "invision", "zeplin", "prototyping",
-            "wireframing", "photoshop", "illustrator", "indesign", "after effects",
-            "premiere pro", "canva", "graphic design", "web design", "responsive design",
-            "accessibility", "wcag", "design systems", "material design", "human centered design",
-            
-            # ERP & CRM Systems
-            "sap", "sap erp", "sap hana", "sap fico", "sap mm", "sap sd", "sap abap",
-            "oracle erp", "oracle fusion", "peoplesoft", "jd edwards", "netsuite",
-            "salesforce", "salesforce crm", "salesforce admin", "salesforce developer",
-            "apex", "visualforce", "lightning", "dynamics 365", "microsoft dynamics",
-            "hubspot", "zoho", "servicenow", "workday", "successfactors",
-            
-            # Content Management Systems
-            "wordpress", "drupal", "joomla", "magento", "shopify", "woocommerce",
-            "contentful", "strapi", "sanity", "ghost", "webflow", "squarespace",
-            
-            # Emerging Technologies
-            "iot", "internet of things", "edge computing", "5g", "quantum computing",
-            "ar", "vr", "augmented reality", "virtual reality", "mixed reality",
-            "chatbot", "conversational ai", "rpa", "robotic process automation",
-            "low code", "no code", "serverless", "jamstack", "progressive web apps", "pwa",
-            
-            
-            # ============ BUSINESS & FINANCE ============
-            
-            # Accounting & Finance
-            "accounting", "bookkeeping", "financial accounting", "management accounting",
-            "cost accounting", "tax accounting", "forensic accounting", "auditing",
-            "internal audit", "external audit", "financial reporting", "ifrs", "gaap",
-            "accounts payable", "accounts receivable", "general ledger", "journal entries",
-            "reconciliation", "financial statements", "balance sheet", "income statement",
-            "cash flow statement", "budgeting", "forecasting", "variance analysis",
-            "financial planning", "financial analysis", "financial modeling",
-            "valuation", "dcf", "discounted cash flow", "npv", "irr", "roi",
-            "quickbooks", "xero", "sage", "tally", "freshbooks", "wave accounting",
-            
-            # Investment & Trading
-            "investment banking", "equity research", "portfolio management", "asset management",
-            "wealth management", "private equity", "venture capital", "hedge funds",
-            "trading", "stock trading", "forex trading", "derivatives", "options",
-            "futures", "commodities", "fixed income", "bonds", "securities",
-            "bloomberg terminal", "reuters", "capital iq", "factset", "morningstar",
-            "technical analysis", "fundamental analysis", "quantitative analysis",
-            "risk management", "credit risk", "market risk", "operational risk",
-            
-            # Banking & Insurance
-            "retail banking", "commercial banking", "corporate banking", "investment banking",
-            "loan processing", "credit analysis", "underwriting", "mortgage lending",
-            "insurance", "life insurance", "health insurance", "property insurance",
-            "claims processing", "actuarial science", "risk assessment", "reinsurance",
-            
-            # Business Analysis & Strategy
-            "business analysis", "requirements gathering", "process improvement",
-            "business process modeling", "bpmn", "process mapping", "gap analysis",
-            "swot analysis", "pestle analysis", "porter's five forces", "value chain analysis",
-            "business strategy", "strategic planning", "competitive analysis",
-            "market research", "market analysis", "feasibility study", "business case",
-            "stakeholder management", "change management", "organizational development",
-            
-            # Project Management
-            "project management", "pmp", "prince2", "agile", "scrum", "kanban",
-            "waterfall", "lean", "six sigma", "kaizen", "sprint planning",
-            "backlog grooming", "retrospectives", "stand-ups", "risk management",
-            "resource management", "schedule management", "cost management",
-            "quality management", "procurement management", "communication management",
-            "jira", "confluence", "trello", "asana", "monday.com", "notion",
-            "ms project", "primavera", "smartsheet", "basecamp", "wrike",
-            
-            # Sales & Business Development
-            "sales", "business development", "lead generation", "prospecting",
-            "cold calling", "warm calling", "sales presentations", "product demos",
-            "negotiation", "closing", "account management", "relationship management",
-            "crm", "salesforce", "hubspot crm", "pipedrive", "zoho crm",
-            "b2b sales", "b2c sales", "enterprise sales", "inside sales", "outside sales",
-            "consultative selling", "solution selling", "value selling", "spin selling",
-            "sales forecasting", "pipeline management", "quota attainment",
-            
-            # Marketing & Advertising
-            "marketing", "digital marketing", "content marketing", "inbound marketing",
-            "outbound marketing", "growth marketing", "performance marketing",
-            "brand management", "brand strategy", "brand positioning", "brand identity",
-            "marketing strategy", "marketing campaigns", "campaign management",
-            "seo", "search engine optimization", "sem", "search engine marketing",
-            "ppc", "pay per click", "google ads", "google adwords", "facebook ads",
-            "instagram ads", "linkedin ads", "twitter ads", "tiktok ads",
-            "social media marketing", "social media management", "community management",
-            "email marketing", "marketing automation", "mailchimp", "hubspot",
-            "marketo", "pardot", "activecampaign", "constant contact",
-            "copywriting", "content writing", "technical writing", "creative writing",
-            "video marketing", "influencer marketing", "affiliate marketing",
-            "marketing analytics", "google analytics", "adobe analytics", "tag manager",
-            "conversion rate optimization", "cro", "a/b testing", "multivariate testing",
-            
-            # Public Relations & Communications
-            "public relations", "pr", "media relations", "press releases", "crisis management",
-            "corporate communications", "internal communications", "external communications",
-            "stakeholder communications", "investor relations", "public affairs",
-            "reputation management", "brand communications", "event management",
-            
-            # Human Resources
-            "human resources", "hr", "recruitment", "talent acquisition", "hiring",
-            "interviewing", "candidate screening", "onboarding", "employee engagement",
-            "performance management", "performance appraisal", "compensation", "benefits",
-            "payroll", "hris", "workday", "successfactors", "bamboohr", "adp",
-            "employee relations", "labor relations", "conflict resolution",
-            "training and development", "learning and development", "l&d",
-            "organizational development", "od", "talent management", "succession planning",
-            "workforce planning", "hr analytics", "people analytics",
-            "diversity and inclusion", "dei", "employee wellness", "hr compliance",
-            
-            # Operations & Supply Chain
-            "operations management", "supply chain management", "logistics",
-            "procurement", "sourcing", "vendor management", "supplier management",
-            "inventory management", "warehouse management", "distribution",
-            "transportation", "freight forwarding", "customs clearance",
-            "demand planning", "supply planning", "production planning",
-            "capacity planning", "materials management", "mrp", "erp",
-            "lean manufacturing", "just in time", "jit", "kanban", "5s",
-            "quality control", "quality assurance", "iso 9001", "iso 14001",
-            "continuous improvement", "process optimization", "operational excellence",
-            
-            
-            # ============ HEALTHCARE & MEDICAL ============
-            
-            # Clinical & Patient Care
-            "patient care", "clinical assessment", "diagnosis", "treatment planning",
-            "medication administration", "vital signs monitoring", "wound care",
-            "infection control", "patient safety", "bedside manner", "empathy",
-            "clinical documentation", "medical records", "emr", "ehr", "epic", "cerner",
-            "nursing", "registered nurse", "rn", "lpn", "cna", "critical care",
-            "emergency care", "trauma care", "pediatric care", "geriatric care",
-            "oncology", "cardiology", "neurology", "orthopedics", "obstetrics",
-            
-            # Medical Specialties
-            "internal medicine", "family medicine", "surgery", "general surgery",
-            "cardiothoracic surgery", "neurosurgery", "orthopedic surgery",
-            "plastic surgery", "anesthesiology", "radiology", "pathology",
-            "dermatology", "ophthalmology", "otolaryngology", "ent",
-            "psychiatry", "psychology", "counseling", "therapy", "psychotherapy",
-            "physical therapy", "occupational therapy", "speech therapy",
-            "respiratory therapy", "radiation therapy", "chemotherapy",
-            
-            # Medical Technology & Equipment
-            "medical devices", "diagnostic equipment", "imaging", "x-ray", "ct scan",
-            "mri", "ultrasound", "ecg", "ekg", "eeg", "ventilator", "dialysis",
-            "laboratory equipment", "microscopy", "spectroscopy", "chromatography",
-            "medical software", "pacs", "ris", "lis", "telemedicine", "telehealth",
-            
-            # Pharmacy & Pharmaceuticals
-            "pharmacy", "pharmacology", "pharmaceutical", "drug dispensing",
-            "medication therapy management", "clinical pharmacy", "compounding",
-            "pharmaceutical research", "drug development", "clinical trials",
-            "pharmacovigilance", "regulatory affairs", "fda", "gmp", "gcp",
-            
-            # Healthcare Administration
-            "healthcare administration", "hospital management", "clinic management",
-            "medical billing", "medical coding", "icd-10", "cpt codes", "hcpcs",
-            "insurance verification", "claims processing", "revenue cycle management",
-            "healthcare compliance", "hipaa", "patient scheduling", "medical transcription",
-            
-            
-            # ============ EDUCATION & TRAINING ============
-            
-            # Teaching & Instruction
-            "teaching", "instruction", "curriculum development", "lesson planning",
-            "classroom management", "student assessment", "grading", "differentiated instruction",
-            "special education", "inclusive education", "gifted education",
-            "early childhood education", "elementary education", "secondary education",
-            "higher education", "adult education", "vocational training",
-            "online teaching", "e-learning", "distance learning", "blended learning",
-            "instructional design", "learning management systems", "lms",
-            "moodle", "blackboard", "canvas", "google classroom", "zoom teaching",
-            
-            # Educational Technology
-            "educational technology", "edtech", "learning technologies",
-            "adaptive learning", "gamification", "educational games",
-            "smart boards", "interactive whiteboards", "educational apps",
-            "stem education", "steam education", "coding for kids",
-            
-            # Academic & Research
-            "academic research", "research methodology", "qualitative research",
-            "quantitative research", "mixed methods", "literature review",
-            "data collection", "survey design", "statistical analysis", "spss",
-            "academic writing", "research papers", "thesis writing", "dissertation",
-            "peer review", "publication", "grant writing", "research proposals",
-            
-            # Training & Development
-            "corporate training", "employee training", "skills training",
-            "leadership development", "management training", "soft skills training",
-            "technical training", "compliance training", "safety training",
-            "train the trainer", "facilitation", "workshop design", "webinar hosting",
-            
-            
-            # ============ LEGAL & LAW ============
-            
-            # Legal Practice Areas
-            "corporate law", "commercial law", "contract law", "business law",
-            "intellectual property", "ip law", "patent law", "trademark law", "copyright",
-            "litigation", "civil litigation", "criminal law", "family law", "divorce law",
-            "real estate law", "property law", "employment law", "labor law",
-            "immigration law", "tax law", "bankruptcy law", "estate planning",
-            "wills and trusts", "probate", "personal injury", "medical malpractice",
-            "environmental law", "regulatory compliance", "antitrust law",
-            
-            # Legal Skills & Tools
-            "legal research", "legal writing", "legal drafting", "contract drafting",
-            "legal analysis", "case law research", "statutory interpretation",
-            "westlaw", "lexisnexis", "legal databases", "e-discovery", "document review",
-            "deposition", "trial preparation", "courtroom procedure", "mediation",
-            "arbitration", "negotiation", "due diligence", "compliance",
-            "paralegal", "legal assistant", "case management", "legal technology",
-            
-            
-            # ============ ENGINEERING (NON-SOFTWARE) ============
-            
-            # Mechanical Engineering
-            "mechanical engineering", "cad", "autocad", "solidworks", "catia", "creo",
-            "mechanical design", "product design", "machine design", "thermodynamics",
-            "fluid mechanics", "heat transfer", "mechanics of materials", "dynamics",
-            "manufacturing", "cnc machining", "3d printing", "additive manufacturing",
-            "fea", "finite element analysis", "cfd", "computational fluid dynamics",
-            "hvac", "refrigeration", "automotive engineering", "aerospace engineering",
-            
-            # Electrical & Electronics Engineering
-            "electrical engineering", "electronics engineering", "circuit design",
-            "pcb design", "eagle", "altium", "kicad", "analog circuits", "digital circuits",
-            "power systems", "power electronics", "control systems", "plc programming",
-            "scada", "embedded systems", "microcontrollers", "arduino", "raspberry pi",
-            "signal processing", "telecommunications", "rf engineering", "antenna design",
-            "instrumentation", "sensors", "actuators", "robotics", "automation",
-            
-            # Civil Engineering
-            "civil engineering", "structural engineering", "structural analysis",
-            "structural design", "concrete design", "steel design", "foundation design",
-            "geotechnical engineering", "soil mechanics", "transportation engineering",
-            "highway design", "traffic engineering", "water resources engineering",
-            "hydraulics", "hydrology", "environmental engineering", "surveying",
-            "construction management", "project planning", "quantity surveying",
-            "cost estimation", "revit", "staad pro", "etabs", "sap2000",
-            
-            # Chemical & Process Engineering
-            "chemical engineering", "process engineering", "process design",
-            "chemical process", "unit operations", "mass transfer", "heat transfer",
-            "reaction engineering", "process control", "process safety", "hazop",
-            "aspen plus", "hysys", "petrochemical", "refinery", "pharmaceutical manufacturing",
-            
-            # Industrial Engineering
-            "industrial engineering", "operations research", "optimization",
-            "linear programming", "simulation", "discrete event simulation",
-            "facility layout", "plant layout", "ergonomics", "work study",
-            "time study", "method study", "productivity improvement", "quality engineering",
-            
-            
-            # ============ ARCHITECTURE & CONSTRUCTION ============
-            
-            "architecture", "architectural design", "building design", "space planning",
-            "urban planning", "urban design", "landscape architecture", "interior design",
-            "revit", "archicad", "sketchup", "rhino", "grasshopper", "3ds max", "vray",
-            "lumion", "enscape", "architectural visualization", "bim", "building information modeling",
-            "construction", "construction management", "site supervision", "quality control",
-            "safety management", "building codes", "zoning regulations", "green building",
-            "leed", "sustainable design", "passive design", "energy efficiency",
-            
-            
-            # ============ MEDIA & ENTERTAINMENT ============
-            
-            # Film & Video Production
-            "film production", "video production", "cinematography", "videography",
-            "camera operation", "lighting", "sound recording", "audio engineering",
-            "video editing", "premiere pro", "final cut pro", "davinci resolve",
-            "color grading", "color correction", "motion graphics", "after effects",
-            "visual effects", "vfx", "compositing", "nuke", "fusion",
-            "3d animation", "2d animation", "character animation", "rigging",
-            "storyboarding", "scriptwriting", "directing", "producing",
-            
-            # Audio & Music
-            "audio production", "music production", "sound design", "mixing",
-            "mastering", "recording", "pro tools", "logic pro", "ableton live",
-            "fl studio", "cubase", "reaper", "audio engineering", "acoustics",
-            "live sound", "sound reinforcement", "music composition", "arranging",
-            "music theory", "midi", "synthesizers", "daw", "digital audio workstation",
-            
-            # Broadcasting & Journalism
-            "journalism", "news writing", "reporting", "investigative journalism",
-            "broadcast journalism", "television", "radio", "podcasting",
-            "news anchoring", "presenting", "interviewing", "fact checking",
-            "editing", "proofreading", "ap style", "content creation",
-            
-            # Photography
-            "photography", "portrait photography", "wedding photography",
-            "commercial photography", "product photography", "fashion photography",
-            "landscape photography", "wildlife photography", "photojournalism",
-            "photo editing", "lightroom", "photoshop", "capture one",
-            "studio lighting", "natural light", "composition", "color theory",
-            
-            
-            # ============ HOSPITALITY & TOURISM ============
-            
-            "hospitality management", "hotel management", "front office operations",
-            "housekeeping", "food and beverage", "f&b", "restaurant management",
-            "culinary arts", "cooking", "baking", "pastry", "chef", "sous chef",
-            "menu planning", "food safety", "haccp", "customer service",
-            "guest relations", "concierge", "event planning", "event management",
-            "catering", "banquet management", "tourism", "travel planning",
-            "tour operations", "destination management", "airline operations",
-            "airport operations", "cruise operations", "resort management",
-            
-            
-            # ============ RETAIL & CUSTOMER SERVICE ============
-            
-            "retail management", "store management", "merchandising", "visual merchandising",
-            "inventory management", "stock management", "pos systems", "point of sale",
-            "customer service", "customer support", "customer experience", "cx",
-            "call center", "contact center", "helpdesk", "technical support",
-            "troubleshooting", "ticket management", "zendesk", "freshdesk",
-            "intercom", "live chat", "phone support", "email support",
-            "complaint handling", "conflict resolution", "customer retention",
-            
-            
-            # ============ REAL ESTATE & PROPERTY ============
-            
-            "real estate", "property management", "leasing", "tenant relations",
-            "property valuation", "appraisal", "real estate sales", "brokerage",
-            "real estate investment", "property development", "construction management",
-            "facility management", "building maintenance", "property law",
-            "real estate marketing", "property listing", "mls", "real estate finance",
-            
-            
-            # ============ SCIENCE & RESEARCH ============
-            
-            # Life Sciences
-            "biology", "molecular biology", "cell biology", "genetics", "genomics",
-            "biotechnology", "microbiology", "immunology", "biochemistry",
-            "bioinformatics", "proteomics", "metabolomics", "neuroscience",
-            "ecology", "environmental science", "marine biology", "botany", "zoology",
-            
-            # Physical Sciences
-            "physics", "chemistry", "organic chemistry", "inorganic chemistry",
-            "analytical chemistry", "physical chemistry", "materials science",
-            "nanotechnology", "astronomy", "astrophysics", "geology", "geophysics",
-            
-            # Laboratory Skills
-            "laboratory techniques", "lab skills", "pcr", "gel electrophoresis",
-            "western blot", "elisa", "cell culture", "microscopy", "spectroscopy",
-            "chromatography", "hplc", "gc-ms", "mass spectrometry", "nmr",
-            "lab safety", "gmp", "glp", "quality control", "quality assurance",
-            
-            
-            # ============ AGRICULTURE & ENVIRONMENT ============
-            
-            "agriculture", "agronomy", "crop science", "soil science", "horticulture",
-            "animal husbandry", "veterinary", "livestock management", "poultry farming",
-            "dairy farming", "organic farming", "sustainable agriculture",
-            "precision agriculture", "irrigation", "pest management", "fertilizers",
-            "agricultural engineering", "farm management", "forestry", "agroforestry",
-            "environmental management", "environmental consulting", "sustainability",
-            "climate change", "carbon footprint", "renewable energy", "solar energy",
-            "wind energy", "waste management", "recycling", "water treatment",
-            
-            
-            # ============ SOCIAL WORK & COUNSELING ============
-            
-            "social work", "case management", "counseling", "mental health counseling",
-            "substance abuse counseling", "family counseling", "marriage counseling",
-            "career counseling", "school counseling", "crisis intervention",
-            "trauma counseling", "grief counseling", "group therapy", "cbt",
-            "cognitive behavioral therapy", "dbt", "dialectical behavior therapy",
-            "psychotherapy", "clinical psychology", "child psychology",
-            "community outreach", "advocacy", "social services", "welfare",
-            
-            
-            # ============ GOVERNMENT & PUBLIC SECTOR ============
-            
-            "public administration", "public policy", "policy analysis", "governance",
-            "public sector management", "civil service", "government relations",
-            "regulatory affairs", "compliance", "public procurement", "grant management",
-            "program management", "community development", "urban planning",
-            "public health", "epidemiology", "health policy", "emergency management",
-            "disaster management", "homeland security", "law enforcement", "policing",
-            
-            
-            # ============ SPORTS & FITNESS ============
-            
-            "personal training", "fitness training", "strength training", "cardio training",
-            "yoga", "pilates", "crossfit", "sports coaching", "athletic training",
-            "sports medicine", "physical therapy", "sports nutrition", "nutrition",
-            "dietetics", "meal planning", "weight management", "wellness coaching",
-            "sports management", "sports marketing", "event management",
-            
-            
-            # ============ TRANSPORTATION & LOGISTICS ============
-            
-            "transportation", "logistics", "supply chain", "freight forwarding",
-            "shipping", "customs clearance", "import export", "trade compliance",
-            "fleet management", "route optimization", "warehouse management",
-            "distribution", "last mile delivery", "cold chain", "3pl", "4pl",
-            "tms", "transportation management system", "wms", "warehouse management system",
-            
-            
-            # ============ SOFT SKILLS (UNIVERSAL) ============
-            
-            "communication", "verbal communication", "written communication",
-            "presentation skills", "public speaking", "active listening",
-            "leadership", "team leadership", "team management", "people management",
-            "mentoring", "coaching", "delegation", "motivation", "team building",
-            "problem solving", "critical thinking", "analytical thinking",
-            "creative thinking", "innovation", "decision making", "judgment",
-            "time management", "prioritization", "organization", "multitasking",
-            "attention to detail", "accuracy", "quality focus",
-            "collaboration", "teamwork", "interpersonal skills", "relationship building",
-            "networking", "stakeholder management", "client management",
-            "negotiation", "persuasion", "influence", "conflict resolution",
-            "emotional intelligence", "empathy", "adaptability", "flexibility",
-            "resilience", "stress management", "work ethic", "professionalism",
-            "integrity", "accountability", "reliability", "initiative",
-            "self motivation", "continuous learning", "growth mindset",
-            "cultural awareness", "diversity", "inclusion", "cross cultural communication",
-        ]
-    
-    text_lower = text.lower()
-    found = []
-    
-    # Use set for faster lookup and avoid duplicates
-    seen = set()
-    for skill in skills_list:
-        # Use word boundary matching for better accuracy
-        if skill in text_lower and skill not in seen:
-            found.append(skill)
-            seen.add(skill)
-    
-    return found
+        return get_skill_index().extract(text)
+    return get_skill_matcher(skills_list).extract(text)
+
+
+def group_skills_by_category(skill_hits):
+    """Turns MappedSkillIndex.find() output into {category: [skill, ...]}."""
+    categories = {}
+    for skill, hit in skill_hits.items():
+        categories.setdefault(hit["category"], []).append(skill)
+    return categories
 
 
 def extract_name_from_text(text):
@@ -624,23 +254,198 @@ def extract_name_from_text(text):
     
     return None
 
-def parse_resume_file(path, filename):
-    if filename.lower().endswith(".pdf"):
-        raw = extract_text_from_pdf(path)
-    elif filename.lower().endswith(".docx"):
-        raw = extract_text_from_docx(path)
-    else:
-        raise ValueError("Unsupported file type")
+def parse_resume_file(source, filename, parallel=False):
+    """
+    source is a file path, or the uploaded bytes / memoryview to parse in memory.
+    parallel=True allows page-parallel PDF extraction (command line and bulk paths).
+    Returns (raw_text, parsed_data).
+    """
+    with stage("extract"):
+        if filename.lower().endswith(".pdf"):
+            raw = extract_text_from_pdf(source, parallel=parallel)
+        elif filename.lower().endswith(".docx"):
+            raw = extract_text_from_docx(source)
+        else:
+            raise ValueError("Unsupported file type")
+    return raw, parse_resume_text(raw)
+
+def parser_version():
+    """
+    Identifies everything parsed_data depends on: the parser, the skill taxonomy
+    (a hot-reloaded taxonomy changes its digest), the ATS scorer and the page cap.
+    Stored in parsed_data, so stale parse results are not reused for new uploads.
+    """
+    from services.ats_scorer import SCORER_VERSION
+
+    index = get_skill_index()
+    return f"{PARSER_VERSION}-{index.source_digest.hex()}-ats{SCORER_VERSION}-p{Config.PDF_MAX_PAGES}"
+
+def parse_resume_text(raw):
     # Simple heuristics: extract name, emails, phone, skills
     name = extract_name_from_text(raw)
     email = re.search(r"[\w\.-]+@[\w\.-]+", raw)
     phone = re.search(r"(\+?\d{10,15})", raw)
-    skills = simple_skill_extractor(raw)
+    with stage("skills"):
+        skill_hits = get_skill_index().find(raw)
     parsed = {
         "name": name,
         "email": email.group(0) if email else None,
         "phone": phone.group(0) if phone else None,
-        "skills": skills,
+        "skills": list(skill_hits),
+        "skill_categories": group_skills_by_category(skill_hits),
         "raw_text_snippet": raw[:500]
     }
-    return raw, parsed
+    # Instant local rubric score, shown until the AI analysis is ready
+    from services.ats_scorer import score_resume
+    with stage("ats_preview"):
+        preview = score_resume(raw, parsed)
+    parsed["ats_preview"] = {key: preview[key] for key in
+                             ("score", "score_breakdown", "deductions_applied", "quantifiable_achievements_count")}
+    parsed["parser_version"] = parser_version()
+    return parsed
+
+
+# --- Prompt preparation -----------------------------------------------------
+
+_INVISIBLE_RE = re.compile("[\u00ad\u200b\u200c\u200d\u2060\ufeff]")
+_BULLET_RE = re.compile(r"^[\u2022\u25cf\u25aa\u25a0\u25e6\u2023\u2219\u00b7\u25cb\u25ba\u25b6\u2713\u2714\u27a2\u27a4\u2043\u2013\u2014*\-]+\s*")
+_HYPHEN_BREAK_RE = re.compile(r"(\w)-\n\s*([a-z])")
+_PAGE_NUMBER_RE = re.compile(r"^(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?$", re.IGNORECASE)
+_CONTACT_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+|\+?\d[\d\s().-]{8,}\d|linkedin\.com|github\.com|https?://|www\.", re.IGNORECASE)
+_SENTENCE_END = ".:;!?)"
+
+# Section headings as they appear on resumes, mapped to a canonical name
+SECTION_ALIASES = {
+    "summary": "summary", "professional summary": "summary", "profile": "summary",
+    "objective": "summary", "about me": "summary", "career objective": "summary",
+    "experience": "experience", "work experience": "experience", "professional experience": "experience",
+    "employment": "experience", "employment history": "experience", "work history": "experience",
+    "skills": "skills", "technical skills": "skills", "core competencies": "skills", "key skills": "skills",
+    "projects": "projects", "personal projects": "projects", "key projects": "projects",
+    "education": "education", "academic background": "education",
+    "certifications": "certifications", "certificates": "certifications", "licenses & certifications": "certifications",
+    "achievements": "achievements", "awards": "achievements", "honors": "achievements",
+}
+# When a resume does not fit the budget, lines are handed out round-robin in this
+# order, so every section keeps its opening lines and the most useful ones keep more
+SECTION_PRIORITY = ["header", "experience", "summary", "skills", "projects",
+                    "education", "certifications", "achievements", "other"]
+LINES_PER_ROUND = 2
+
+
+def normalize_text(text):
+    """
+    Cleans extracted resume text without losing content: compatibility forms
+    (ligatures, full-width and non-breaking characters), invisible characters,
+    hyphenation across line breaks, bullet glyphs, runs of whitespace,
+    page numbers and repeated header/footer lines. Lines wrapped mid-sentence
+    are joined. Returns one item per line.
+    """
+    text = unicodedata.normalize("NFKC", text or "")
+    text = _INVISIBLE_RE.sub("", text)
+    text = _HYPHEN_BREAK_RE.sub(r"\1\2", text)
+
+    raw_lines = []
+    for line in text.splitlines():
+        line = " ".join(line.split())
+        if line and not _PAGE_NUMBER_RE.match(line):
+            raw_lines.append(line)
+    counts = {}
+    for line in raw_lines:
+        counts[line.lower()] = counts.get(line.lower(), 0) + 1
+
+    lines = []
+    seen = set()
+    for line in raw_lines:
+        # Lines on three or more pages are running headers/footers and are dropped;
+        # other verbatim repeats (e.g. copy-pasted bullets) keep their first occurrence
+        key = line.lower()
+        if len(key) >= 15:
+            if counts[key] >= 3 or key in seen:
+                continue
+            seen.add(key)
+        bullet = _BULLET_RE.match(line)
+        if bullet:
+            line = "- " + line[bullet.end():]
+        if (lines and not bullet and line[0].islower() and not _CONTACT_RE.search(line)
+                and not lines[-1].endswith(_SENTENCE_END) and not _is_heading(lines[-1])):
+            lines[-1] += " " + line
+        else:
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def _is_heading(line):
+    return _section_name(line) is not None
+
+
+def _section_name(line):
+    key = line.strip(" :-").lower()
+    if key in SECTION_ALIASES:
+        return SECTION_ALIASES[key]
+    if len(key) <= 30 and line.isupper() and len(key.split()) <= 4:
+        return "other"
+    return None
+
+
+def split_sections(text):
+    """
+    Splits normalized text into [(section, [lines])] in document order.
+    Lines before the first heading form the "header" section. Unknown all-caps
+    headings only count once a known one has been seen, since names and job
+    titles at the top are often in capitals too.
+    """
+    sections = [("header", [])]
+    for line in text.splitlines():
+        name = _section_name(line)
+        if name == "other" and len(sections) == 1:
+            name = None
+        if name is not None:
+            sections.append((name, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(name, lines) for name, lines in sections if lines]
+
+
+def _compact_contact(lines):
+    """Folds contact details (email, phone, links) scattered over the header into one line."""
+    contact = [line for line in lines if _CONTACT_RE.search(line)]
+    if len(contact) < 2:
+        return lines
+    rest = [line for line in lines if not _CONTACT_RE.search(line)]
+    return rest[:1] + ["Contact: " + " | ".join(contact)] + rest[1:]
+
+
+def compress_for_prompt(text, token_budget):
+    """
+    Returns a dense version of resume text that fits in about token_budget tokens.
+    Text is normalized and contact details are folded into one line. If it still
+    does not fit, lines are taken from each section in SECTION_PRIORITY order,
+    LINES_PER_ROUND at a time, and kept in document order. Contact details
+    therefore cannot push the experience section out of the budget.
+    """
+    sections = split_sections(normalize_text(text))
+    sections = [(name, _compact_contact(lines) if name == "header" else lines)
+                for name, lines in sections]
+    costs = [[estimate_tokens(line) + 1 for line in lines] for _name, lines in sections]
+    if sum(map(sum, costs)) <= token_budget:
+        return "\n".join(line for _name, lines in sections for line in lines)
+
+    rank = {name: i for i, name in enumerate(SECTION_PRIORITY)}
+    order = sorted(range(len(sections)), key=lambda i: (rank.get(sections[i][0], len(rank)), i))
+    taken = [0] * len(sections)
+    remaining = token_budget
+    progress = True
+    while progress:
+        progress = False
+        for i in order:
+            for _ in range(LINES_PER_ROUND):
+                n = taken[i]
+                if n < len(costs[i]) and costs[i][n] <= remaining:
+                    remaining -= costs[i][n]
+                    taken[i] += 1
+                    progress = True
+    # A heading without any of its lines is only noise
+    return "\n".join(line for i, (name, lines) in enumerate(sections)
+                     if taken[i] > 1 or name == "header"
+                     for line in lines[:taken[i]])
@@ -0,0 +1,468 @@
+"""
+Bulk re-analysis of stale resume analyses.
+
+Changing the analysis prompt, rubric or model makes every stored analysis
+stale: Resume.analysis_version no longer matches ai_service.analysis_version().
+This job refreshes them.
+
+- Stale rows are read in id order through a server-side cursor (keyset pages
+  on databases without one, e.g. SQLite, whose readers would block the writers).
+- Work runs on REANALYSIS_CONCURRENCY threads, with at most that many
+  requests in flight.
+- Short resumes are packed up to REANALYSIS_PACK_SIZE per request. The
+  system rubric is shared, so each extra resume adds only its own text.
+  Resumes missing from a packed response are retried on their own.
+- Progress is checkpointed to a JSON file after every request: the highest
+  id below which everything has finished, plus the ids that failed. A
+  restarted job continues from there. While the circuit breaker is open the
+  job stops and can simply be run again.
+
+The same requests can go through an offline batch API instead. "export"
+writes them as Batch API JSONL (custom_id, method, url, body), "import"
+applies a batch output file, and "local-batch" runs an input file against
+the analysis provider and writes an output file in the same format, as a
+local stand-in for the batch service:
+
+    python -m services.reanalysis run [--checkpoint reanalysis.json] [--limit N]
+    python -m services.reanalysis export batch_input.jsonl
+    python -m services.reanalysis local-batch batch_input.jsonl batch_output.jsonl
+    python -m services.reanalysis import batch_output.jsonl
+"""
+import itertools
+import json
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from config import Config
+
+BATCH_URL = "/v1/chat/completions"
+CUSTOM_ID_PREFIX = "reanalysis"
+MAX_TOKENS_PER_ANALYSIS = 1000
+
+
+def _stale_filter(Resume, version):
+    from sqlalchemy import or_
+
+    from services.analysis_queue import PENDING, RUNNING
+
+    # Rows the analysis queue still owns are left to it; NULL status is a legacy, finished row
+    return (Resume.text.isnot(None),
+            or_(Resume.analysis_version.is_(None), Resume.analysis_version != version),
+            or_(Resume.analysis_status.is_(None), Resume.analysis_status.notin_((PENDING, RUNNING))))
+
+
+def iter_stale(version, after_id=0, page_size=None):
+    """
+    Yields (id, text, parsed_data) for every resume with a stale analysis and
+    an id above after_id, in id order. Requires an application context.
+    """
+    from extensions import db
+    from models import Resume
+
+    page_size = page_size or Config.REANALYSIS_PAGE_SIZE
+    query = (db.select(Resume.id, Resume.text, Resume.parsed_data)
+             .where(Resume.id > after_id, *_stale_filter(Resume, version))
+             .order_by(Resume.id))
+    if db.engine.dialect.supports_server_side_cursors:
+        # A dedicated connection, so the cursor stays open while workers commit
+        with db.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=page_size).execute(query)
+            for row in result:
+                yield row.id, row.text, row.parsed_data or {}
+        return
+    while True:
+        rows = db.session.execute(query.where(Resume.id > after_id).limit(page_size)).all()
+        db.session.commit()  # end the read transaction between pages
+        if not rows:
+            return
+        for row in rows:
+            yield row.id, row.text, row.parsed_data or {}
+        after_id = rows[-1].id
+
+
+def pack(rows, pack_size=None, max_tokens=None):
+    """
+    Groups (id, text, parsed_data) rows into requests: short resumes are packed
+    together up to pack_size, longer ones go alone. Yields lists of rows.
+    """
+    from services.parser import compress_for_prompt
+    from services.tokens import estimate_tokens
+
+    pack_size = pack_size or Config.REANALYSIS_PACK_SIZE
+    max_tokens = max_tokens or Config.REANALYSIS_PACK_MAX_TOKENS
+    current = []
+    for row in rows:
+        if pack_size <= 1 or estimate_tokens(compress_for_prompt(row[1], Config.ANALYSIS_TOKEN_BUDGET)) > max_tokens:
+            yield [row]
+            continue
+        current.append(row)
+        if len(current) >= pack_size:
+            yield current
+            current = []
+    if current:
+        yield current
+
+
+def build_request(group, rubric):
+    """Chat completion arguments for one group of rows (no stream, no timeout)."""
+    from services.ai_service import build_analysis_messages, build_packed_analysis_messages
+    from services.llm_providers import get_route
+    from services.structured_output import ANALYSIS_RESPONSE_FORMAT, PACKED_ANALYSIS_RESPONSE_FORMAT
+
+    if len(group) == 1:
+        _resume_id, text, parsed_data = group[0]
+        messages = build_analysis_messages(text, parsed_data, rubric)
+        response_format = ANALYSIS_RESPONSE_FORMAT
+    else:
+        messages = build_packed_analysis_messages(group, rubric)
+        response_format = PACKED_ANALYSIS_RESPONSE_FORMAT
+    return {
+        "model": get_route("analysis").model,
+        "messages": messages,
+        "temperature": 0.2,
+        "max_tokens": MAX_TOKENS_PER_ANALYSIS * len(group),
+        "response_format": response_format,
+    }
+
+
+def parse_response(group, content, finish_reason=None):
+    """Returns {resume_id: analysis} for the rows of a group found in a response."""
+    from services.structured_output import AnalysisFormatError, parse_analysis, parse_packed_analyses
+
+    try:
+        if len(group) == 1:
+            analysis, repaired = parse_analysis(content or "")
+            if repaired or finish_reason == "length":
+                analysis["truncated"] = True
+            return {group[0][0]: analysis}
+        by_key = parse_packed_analyses(content or "")
+    except AnalysisFormatError:
+        return {}
+    return {row[0]: by_key[str(row[0])] for row in group if str(row[0]) in by_key}
+
+
+def custom_id(version, group):
+    return f"{CUSTOM_ID_PREFIX}:{version}:{','.join(str(row[0]) for row in group)}"
+
+
+def _rubric_of(version):
+    # analysis_version() is "<prompt version>-<rubric>:<model>"
+    return version.split(":", 1)[0].rsplit("-", 1)[1]
+
+
+def parse_custom_id(value):
+    """Returns (version, [resume ids]) or None for ids this job did not write."""
+    prefix, _, rest = value.partition(":")
+    version, _, ids = rest.rpartition(":")
+    if prefix != CUSTOM_ID_PREFIX or not version or not ids:
+        return None
+    return version, [int(resume_id) for resume_id in ids.split(",")]
+
+
+class Checkpoint:
+    """
+    Progress of a run, saved as JSON after every change. last_id is a low
+    watermark: every stale resume with an id up to it has been handled.
+    """
+
+    def __init__(self, path, version):
+        self.path = path
+        self.version = version
+        self.last_id = 0
+        self.done = 0
+        self.failed_ids = []
+        self._in_flight = set()
+        self._dispatched_to = 0
+        self.circuit_open = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path, version, reset=False):
+        checkpoint = cls(path, version)
+        if path and not reset and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+            # A checkpoint from another prompt/model version is meaningless now
+            if state.get("version") == version:
+                checkpoint.last_id = state.get("last_id", 0)
+                checkpoint.done = state.get("done", 0)
+                checkpoint.failed_ids = state.get("failed_ids", [])
+        checkpoint._dispatched_to = checkpoint.last_id
+        return checkpoint
+
+    def dispatched(self, ids):
+        with self._lock:
+            self._in_flight.update(ids)
+            self._dispatched_to = max(self._dispatched_to, *ids)
+
+    def finished(self, done_ids, failed_ids):
+        with self._lock:
+            self._in_flight.difference_update(done_ids)
+            self._in_flight.difference_update(failed_ids)
+            self.done += len(done_ids)
+            self.failed_ids.extend(failed_ids)
+            self.last_id = min(self._in_flight) - 1 if self._in_flight else self._dispatched_to
+            self.save()
+
+    def save(self):
+        if not self.path:
+            return
+        state = {"version": self.version, "last_id": self.last_id, "done": self.done,
+                 "failed_ids": sorted(set(self.failed_ids))}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
+
+
+def apply_results(analyses, version):
+    """
+    Stores analyses ({resume_id: analysis}). Returns the ids that now hold a
+    complete analysis. An incomplete result never replaces a complete analysis,
+    even a stale one; it is only stored on rows that have none.
+    """
+    from extensions import db
+    from models import Resume
+    from services.ai_service import analysis_cache_key, get_llm_cache
+    from services.analysis_queue import DONE, is_complete
+
+    cache = get_llm_cache()
+    rubric = _rubric_of(version)
+    completed = []
+    for resume_id, analysis in analyses.items():
+        resume = db.session.get(Resume, resume_id)
+        if resume is None:
+            continue
+        if not is_complete(analysis):
+            if resume.analysis is None or not is_complete(resume.analysis):
+                resume.analysis = analysis
+                resume.analysis_status = DONE
+            continue
+        resume.analysis = analysis
+        resume.analysis_status = DONE
+        resume.analysis_version = version
+        cache.set(analysis_cache_key(resume.text or "", resume.parsed_data or {}, rubric), analysis)
+        completed.append(resume_id)
+    db.session.commit()
+    return completed
+
+
+def _analyze_group(app, group, rubric, version):
+    """Worker: one request for a group, with solo retries for rows a packed response left out."""
+    from services.llm_call import CircuitOpenError, LLMCallError, call_llm
+    from services.llm_providers import get_route
+    from services.tokens import ledger
+
+    with app.app_context():
+        route = get_route("analysis")
+        body = build_request(group, rubric)
+        try:
+            response = call_llm("reanalysis", lambda timeout: route.provider.chat(
+                "analysis", timeout=timeout, **body), provider=route.provider.name)
+        except CircuitOpenError:
+            raise
+        except LLMCallError:
+            analyses = {}
+        else:
+            choice = response.choices[0]
+            ledger.record(f"reanalysis:{rubric}:{len(group)}", body["messages"],
+                          choice.message.content, getattr(response, "usage", None))
+            analyses = parse_response(group, choice.message.content, choice.finish_reason)
+        completed = apply_results(analyses, version)
+
+        missing = [row for row in group if row[0] not in completed]
+        if len(group) > 1:
+            for row in missing:
+                completed.extend(_analyze_group(app, [row], rubric, version)[0])
+            missing = [row for row in group if row[0] not in completed]
+        return completed, [row[0] for row in missing]
+
+
+def run(rubric=None, checkpoint_path=None, concurrency=None, pack_size=None, limit=None, reset=False):
+    """
+    Re-analyzes stale resumes until none are left, limit resumes have been
+    dispatched, or the circuit breaker opens. Requires an application context.
+    Returns the Checkpoint.
+    """
+    from flask import current_app
+
+    from services.ai_service import analysis_version
+    from services.llm_call import CircuitOpenError
+
+    app = current_app._get_current_object()
+    rubric = rubric or Config.ANALYSIS_RUBRIC
+    version = analysis_version(rubric)
+    concurrency = concurrency or Config.REANALYSIS_CONCURRENCY
+    checkpoint = Checkpoint.load(checkpoint_path, version, reset=reset)
+
+    rows = iter_stale(version, after_id=checkpoint.last_id)
+    if limit is not None:
+        rows = itertools.islice(rows, limit)
+    groups = pack(rows, pack_size=pack_size)
+
+    circuit_open = False
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="reanalysis") as pool:
+        in_flight = {}
+
+        def collect(futures):
+            nonlocal circuit_open
+            for future in futures:
+                group = in_flight.pop(future)
+                try:
+                    completed, failed = future.result()
+                except CircuitOpenError:
+                    circuit_open = True
+                    # Unfinished rows stay in flight, so the watermark stays below them
+                    continue
+                checkpoint.finished(completed, failed)
+
+        for group in groups:
+            if circuit_open:
+                break
+            ids = [row[0] for row in group]
+            checkpoint.dispatched(ids)
+            in_flight[pool.submit(_analyze_group, app, group, rubric, version)] = group
+            if len(in_flight) >= concurrency:
+                finished, _pending = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(finished)
+        collect(list(wait(in_flight)[0]))
+    checkpoint.save()
+    checkpoint.circuit_open = circuit_open
+    return checkpoint
+
+
+def export_batch(out, rubric=None, pack_size=None, limit=None):
+    """Writes Batch API input lines for every stale resume. Returns the number of requests."""
+    from services.ai_service import analysis_version
+
+    rubric = rubric or Config.ANALYSIS_RUBRIC
+    version = analysis_version(rubric)
+    rows = iter_stale(version)
+    if limit is not None:
+        rows = itertools.islice(rows, limit)
+    count = 0
+    for group in pack(rows, pack_size=pack_size):
+        line = {"custom_id": custom_id(version, group), "method": "POST", "url": BATCH_URL,
+                "body": build_request(group, rubric)}
+        out.write(json.dumps(line) + "\n")
+        count += 1
+    return count
+
+
+def import_batch(lines):
+    """
+    Applies Batch API output lines written for this job. Lines for another
+    prompt/model version or failed requests are skipped.
+    Returns (completed, skipped) resume counts.
+    """
+    from models import Resume
+    from extensions import db
+
+    completed = skipped = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        parsed = parse_custom_id(record.get("custom_id", ""))
+        if parsed is None:
+            continue
+        version, ids = parsed
+        response = record.get("response") or {}
+        choices = (response.get("body") or {}).get("choices") or []
+        if response.get("status_code") != 200 or not choices:
+            skipped += len(ids)
+            continue
+        group = [(resume_id, None, None) for resume_id in ids]
+        analyses = parse_response(group, choices[0]["message"].get("content"), choices[0].get("finish_reason"))
+        # Skip rows re-analyzed by a newer run since the batch was exported
+        current = {row.id for row in db.session.execute(
+            db.select(Resume.id).where(Resume.id.in_(list(analyses)), *_stale_filter(Resume, version)))}
+        done = apply_results({k: v for k, v in analyses.items() if k in current}, version)
+        completed += len(done)
+        skipped += len(ids) - len(done)
+    return completed, skipped
+
+
+def run_batch_locally(in_lines, out, provider=None):
+    """
+    Local stand-in for an offline batch service: runs each input line against
+    the analysis provider (or the given one) and writes an output line in Batch API format.
+    """
+    from services.llm_providers import get_route
+
+    provider = provider or get_route("analysis").provider
+    count = 0
+    for number, line in enumerate(in_lines, start=1):
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        record = {"id": f"batch_req_{number}", "custom_id": request["custom_id"], "response": None, "error": None}
+        try:
+            response = provider.chat("analysis", **request["body"])
+            record["response"] = {"status_code": 200, "request_id": getattr(response, "_request_id", None),
+                                  "body": response.model_dump()}
+        except Exception as e:
+            status = getattr(e, "status_code", None)
+            if status is None:
+                record["error"] = {"code": type(e).__name__, "message": str(e)}
+            else:
+                record["response"] = {"status_code": status, "request_id": None,
+                                      "body": {"error": {"message": str(e)}}}
+        out.write(json.dumps(record) + "\n")
+        count += 1
+    return count
+
+
+def main(argv=None):
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Re-analyze resumes whose analysis is stale.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_cmd = sub.add_parser("run", help="Re-analyze through the live API")
+    run_cmd.add_argument("--checkpoint", default="reanalysis_checkpoint.json")
+    run_cmd.add_argument("--reset", action="store_true", help="Ignore an existing checkpoint")
+    run_cmd.add_argument("--concurrency", type=int)
+    export_cmd = sub.add_parser("export", help="Write a Batch API input file")
+    export_cmd.add_argument("out")
+    for cmd in (run_cmd, export_cmd):
+        cmd.add_argument("--rubric", choices=("full", "compact"))
+        cmd.add_argument("--pack-size", type=int)
+        cmd.add_argument("--limit", type=int)
+    import_cmd = sub.add_parser("import", help="Apply a Batch API output file")
+    import_cmd.add_argument("results")
+    local_cmd = sub.add_parser("local-batch", help="Run a batch input file locally")
+    local_cmd.add_argument("input")
+    local_cmd.add_argument("output")
+    args = parser.parse_args(argv)
+
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        if args.command == "run":
+            checkpoint = run(args.rubric, args.checkpoint, args.concurrency, args.pack_size, args.limit, args.reset)
+            print(f"Re-analyzed {checkpoint.done} resumes, {len(checkpoint.failed_ids)} failed, "
+                  f"checkpoint at id {checkpoint.last_id}", file=sys.stderr)
+            if checkpoint.circuit_open:
+                print("Stopped: the AI service is unavailable. Run again to resume.", file=sys.stderr)
+                return 1
+            return 0
+        if args.command == "export":
+            with open(args.out, "w", encoding="utf-8") as out:
+                count = export_batch(out, args.rubric, args.pack_size, args.limit)
+            print(f"Wrote {count} requests to {args.out}", file=sys.stderr)
+        elif args.command == "import":
+            with open(args.results, encoding="utf-8") as lines:
+                completed, skipped = import_batch(lines)
+            print(f"Applied {completed} analyses, skipped {skipped}", file=sys.stderr)
+        elif args.command == "local-batch":
+            with open(args.input, encoding="utf-8") as lines, open(args.output, "w", encoding="utf-8") as out:
+                count = run_batch_locally(lines, out)
+            print(f"Ran {count} requests into {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
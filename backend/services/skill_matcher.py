@@ -0,0 +1,109 @@
+from collections import deque
+from functools import lru_cache
+
+# Characters that count as part of a word when checking match boundaries.
+# "+" and "#" are included so "c" does not match inside "c++" or "c#".
+WORD_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789_+#")
+
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton over a list of skill phrases.
+    Built once, then finds every skill in a single pass over the text.
+    A match only counts when it is not glued to a neighbouring word,
+    so short skills like "c", "r" or "go" no longer hit inside other words.
+    """
+
+    def __init__(self, skills):
+        # Lowercase and de-duplicate while keeping the caller's order
+        self.skills = list(dict.fromkeys(s.strip().lower() for s in skills if s and s.strip()))
+        self._rank = {skill: index for index, skill in enumerate(self.skills)}
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        for index, skill in enumerate(self.skills):
+            self._add(skill, index)
+        self._build_failure_links()
+
+    def _add(self, skill, index):
+        node = 0
+        for ch in skill:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = nxt
+        self._out[node] = self._out[node] + (index,)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                # Merge outputs so each node reports every skill ending there
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def iter_matches(self, text):
+        """
+        Yields (start, end, skill) for every word-bounded skill occurrence.
+        Offsets index into the original text.
+        """
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # A few characters expand when lowercased; keep offsets aligned
+            lowered = "".join(c.lower()[:1] for c in text)
+        goto, fail, out, skills = self._goto, self._fail, self._out, self.skills
+        length = len(lowered)
+        node = 0
+        for pos, ch in enumerate(lowered):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not out[node]:
+                continue
+            end = pos + 1
+            after = lowered[end] if end < length else ""
+            for index in out[node]:
+                skill = skills[index]
+                start = end - len(skill)
+                if skill[-1] in WORD_CHARS and after in WORD_CHARS:
+                    continue
+                if skill[0] in WORD_CHARS and start > 0 and lowered[start - 1] in WORD_CHARS:
+                    continue
+                yield start, end, skill
+
+    def find(self, text):
+        """
+        Returns {skill: {"count": n, "offsets": [start, ...]}} for every skill found,
+        ordered like the skill list.
+        """
+        hits = {}
+        for start, _end, skill in self.iter_matches(text):
+            hits.setdefault(skill, []).append(start)
+        return {
+            skill: {"count": len(hits[skill]), "offsets": hits[skill]}
+            for skill in sorted(hits, key=self._rank.__getitem__)
+        }
+
+    def extract(self, text):
+        """Returns the list of distinct skills found, ordered like the skill list."""
+        return list(self.find(text))
+
+
+@lru_cache(maxsize=8)
+def _cached_matcher(skills):
+    return SkillMatcher(skills)
+
+
+def get_skill_matcher(skills):
+    """Returns a matcher for the given skills, building it only once per list."""
+    return _cached_matcher(tuple(skills))
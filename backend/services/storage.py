@@ -1,19 +1,79 @@
+import hashlib
 import os
+import tempfile
 from werkzeug.utils import secure_filename
 
 ALLOWED_EXT = {"pdf", "docx"}
+CHUNK_SIZE = 1024 * 1024
 
 def allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXT
 
-def save_upload(fileobj, upload_folder):
-    filename = secure_filename(fileobj.filename)
-    path = os.path.join(upload_folder, filename)
-    # handle duplicates e.g. add timestamp
-    if os.path.exists(path):
-        base, ext = os.path.splitext(filename)
-        import time
-        filename = f"{base}_{int(time.time())}{ext}"
-        path = os.path.join(upload_folder, filename)
-    fileobj.save(path)
-    return filename, path
+def _iter_chunks(source):
+    """Yields chunks from a file-like object or a bytes-like object."""
+    if hasattr(source, "read"):
+        while True:
+            chunk = source.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+    else:
+        view = memoryview(source)
+        for start in range(0, len(view), CHUNK_SIZE):
+            yield view[start:start + CHUNK_SIZE]
+
+def hash_content(source):
+    """SHA-256 hex digest of a file-like or bytes-like upload."""
+    digest = hashlib.sha256()
+    for chunk in _iter_chunks(source):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+def save_upload(source, filename, upload_folder):
+    """
+    Stores an upload under the SHA-256 of its content, e.g. <sha256>.pdf.
+    The hash is computed while the data is written to a temp file in the same
+    folder, which is then renamed into place, so concurrent uploads never
+    overwrite each other and identical files are stored once.
+    source is a file-like object (e.g. a werkzeug FileStorage) or bytes-like.
+    Returns (content_hash, path).
+    """
+    ext = os.path.splitext(secure_filename(filename))[1].lower()
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=upload_folder, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in _iter_chunks(source):
+                digest.update(chunk)
+                f.write(chunk)
+        content_hash = digest.hexdigest()
+        path = os.path.join(upload_folder, content_hash + ext)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return content_hash, path
+
+def find_parsed_upload(content_hash, parser_version):
+    """
+    Returns the stored (raw_text, parsed_data) of a previously parsed upload
+    with the same content, or None if these bytes have not been parsed by
+    this parser_version (services.parser.parser_version()) before. Rows holding
+    only the first pages of a document (parsed_data["complete"] is False) are skipped.
+    """
+    from models import Resume
+
+    rows = (Resume.query
+            .with_entities(Resume.text, Resume.parsed_data)
+            .filter(Resume.content_hash == content_hash, Resume.text.isnot(None))
+            .order_by(Resume.id.desc())
+            .limit(20))
+    for row in rows:
+        parsed_data = row.parsed_data or {}
+        if parsed_data.get("parser_version") == parser_version and parsed_data.get("complete", True):
+            return row.text, row.parsed_data
+    return None
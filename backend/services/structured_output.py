@@ -0,0 +1,287 @@
+"""
+Structured output for resume analyses.
+
+- ANALYSIS_SCHEMA is sent as a strict json_schema response format, so the
+  model can only produce an object with exactly these keys.
+- repair_json() recovers the object from a response cut off by max_tokens
+  (or wrapped in markdown fences) by closing whatever was left open.
+- validate_analysis() coerces field types and clamps scores to the rubric's ranges.
+- PACKED_ANALYSIS_SCHEMA wraps several analyses, keyed by resume_id, for
+  requests that analyze more than one resume at once.
+- StreamingJSONParser consumes the response as it streams and reports each
+  top-level field as soon as its value is complete, so the score is known
+  long before the rest of the analysis has been generated.
+"""
+import json
+
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+
+# Maximum points per rubric section
+BREAKDOWN_MAX = {
+    "format": 20, "contact": 10, "summary": 10, "experience": 25,
+    "skills": 15, "education": 10, "keywords": 10,
+}
+
+LIST_FIELDS = ("deductions_applied", "strengths", "weaknesses", "suggested_roles",
+               "missing_skills", "recommended_courses_or_certs", "concise_advice")
+TEXT_FIELDS = ("ats_compatibility", "keyword_density", "overall_assessment")
+
+# Property order is generation order: score first, so it streams out first
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "integer"},
+        "score_breakdown": {
+            "type": "object",
+            "properties": {name: {"type": "integer"} for name in BREAKDOWN_MAX},
+            "required": list(BREAKDOWN_MAX),
+            "additionalProperties": False,
+        },
+        **{name: _STRING_LIST for name in LIST_FIELDS},
+        "ats_compatibility": {"type": "string"},
+        "quantifiable_achievements_count": {"type": "integer"},
+        "keyword_density": {"type": "string"},
+        "overall_assessment": {"type": "string"},
+    },
+    "additionalProperties": False,
+}
+ANALYSIS_SCHEMA["required"] = list(ANALYSIS_SCHEMA["properties"])
+
+ANALYSIS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "resume_analysis", "strict": True, "schema": ANALYSIS_SCHEMA},
+}
+
+PACKED_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "analyses": {
+            "type": "array",
+            "items": {
+                **ANALYSIS_SCHEMA,
+                "properties": {"resume_id": {"type": "string"}, **ANALYSIS_SCHEMA["properties"]},
+                "required": ["resume_id", *ANALYSIS_SCHEMA["required"]],
+            },
+        },
+    },
+    "required": ["analyses"],
+    "additionalProperties": False,
+}
+
+PACKED_ANALYSIS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "resume_analyses", "strict": True, "schema": PACKED_ANALYSIS_SCHEMA},
+}
+
+
+class AnalysisFormatError(ValueError):
+    """The model's response could not be turned into a usable analysis."""
+
+
+def strip_fences(text):
+    """Removes a surrounding ```json ... ``` block, if any."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+    if text.endswith("```"):
+        text = text[:-3]
+    return text.strip()
+
+
+def repair_json(text):
+    """
+    Parses the first JSON object in text. If it was cut off, the dangling
+    partial key or value is dropped and open strings, arrays and objects are
+    closed. Returns (obj, repaired) or raises AnalysisFormatError.
+    """
+    text = strip_fences(text)
+    start = text.find("{")
+    if start < 0:
+        raise AnalysisFormatError("No JSON object in response")
+    text = text[start:]
+
+    stack = []
+    in_string = escape = in_value = False
+    # Index just after the last point where the document could be cut cleanly
+    safe_end = 0
+    safe_stack = []
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+                if stack and (stack[-1] == "[" or in_value):
+                    safe_end, safe_stack = i + 1, list(stack)
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append(ch)
+            in_value = False
+            safe_end, safe_stack = i + 1, list(stack)
+        elif ch in "}]":
+            if not stack:
+                break
+            stack.pop()
+            if not stack:
+                return json.loads(text[:i + 1]), False
+            safe_end, safe_stack = i + 1, list(stack)
+        elif ch == ":":
+            in_value = True
+        elif ch == ",":
+            in_value = False
+            safe_end, safe_stack = i, list(stack)
+
+    candidate = text[:safe_end].rstrip().rstrip(",")
+    closing = "".join("}" if opener == "{" else "]" for opener in reversed(safe_stack))
+    try:
+        return json.loads(candidate + closing), True
+    except json.JSONDecodeError as e:
+        raise AnalysisFormatError(f"Could not repair truncated JSON: {e}") from e
+
+
+def _as_int(value, low, high):
+    try:
+        value = int(round(float(value)))
+    except (TypeError, ValueError):
+        return None
+    return max(low, min(high, value))
+
+
+def validate_analysis(obj):
+    """
+    Returns a cleaned copy of an analysis object. Scores are clamped to their
+    ranges, list fields hold strings, and fields the model did not produce
+    (e.g. lost to truncation) are left out. Raises AnalysisFormatError without a usable score.
+    """
+    if not isinstance(obj, dict):
+        raise AnalysisFormatError("Analysis is not a JSON object")
+    score = _as_int(obj.get("score"), 0, 100)
+    if score is None:
+        raise AnalysisFormatError("Analysis has no score")
+    result = {"score": score}
+
+    breakdown = obj.get("score_breakdown")
+    if isinstance(breakdown, dict):
+        result["score_breakdown"] = {
+            name: _as_int(breakdown[name], 0, high)
+            for name, high in BREAKDOWN_MAX.items()
+            if _as_int(breakdown.get(name), 0, high) is not None
+        }
+    for name in LIST_FIELDS:
+        value = obj.get(name)
+        if isinstance(value, str):
+            value = [value]
+        if isinstance(value, list):
+            result[name] = [str(item) for item in value if item not in (None, "")]
+    for name in TEXT_FIELDS:
+        if isinstance(obj.get(name), (str, int, float)):
+            result[name] = str(obj[name])
+    count = _as_int(obj.get("quantifiable_achievements_count"), 0, 10_000)
+    if count is not None:
+        result["quantifiable_achievements_count"] = count
+    return result
+
+
+def parse_analysis(text):
+    """Full pipeline for a complete or truncated response. Returns (analysis, repaired)."""
+    obj, repaired = repair_json(text)
+    return validate_analysis(obj), repaired
+
+
+def parse_packed_analyses(text):
+    """
+    Parses a packed response into {resume_id: analysis}. Entries without a
+    usable score are left out. If the response was cut off, the last entry is
+    marked "truncated", since only it can be incomplete.
+    """
+    obj, repaired = repair_json(text)
+    entries = obj.get("analyses") if isinstance(obj, dict) else None
+    if not isinstance(entries, list):
+        raise AnalysisFormatError("Packed response has no analyses list")
+    analyses = {}
+    for position, entry in enumerate(entries):
+        if not isinstance(entry, dict) or entry.get("resume_id") in (None, ""):
+            continue
+        try:
+            analysis = validate_analysis(entry)
+        except AnalysisFormatError:
+            continue
+        if repaired and position == len(entries) - 1:
+            analysis["truncated"] = True
+        analyses[str(entry["resume_id"])] = analysis
+    return analyses
+
+
+class StreamingJSONParser:
+    """
+    Incremental scanner for a streamed JSON object. feed() returns the
+    (key, value) pairs of top-level fields whose values completed in that
+    chunk. Each character is scanned once, however the stream is split.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key_start = None
+        self._key = None
+        self._value_start = None
+        self.fields = {}
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        completed = []
+        text = self.buffer
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._key_start is not None and self._key is None:
+                        self._key = json.loads(text[self._key_start:i + 1])
+                        self._key_start = None
+                continue
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._key is None:
+                    self._key_start = i
+                elif self._depth == 1 and self._value_start is None:
+                    self._value_start = i
+            elif ch in "{[":
+                if self._depth == 1 and self._key is not None and self._value_start is None:
+                    self._value_start = i
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._complete(text, i, completed)
+            elif ch == "," and self._depth == 1:
+                self._complete(text, i, completed)
+            elif ch == ":" or ch.isspace():
+                pass
+            elif self._depth == 1 and self._key is not None and self._value_start is None:
+                self._value_start = i  # number, true, false or null
+        self._pos = len(text)
+        return completed
+
+    def _complete(self, text, end, completed):
+        if self._key is not None and self._value_start is not None:
+            try:
+                value = json.loads(text[self._value_start:end])
+            except json.JSONDecodeError:
+                value = None
+            else:
+                self.fields[self._key] = value
+                completed.append((self._key, value))
+        self._key = None
+        self._value_start = None
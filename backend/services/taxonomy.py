@@ -0,0 +1,397 @@
+"""
+Skill taxonomy loading, compilation and hot reload.
+
+The taxonomy lives in a versioned JSON file (see data/skills_taxonomy.json).
+It is compiled into a flat binary Aho-Corasick index that every worker
+memory-maps read-only, so the automaton is shared through the page cache
+instead of being rebuilt in each process.
+
+Build the index with the deployment (python -m services.taxonomy writes
+data/skills_taxonomy.idx, which is committed): where that bundled copy is
+read-only, it is mapped as is as long as it matches the taxonomy file, and
+only a changed taxonomy is recompiled into SKILL_INDEX_PATH.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from config import Config
+from services.log import get_logger
+from services.skill_matcher import SkillMatcher, WORD_CHARS
+
+INDEX_MAGIC = b"CLSK"
+INDEX_FORMAT = 2
+# magic, format, taxonomy version, source mtime_ns, source size, source digest,
+# then counts: nodes, edges, outputs, patterns, skills, categories, blob bytes
+HEADER = struct.Struct("=4sIIqq8s7I")
+
+FIRST_IS_WORD = 1
+LAST_IS_WORD = 2
+
+
+logger = get_logger(__name__)
+
+
+class TaxonomyError(ValueError):
+    pass
+
+
+def source_digest(path):
+    """First 8 bytes of the SHA-256 of the taxonomy file; survives copies that reset mtimes."""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).digest()[:8]
+
+
+def load_taxonomy(path):
+    """Reads and validates the taxonomy JSON file."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or "version" not in data or not isinstance(data.get("skills"), list):
+        raise TaxonomyError(f"{path} is not a skill taxonomy file")
+    for item in data["skills"]:
+        if not item.get("name") or not item.get("category"):
+            raise TaxonomyError(f"Skill entry missing name or category: {item!r}")
+    return data
+
+
+def compile_taxonomy(source_path, index_path):
+    """
+    Compiles the taxonomy at source_path into a binary index at index_path.
+    The file is written to a temp file and renamed, so readers never see a partial index.
+    Names and aliases claimed by more than one skill are logged as conflicts.
+    """
+    stat = os.stat(source_path)
+    digest = source_digest(source_path)
+    data = load_taxonomy(source_path)
+
+    categories = []
+    category_ids = {}
+    names, skill_category, skill_weight = [], array("I"), array("f")
+    patterns, pattern_skill = [], []
+    # Canonical names are registered before any alias, so a name always matches its own
+    # skill; a pattern claimed twice keeps its first owner and is reported as a conflict
+    owner = {}
+    conflicts = []
+    skills = []
+    for item in data["skills"]:
+        name = item["name"].strip().lower()
+        if name in owner:
+            conflicts.append(f"duplicate skill {name!r} ignored")
+            continue
+        owner[name] = name
+        category = item["category"]
+        if category not in category_ids:
+            category_ids[category] = len(categories)
+            categories.append(category)
+        skill_id = len(names)
+        names.append(name)
+        skill_category.append(category_ids[category])
+        skill_weight.append(float(item.get("weight", 1.0)))
+        patterns.append(name)
+        pattern_skill.append(skill_id)
+        skills.append((skill_id, name, item))
+    for skill_id, name, item in skills:
+        for alias in (a.strip().lower() for a in item.get("aliases", [])):
+            if not alias or alias == name:
+                continue
+            if alias in owner:
+                if owner[alias] != name:
+                    conflicts.append(f"alias {alias!r} of {name!r} already matches {owner[alias]!r}; ignored")
+                continue
+            owner[alias] = name
+            patterns.append(alias)
+            pattern_skill.append(skill_id)
+    for conflict in conflicts:
+        logger.warning("Skill taxonomy conflict", extra={"taxonomy": source_path, "conflict": conflict})
+
+    # Reuse the in-memory automaton and flatten it into arrays
+    matcher = SkillMatcher(patterns)
+    edge_start, edge_chars, edge_targets = array("I"), array("I"), array("I")
+    out_start, out_ids = array("I"), array("I")
+    for node, edges in enumerate(matcher._goto):
+        edge_start.append(len(edge_chars))
+        for ch in sorted(edges):
+            edge_chars.append(ord(ch))
+            edge_targets.append(edges[ch])
+        out_start.append(len(out_ids))
+        out_ids.extend(matcher._out[node])
+    edge_start.append(len(edge_chars))
+    out_start.append(len(out_ids))
+    fail = array("I", matcher._fail)
+
+    pattern_len, pattern_flags, pattern_skill_arr = array("I"), array("I"), array("I", pattern_skill)
+    for pattern in matcher.skills:
+        flags = (FIRST_IS_WORD if pattern[0] in WORD_CHARS else 0) | (LAST_IS_WORD if pattern[-1] in WORD_CHARS else 0)
+        pattern_len.append(len(pattern))
+        pattern_flags.append(flags)
+
+    blob = bytearray()
+    name_off, category_off = array("I"), array("I")
+    for text, offsets in ((names, name_off), (categories, category_off)):
+        for value in text:
+            offsets.append(len(blob))
+            blob += value.encode("utf-8")
+        offsets.append(len(blob))
+
+    header = HEADER.pack(
+        INDEX_MAGIC, INDEX_FORMAT, int(data["version"]), stat.st_mtime_ns, stat.st_size, digest,
+        len(matcher._goto), len(edge_chars), len(out_ids), len(patterns), len(names), len(categories), len(blob),
+    )
+    sections = [
+        edge_start, edge_chars, edge_targets, fail, out_start, out_ids,
+        pattern_skill_arr, pattern_len, pattern_flags,
+        name_off, skill_category, skill_weight, category_off,
+    ]
+
+    directory = os.path.dirname(os.path.abspath(index_path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for section in sections:
+            f.write(section.tobytes())
+        f.write(bytes(blob))
+    os.replace(tmp_path, index_path)
+    return index_path
+
+
+class MappedSkillIndex:
+    """
+    Read-only view over a compiled taxonomy index.
+    Offers the same iter_matches/find/extract API as SkillMatcher,
+    and additionally reports each skill's category and weight.
+    """
+
+    def __init__(self, index_path):
+        with open(index_path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.path = index_path
+        self.file_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        (magic, fmt, self.version, self.source_mtime_ns, self.source_size, self.source_digest,
+         n_nodes, n_edges, n_outs, n_patterns, n_skills, n_categories, blob_size) = HEADER.unpack_from(self._mm, 0)
+        if magic != INDEX_MAGIC or fmt != INDEX_FORMAT:
+            raise TaxonomyError(f"{index_path} is not a compiled skill index")
+
+        view = memoryview(self._mm)
+        offset = HEADER.size
+
+        def take(count, typecode="I"):
+            nonlocal offset
+            size = count * 4
+            section = view[offset:offset + size].cast(typecode)
+            offset += size
+            return section
+
+        self._edge_start = take(n_nodes + 1)
+        self._edge_chars = take(n_edges)
+        self._edge_targets = take(n_edges)
+        self._fail = take(n_nodes)
+        self._out_start = take(n_nodes + 1)
+        self._out_ids = take(n_outs)
+        self._pattern_skill = take(n_patterns)
+        self._pattern_len = take(n_patterns)
+        self._pattern_flags = take(n_patterns)
+        self._name_off = take(n_skills + 1)
+        self._skill_category = take(n_skills)
+        self._skill_weight = take(n_skills, "f")
+        self._category_off = take(n_categories + 1)
+        self._blob = view[offset:offset + blob_size]
+        self.skill_count = n_skills
+
+        # Root transitions are hit on almost every character, keep them in a dict
+        lo, hi = self._edge_start[0], self._edge_start[1]
+        self._root = {chr(self._edge_chars[i]): self._edge_targets[i] for i in range(lo, hi)}
+
+    def _string(self, offsets, index):
+        return bytes(self._blob[offsets[index]:offsets[index + 1]]).decode("utf-8")
+
+    def skill_name(self, skill_id):
+        return self._string(self._name_off, skill_id)
+
+    def skill_category(self, skill_id):
+        return self._string(self._category_off, self._skill_category[skill_id])
+
+    def skill_weight(self, skill_id):
+        return self._skill_weight[skill_id]
+
+    def _step(self, node, code):
+        lo, hi = self._edge_start[node], self._edge_start[node + 1]
+        i = bisect_left(self._edge_chars, code, lo, hi)
+        if i < hi and self._edge_chars[i] == code:
+            return self._edge_targets[i]
+        return -1
+
+    def iter_skill_matches(self, text):
+        """Yields (start, end, skill_id) for every word-bounded skill occurrence."""
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            lowered = "".join(c.lower()[:1] for c in text)
+        root, fail, step = self._root, self._fail, self._step
+        out_start, out_ids = self._out_start, self._out_ids
+        p_len, p_flags, p_skill = self._pattern_len, self._pattern_flags, self._pattern_skill
+        length = len(lowered)
+        node = 0
+        for pos, ch in enumerate(lowered):
+            code = ord(ch)
+            while node:
+                nxt = step(node, code)
+                if nxt >= 0:
+                    node = nxt
+                    break
+                node = fail[node]
+            else:
+                node = root.get(ch, 0)
+            lo, hi = out_start[node], out_start[node + 1]
+            if lo == hi:
+                continue
+            end = pos + 1
+            after = lowered[end] if end < length else ""
+            for i in range(lo, hi):
+                pattern = out_ids[i]
+                flags = p_flags[pattern]
+                start = end - p_len[pattern]
+                if flags & LAST_IS_WORD and after in WORD_CHARS:
+                    continue
+                if flags & FIRST_IS_WORD and start > 0 and lowered[start - 1] in WORD_CHARS:
+                    continue
+                yield start, end, p_skill[pattern]
+
+    def iter_matches(self, text):
+        """Yields (start, end, skill) like SkillMatcher.iter_matches."""
+        for start, end, skill_id in self.iter_skill_matches(text):
+            yield start, end, self.skill_name(skill_id)
+
+    def find(self, text):
+        """
+        Returns {skill: {"count", "offsets", "category", "weight"}} for every skill found,
+        in taxonomy order. Alias hits are reported under the skill name.
+        """
+        hits = {}
+        for start, _end, skill_id in self.iter_skill_matches(text):
+            hits.setdefault(skill_id, []).append(start)
+        return {
+            self.skill_name(skill_id): {
+                "count": len(hits[skill_id]),
+                "offsets": hits[skill_id],
+                "category": self.skill_category(skill_id),
+                "weight": round(self.skill_weight(skill_id), 3),
+            }
+            for skill_id in sorted(hits)
+        }
+
+    def extract(self, text):
+        """Returns the list of distinct skills found, in taxonomy order."""
+        return list(self.find(text))
+
+
+class SkillIndexManager:
+    """
+    Hands out the current MappedSkillIndex and hot-reloads it.
+    At most once per check interval it compares the taxonomy file with the
+    compiled index, recompiles when the source changed, and re-maps the index
+    when another worker replaced it. Until index_path exists, a prebuilt
+    bundled_path index is used when it matches the source.
+    """
+
+    def __init__(self, source_path, index_path, check_interval=5.0, bundled_path=None):
+        self.source_path = source_path
+        self.index_path = index_path
+        self.check_interval = check_interval
+        self.bundled_path = bundled_path if bundled_path != index_path else None
+        self._index = None
+        self._checked_at = 0.0
+        self._verified = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        index = self._index
+        if index is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return index
+        with self._lock:
+            if self._index is None or time.monotonic() - self._checked_at >= self.check_interval:
+                self._refresh()
+            return self._index
+
+    def _map(self, path):
+        try:
+            on_disk = os.stat(path)
+        except FileNotFoundError:
+            return None
+        index = self._index
+        if index is not None and index.file_id == (on_disk.st_ino, on_disk.st_mtime_ns, on_disk.st_size):
+            return index
+        try:
+            return MappedSkillIndex(path)
+        except (TaxonomyError, struct.error, ValueError):
+            return None
+
+    def _is_current(self, index, source):
+        if (index.source_mtime_ns, index.source_size) == (source.st_mtime_ns, source.st_size):
+            return True
+        # Checkouts and deployed bundles keep the taxonomy's content but not its mtime
+        key = (index.file_id, source.st_mtime_ns, source.st_size)
+        if self._verified != key:
+            if index.source_size != source.st_size or index.source_digest != source_digest(self.source_path):
+                return False
+            self._verified = key
+        return True
+
+    def _refresh(self):
+        self._checked_at = time.monotonic()
+        source = os.stat(self.source_path)
+        index = self._map(self.index_path)
+        if index is None and self.bundled_path:
+            index = self._map(self.bundled_path)
+        if index is None or not self._is_current(index, source):
+            compile_taxonomy(self.source_path, self.index_path)
+            index = MappedSkillIndex(self.index_path)
+        # Old maps are released once the last reader drops its reference
+        self._index = index
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_skill_index():
+    """Returns the process-wide skill index, compiling it on first use."""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = SkillIndexManager(
+                    Config.SKILL_TAXONOMY_PATH,
+                    Config.SKILL_INDEX_PATH,
+                    Config.SKILL_RELOAD_INTERVAL,
+                    Config.SKILL_INDEX_BUNDLED_PATH,
+                )
+    return _manager.get()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile the skill taxonomy into its binary index.")
+    parser.add_argument("--output", default=Config.SKILL_INDEX_BUNDLED_PATH,
+                        help="Index to write (default: the bundled index shipped with the app)")
+    args = parser.parse_args(argv)
+
+    # Conflicts are logged as warnings; make sure they reach the terminal
+    from services import log
+    log.configure(fmt="text", asynchronous=False)
+    path = compile_taxonomy(Config.SKILL_TAXONOMY_PATH, args.output)
+    print(f"Compiled {Config.SKILL_TAXONOMY_PATH} -> {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    # Precompile the index as a build step: python -m services.taxonomy
+    raise SystemExit(main())
@@ -0,0 +1,116 @@
+"""
+Jinja bytecode cache.
+
+Compiling a template to Python bytecode costs a few milliseconds per
+template on its first render in every new process, which on serverless
+means every cold start. With the cache, compiled templates are read from
+JINJA_CACHE_DIR instead. Precompile them at build time with the Python
+version the deployment runs (Jinja ignores entries written by another
+version):
+
+    cd backend && python -m services.template_cache
+
+Entries are keyed by template name rather than absolute path, so a cache
+built in CI stays valid at the deployment's path, and each entry carries
+the checksum of its source, so an edited template is simply recompiled.
+When JINJA_CACHE_DIR is read-only (the deployed bundle), new entries go to
+a directory under the system temp dir.
+"""
+import hashlib
+import os
+import tempfile
+
+from jinja2 import BytecodeCache
+
+
+class TemplateBytecodeCache(BytecodeCache):
+    """Reads from the first directory holding an entry; writes to the first writable one."""
+
+    pattern = "__jinja2_%s.cache"
+
+    def __init__(self, directories):
+        self.directories = list(directories)
+
+    def get_cache_key(self, name, filename=None):
+        return hashlib.sha1(name.encode("utf-8")).hexdigest()
+
+    def _path(self, directory, bucket):
+        return os.path.join(directory, self.pattern % (bucket.key,))
+
+    def load_bytecode(self, bucket):
+        for directory in self.directories:
+            try:
+                with open(self._path(directory, bucket), "rb") as f:
+                    bucket.load_bytecode(f)
+            except OSError:
+                continue
+            if bucket.code is not None:
+                return
+
+    def dump_bytecode(self, bucket):
+        for directory in self.directories:
+            tmp_path = None
+            try:
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+                with os.fdopen(fd, "wb") as f:
+                    bucket.write_bytecode(f)
+                os.replace(tmp_path, self._path(directory, bucket))
+                return
+            except OSError:
+                if tmp_path:
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+        # Nowhere writable: templates still render, they are just compiled again next time
+
+    def clear(self):
+        for directory in self.directories:
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            for name in names:
+                if name.startswith("__jinja2_") and name.endswith(".cache"):
+                    try:
+                        os.remove(os.path.join(directory, name))
+                    except OSError:
+                        pass
+
+
+def init_app(app):
+    """Installs the bytecode cache on the app's Jinja environment."""
+    if not app.config.get('JINJA_BYTECODE_CACHE'):
+        return
+    directories = [app.config['JINJA_CACHE_DIR'], os.path.join(tempfile.gettempdir(), "jinja_cache")]
+    app.jinja_env.bytecode_cache = TemplateBytecodeCache(directories)
+
+
+def compile_templates(app):
+    """Compiles every template of the app into the cache. Returns the template names."""
+    names = [name for name in app.jinja_env.list_templates() if name.endswith(".html")]
+    for name in names:
+        app.jinja_env.get_template(name)
+    return names
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precompile the app's Jinja templates into the bytecode cache.")
+    parser.parse_args(argv)
+
+    from app import create_app
+
+    app = create_app()
+    if not app.config.get('JINJA_BYTECODE_CACHE'):
+        print("JINJA_BYTECODE_CACHE is off; nothing to do")
+        return 1
+    names = compile_templates(app)
+    print(f"Compiled {len(names)} templates into {app.config['JINJA_CACHE_DIR']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,129 @@
+"""
+Local token accounting for LLM prompts.
+
+estimate_tokens() approximates the model's tokenizer without a network call
+(tiktoken is used when it is installed). The process-wide ledger records,
+per prompt template, how many tokens were sent and received, both as
+estimated locally and as reported by the provider's usage block, including
+how much of each prompt was served from the provider's prefix cache.
+
+Print the estimated size of each prompt template with:
+
+    python -m services.tokens
+"""
+import math
+import re
+import threading
+
+_WORD_RE = re.compile(r"\w+|[^\w\s]")
+# Chat formatting adds a few tokens per message, plus a few to prime the reply
+MESSAGE_OVERHEAD = 4
+REPLY_OVERHEAD = 3
+
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoding = None
+        _encoding_loaded = True
+    return _encoding
+
+
+def estimate_tokens(text):
+    """Token count of text: exact with tiktoken, otherwise about one token per 4 characters of each word."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return sum(max(1, math.ceil(len(piece) / 4)) for piece in _WORD_RE.findall(text))
+
+
+def estimate_message_tokens(messages):
+    """Token count of a chat messages list, including per-message formatting."""
+    return sum(MESSAGE_OVERHEAD + estimate_tokens(m["content"]) for m in messages) + REPLY_OVERHEAD
+
+
+class TokenLedger:
+    """Thread-safe per-template totals of prompt and completion sizes."""
+
+    FIELDS = ("calls", "prompt_chars", "prompt_tokens_est", "completion_tokens_est",
+              "prompt_tokens", "completion_tokens", "cached_prompt_tokens")
+
+    def __init__(self):
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def record(self, template, messages, completion_text=None, usage=None):
+        """
+        Adds one call. usage is the provider's usage object, if the response had one;
+        completion_text is the generated text (all choices), used for the local estimate.
+        """
+        entry = {
+            "calls": 1,
+            "prompt_chars": sum(len(m["content"]) for m in messages),
+            "prompt_tokens_est": estimate_message_tokens(messages),
+            "completion_tokens_est": estimate_tokens(completion_text),
+            "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+            "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+            "cached_prompt_tokens": getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", 0) or 0,
+        }
+        with self._lock:
+            totals = self._totals.setdefault(template, dict.fromkeys(self.FIELDS, 0))
+            for field, value in entry.items():
+                totals[field] += value
+
+    def stats(self):
+        """{template: totals plus per-call averages}."""
+        with self._lock:
+            snapshot = {template: dict(totals) for template, totals in self._totals.items()}
+        for totals in snapshot.values():
+            calls = totals["calls"] or 1
+            totals["avg_prompt_tokens_est"] = round(totals["prompt_tokens_est"] / calls, 1)
+            totals["avg_completion_tokens_est"] = round(totals["completion_tokens_est"] / calls, 1)
+        return snapshot
+
+    def reset(self):
+        with self._lock:
+            self._totals.clear()
+
+
+ledger = TokenLedger()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Estimate the token size of each prompt template.")
+    parser.add_argument("resume", nargs="?", help="Optional PDF/DOCX to use as the resume (default: a short sample)")
+    args = parser.parse_args(argv)
+
+    from services import ai_service
+
+    if args.resume:
+        from services.parser import parse_resume_file
+        raw, parsed = parse_resume_file(args.resume, args.resume, parallel=True)
+    else:
+        raw = "Jane Doe\njane@example.com\nSoftware Engineer with 5 years of Python and AWS experience."
+        parsed = {"name": "Jane Doe", "skills": ["python", "aws"]}
+
+    for rubric in ai_service.ANALYSIS_RUBRICS:
+        messages = ai_service.build_analysis_messages(raw, parsed, rubric)
+        print(f"analysis:{rubric:<9} system={estimate_tokens(messages[0]['content']):>6}  "
+              f"user={estimate_tokens(messages[1]['content']):>6}  total={estimate_message_tokens(messages):>6}")
+    cover = [{"role": "user", "content": ai_service.build_cover_letter_prompt(raw, parsed, "Software Engineer", "professional")}]
+    advice = [{"role": "user", "content": ai_service.build_career_advice_prompt(raw, "")}]
+    print(f"cover_letter       total={estimate_message_tokens(cover):>6}")
+    print(f"career_advice      total={estimate_message_tokens(advice):>6}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,32 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Config is read from the environment at import time, so set it up before the app is imported
+_tmp_dir = tempfile.mkdtemp(prefix="resume-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(_tmp_dir, 'test.db')}",
+    "UPLOAD_FOLDER": os.path.join(_tmp_dir, "uploads"),
+    "LLM_PROVIDER": "fake",
+    "LLM_CACHE_BACKEND": "memory",
+    "OPENAI_PREWARM": "0",
+    "METRICS_ENABLED": "0",
+    "LOG_LEVEL": "WARNING",
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def app():
+    from app import create_app
+    from extensions import db
+    from schema import upgrade_schema
+
+    app = create_app()
+    with app.app_context():
+        upgrade_schema(db)
+        yield app
+        db.session.remove()
+        db.drop_all()
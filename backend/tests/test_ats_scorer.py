@@ -0,0 +1,37 @@
+from services.ats_scorer import _DEGREE_RE, _unprofessional_email, score_resume
+
+PROSE_RESUME = """Jane Doe
+jane@example.com | +1 555 123 4567 | Austin, TX
+
+Summary
+I want to be a great engineer. Contact me anytime about a role; ma and bs are not degrees.
+
+Experience
+Software Engineer, Acme (2019 - 2024)
+- Cut API latency by 40% for 2M daily requests
+
+Skills
+Python, SQL, Docker
+"""
+
+
+def test_plain_words_are_not_degrees():
+    for sentence in ("I want to be a great engineer", "Contact me anytime", "ma and bs"):
+        assert _DEGREE_RE.search(sentence) is None
+    for degree in ("B.E. in Mechanical Engineering", "M.A. History", "B.Sc Physics", "Bachelor of Arts",
+                   "Master's in Data Science", "MTech", "Ph.D. Chemistry"):
+        assert _DEGREE_RE.search(degree) is not None
+
+
+def test_resume_without_education_section_is_not_credited_for_prose():
+    analysis = score_resume(PROSE_RESUME, {"name": "Jane Doe"})
+
+    assert analysis["score_breakdown"]["education"] == 0
+    assert "Missing Education: -8 points" in analysis["deductions_applied"]
+
+
+def test_unprofessional_email_matches_whole_words_only():
+    for local_part in ("angela", "danny.glover", "ccoolidge", "john1969", "jane420"):
+        assert not _unprofessional_email(local_part)
+    for local_part in ("party.animal", "cool_dude99", "angel-1990", "xxx"):
+        assert _unprofessional_email(local_part)
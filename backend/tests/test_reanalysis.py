@@ -0,0 +1,93 @@
+import io
+
+from extensions import db
+from models import Resume, User
+from services import reanalysis
+from services.ai_service import analysis_version
+from services.analysis_queue import DONE, PENDING, RUNNING, is_complete
+from services.llm_providers import FakeProvider, _fake_analysis
+
+RESUME_TEXT = """Jane Doe
+jane@example.com | linkedin.com/in/janedoe
+
+Experience
+Software Engineer, Acme (2019 - 2024)
+- Cut API latency by 40% for 2M daily requests
+- Built CI/CD pipelines in Python and Docker
+
+Skills
+Python, SQL, Docker, AWS
+"""
+
+
+class CutOffProvider(FakeProvider):
+    """Every response stops at max_tokens, so every analysis comes back truncated."""
+
+    def chat(self, workload, model, messages, **params):
+        response = super().chat(workload, model, messages, **params)
+        for choice in response.choices:
+            choice.finish_reason = "length"
+        return response
+
+
+def _add_resumes(count, analysis=None):
+    user = User(email=f"user{User.query.count()}@example.com", password_hash="x")
+    db.session.add(user)
+    db.session.flush()
+    resumes = [Resume(filename=f"resume{i}.pdf", text=f"{RESUME_TEXT}\nResume {i}", parsed_data={},
+                      analysis=analysis, user_id=user.id) for i in range(count)]
+    db.session.add_all(resumes)
+    db.session.commit()
+    return [resume.id for resume in resumes]
+
+
+def _export_run_import(provider, pack_size=None):
+    batch_input = io.StringIO()
+    requests = reanalysis.export_batch(batch_input, pack_size=pack_size)
+    batch_output = io.StringIO()
+    reanalysis.run_batch_locally(io.StringIO(batch_input.getvalue()), batch_output, provider=provider)
+    return requests, reanalysis.import_batch(io.StringIO(batch_output.getvalue()))
+
+
+def test_batch_round_trip_applies_complete_analyses(app):
+    ids = _add_resumes(3)
+
+    requests, (done, failed) = _export_run_import(FakeProvider(), pack_size=2)
+
+    assert requests == 2
+    assert (done, failed) == (3, 0)
+    for resume_id in ids:
+        resume = db.session.get(Resume, resume_id)
+        assert resume.analysis_version == analysis_version()
+        assert is_complete(resume.analysis)
+    # Nothing is stale any more, so a second export is empty
+    assert reanalysis.export_batch(io.StringIO()) == 0
+
+
+def test_batch_round_trip_keeps_complete_analysis_over_truncated_result(app):
+    previous = _fake_analysis(RESUME_TEXT)
+    kept_id, = _add_resumes(1, analysis=previous)
+    empty_id, = _add_resumes(1)
+
+    _requests, (done, failed) = _export_run_import(CutOffProvider(), pack_size=1)
+
+    assert (done, failed) == (0, 2)
+    kept = db.session.get(Resume, kept_id)
+    assert kept.analysis == previous
+    assert kept.analysis_version is None
+    # A row without a complete analysis still gets the partial one, but stays stale
+    empty = db.session.get(Resume, empty_id)
+    assert empty.analysis["truncated"] is True
+    assert empty.analysis_version is None
+
+
+def test_batch_export_skips_rows_owned_by_the_analysis_queue(app):
+    ids = _add_resumes(4)
+    for resume_id, status in zip(ids, (PENDING, RUNNING, DONE, None)):
+        db.session.get(Resume, resume_id).analysis_status = status
+    db.session.commit()
+
+    _requests, (done, failed) = _export_run_import(FakeProvider(), pack_size=1)
+
+    assert (done, failed) == (2, 0)
+    assert [db.session.get(Resume, resume_id).analysis_status for resume_id in ids] == [PENDING, RUNNING, DONE, DONE]
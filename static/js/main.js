@@ -1,2 +1,98 @@
-// Example: you could implement async reanalyze endpoints; keeping minimal for now.
-console.log("AI Resume Analyzer loaded");
+// Poll pending resume analyses, show the score early and reload once they finish.
+document.addEventListener("DOMContentLoaded", function () {
+  var pending = document.querySelectorAll("[data-analysis-status-url]");
+  if (!pending.length) return;
+
+  function poll(el) {
+    fetch(el.getAttribute("data-analysis-status-url"), { credentials: "same-origin" })
+      .then(function (res) { return res.json(); })
+      .then(function (data) {
+        if (data.status === "done" || data.status === "failed") {
+          window.location.reload();
+        } else {
+          // The score streams in before the rest of the analysis
+          var score = el.querySelector("[data-analysis-score]");
+          if (score && data.score !== null && data.score !== undefined) {
+            score.querySelector("span").textContent = data.score;
+            score.classList.remove("d-none");
+          }
+          setTimeout(function () { poll(el); }, 3000);
+        }
+      })
+      .catch(function () { setTimeout(function () { poll(el); }, 10000); });
+  }
+
+  pending.forEach(function (el) { poll(el); });
+});
+
+// Stream generated text (cover letters, career advice) into the page as it is produced.
+// Forms opt in with data-stream-url / data-stream-target; without fetch streaming
+// support, or if the stream fails before any text arrived, the form is submitted
+// normally. Once text has arrived the request is not repeated (it would generate,
+// and for cover letters save, a second result).
+document.addEventListener("DOMContentLoaded", function () {
+  if (!window.fetch || !window.TextDecoder || !window.ReadableStream) return;
+
+  document.querySelectorAll("form[data-stream-url]").forEach(function (form) {
+    form.addEventListener("submit", function (event) {
+      event.preventDefault();
+      var target = document.querySelector(form.getAttribute("data-stream-target"));
+      var output = target.querySelector("[data-stream-text]");
+      var button = form.querySelector("[type=submit]");
+      var received = false;
+      output.textContent = "";
+      target.classList.remove("d-none");
+      if (button) button.disabled = true;
+
+      function handle(name, data) {
+        if (name === "token") {
+          received = true;
+          output.textContent += data.text;
+        } else if (name === "done") {
+          if (data.redirect) window.location.href = data.redirect;
+        } else if (name === "error") {
+          output.textContent = data.message;
+        }
+      }
+
+      fetch(form.getAttribute("data-stream-url"), {
+        method: "POST",
+        body: new FormData(form),
+        credentials: "same-origin"
+      }).then(function (res) {
+        if (!res.ok || !res.body) throw new Error("stream unavailable");
+        var reader = res.body.getReader();
+        var decoder = new TextDecoder();
+        var buffer = "";
+
+        function read() {
+          return reader.read().then(function (result) {
+            if (result.done) return;
+            buffer += decoder.decode(result.value, { stream: true });
+            var events = buffer.split("\n\n");
+            buffer = events.pop();
+            events.forEach(function (raw) {
+              var name = "message", data = "";
+              raw.split("\n").forEach(function (line) {
+                if (line.indexOf("event: ") === 0) name = line.slice(7);
+                else if (line.indexOf("data: ") === 0) data += line.slice(6);
+              });
+              if (data) handle(name, JSON.parse(data));
+            });
+            return read();
+          });
+        }
+        return read();
+      }).then(function () {
+        if (button) button.disabled = false;
+      }).catch(function () {
+        if (!received) {
+          form.submit();
+          return;
+        }
+        output.textContent += "\n\n[The connection was interrupted. Please try again.]";
+        if (button) button.disabled = false;
+      });
+    });
+  });
+});